@@ -37,6 +37,21 @@ class MultiPublish2(sgtk.platform.Application):
         # make the base plugins available via the app
         self._base_hooks = tk_multi_publish2.base_hooks
 
+        # the hook classes and resolved settings shared by the plugins,
+        # cleared when the app is destroyed
+        self._hook_class_registry = \
+            tk_multi_publish2.api.plugins.instance_base.hook_class_registry
+        self._settings_cache = \
+            tk_multi_publish2.api.plugins.setting.settings_cache
+
+        # the pool of processes plugins can run CPU bound jobs in. the worker
+        # processes are only started when a job is submitted. applications
+        # with a UI aren't forked, the jobs run on threads instead.
+        self._process_pool = tk_multi_publish2.api.process_pool.ProcessPool(
+            self.get_setting("process_pool_workers") or None,
+            use_processes=not self.engine.has_ui
+        )
+
         display_name = self.get_setting("display_name")
         # "Publish Render" ---> publish_render
         command_name = display_name.lower()
@@ -58,6 +73,33 @@ class MultiPublish2(sgtk.platform.Application):
         }
         self.engine.register_command(menu_caption, cb, menu_options)
 
+        # the batch and distributed publishes are only available from the
+        # command line
+        if self.engine.name == "tk-shell":
+            api = tk_multi_publish2.api
+            self.engine.register_command(
+                "publish_batch",
+                lambda *args: api.batch.main(list(args)),
+                {
+                    "short_name": "publish_batch",
+                    "description": (
+                        "Publishes serialized publish trees or files without a "
+                        "UI and reports the outcome of each task."
+                    )
+                }
+            )
+            self.engine.register_command(
+                "publish_shards",
+                lambda *args: api.sharding.main(list(args)),
+                {
+                    "short_name": "publish_shards",
+                    "description": (
+                        "Splits a validated publish tree into shards, publishes "
+                        "them and merges the results back."
+                    )
+                }
+            )
+
     @property
     def base_hooks(self):
         """
@@ -101,6 +143,39 @@ class MultiPublish2(sgtk.platform.Application):
         """
         return self._util
 
+    @property
+    def process_pool(self):
+        """
+        Exposes the publish2 :class:`~.api.process_pool.ProcessPool`.
+
+        Plugins can submit CPU bound jobs, like image conversions or
+        checksums, to run them in worker processes rather than on the host
+        application's main thread. Example code running in a hook:
+
+        .. code-block:: python
+
+            # get a handle on the publish2 app
+            app = self.parent
+
+            # convert the image in a worker process
+            job = app.process_pool.submit(
+                convert_image,
+                (source_path, target_path),
+                description="Converting %s" % source_path,
+                publish_logger=self.logger
+            )
+            job.result()
+
+        The number of worker processes is set by the ``process_pool_workers``
+        setting. The jobs are cancelled when the user stops the publish. In
+        engines with a UI, and on platforms which can't fork processes, the
+        jobs are run on threads of the current process instead, leaving the
+        main thread free to process the application's events.
+
+        :return: A :class:`~.api.process_pool.ProcessPool` instance.
+        """
+        return self._process_pool
+
     @property
     def context_change_allowed(self):
         """
@@ -123,3 +198,9 @@ class MultiPublish2(sgtk.platform.Application):
         Tear down the app
         """
         self.log_debug("Destroying tk-multi-publish2")
+        self._process_pool.shutdown()
+
+        # the hooks and settings are loaded again by the next instance of the
+        # app, which may run with a different configuration
+        self._hook_class_registry.clear()
+        self._settings_cache.clear()
@@ -519,29 +519,37 @@ class FileCollectorPlugin(HookBaseClass):
         known_seq_extensions = _build_seq_extensions_list(settings)
         frame_sequences = publisher.util.get_frame_sequences(folder, known_seq_extensions)
 
-        file_items = []
-        for path, seq_files in frame_sequences:
-            file_item = self._add_file_item(settings, parent_item, path, True, seq_files,
-                                            creation_properties=creation_properties)
-            if file_item:
-                # include an indicator that this is an image sequence and the known
-                # file that belongs to this sequence
-                file_info = (
-                    "The following files were collected:<br>"
-                    "<pre>%s</pre>" % (pprint.pformat(seq_files),)
-                )
+        # create the items for all the sequences at once
+        item_specs = [
+            self._get_file_item_spec(settings, parent_item, path, True, seq_files,
+                                     creation_properties=creation_properties)
+            for path, seq_files in frame_sequences
+        ]
+        file_items = self._add_items(settings, parent_item, item_specs)
 
-                self.logger.info(
-                    "Collected item: %s" % file_item.name,
-                    extra={
-                        "action_show_more_info": {
-                            "label": "Show File(s)",
-                            "tooltip": "Show the collected file(s)",
-                            "text": file_info
-                        }
+        for file_item, (path, seq_files) in zip(file_items, frame_sequences):
+            # identify the item by its path across collections
+            file_item.key = path
+
+            self._set_file_item_thumbnail(file_item, path, True, seq_files)
+
+            # include an indicator that this is an image sequence and the known
+            # file that belongs to this sequence
+            file_info = (
+                "The following files were collected:<br>"
+                "<pre>%s</pre>" % (pprint.pformat(seq_files),)
+            )
+
+            self.logger.info(
+                "Collected item: %s" % file_item.name,
+                extra={
+                    "action_show_more_info": {
+                        "label": "Show File(s)",
+                        "tooltip": "Show the collected file(s)",
+                        "text": file_info
                     }
-                )
-                file_items.append(file_item)
+                }
+            )
 
         if not file_items:
             self.logger.warning("No file sequences found in: %s" % (folder,))
@@ -565,14 +573,46 @@ class FileCollectorPlugin(HookBaseClass):
 
         :returns: The item that was created
         """
+        item_spec = self._get_file_item_spec(settings, parent_item, path, is_sequence, seq_files,
+                                             item_name, item_type, context, creation_properties)
+
+        # create and populate the item
+        file_item = self._add_item(settings, parent_item, *item_spec)
+
+        # identify the item by its path across collections
+        file_item.key = path
+
+        self._set_file_item_thumbnail(file_item, path, is_sequence, seq_files)
+
+        return file_item
+
+    def _get_file_item_spec(self, settings, parent_item, path, is_sequence=False, seq_files=None,
+                            item_name=None, item_type=None, context=None, creation_properties=None):
+        """
+        Resolves the arguments needed to create a file item
+
+        :param dict settings: Configured settings for this collector
+        :param parent_item: parent item instance
+        :param path: Path to analyze
+        :param is_sequence: Bool as to whether to treat the path as a part of a sequence
+        :param seq_files: A list of files in the sequence
+        :param item_name: The name of the item instance
+        :param item_type: The type of the item instance
+        :param context: The :class:`sgtk.Context` to set for the item
+        :param creation_properties: The dict of initial properties for the item
+
+        :returns: A (item_name, item_type, context, properties) tuple, as
+            expected by :meth:`_add_items`
+        """
         publisher = self.parent
 
         # Get the item name from the path
         if not item_name:
             item_name = publisher.util.get_publish_name(path)
 
-        # Define the item's properties
-        properties = creation_properties or {}
+        # Define the item's properties. Copy the creation properties since
+        # they can be shared by several items.
+        properties = dict(creation_properties or {})
 
         # set the path and is_sequence properties for the plugins to use
         properties["path"] = path
@@ -605,16 +645,19 @@ class FileCollectorPlugin(HookBaseClass):
             else:
                 context = parent_item.context
 
-        # create and populate the item
-        file_item = self._add_item(settings,
-                                   parent_item,
-                                   item_name,
-                                   item_type,
-                                   context,
-                                   properties)
+        return (item_name, item_type, context, properties)
 
+    def _set_file_item_thumbnail(self, file_item, path, is_sequence=False, seq_files=None):
+        """
+        Uses the supplied path as the thumbnail of a file item if it is an image
+
+        :param file_item: The file item
+        :param path: Path of the file item
+        :param is_sequence: Bool as to whether the path is a part of a sequence
+        :param seq_files: A list of files in the sequence
+        """
         # if the supplied path is an image, use the path as the thumbnail.
-        image_type = item_type.split(".")[1]
+        image_type = file_item.type_spec.split(".")[1]
         if image_type in KNOWN_IMAGE_TYPES:
             if is_sequence:
                 file_item.set_thumbnail_from_path(seq_files[0])
@@ -624,8 +667,6 @@ class FileCollectorPlugin(HookBaseClass):
             # disable thumbnail creation since we get it for free
             file_item.thumbnail_enabled = False
 
-        return file_item
-
     def _get_filtered_item_types_from_settings(self, settings, path, is_sequence, creation_properties):
 
         """
@@ -148,6 +148,44 @@ class CollectorPlugin(HookBaseClass):
 
         return item
 
+    def _add_items(self, settings, parent_item, item_specs):
+        """
+        Creates several generic items at once
+
+        :param dict settings: Configured settings for this collector
+        :param parent_item: parent item instance
+        :param item_specs: A list of (item_name, item_type, context, properties)
+            tuples, one for each item to create. See :meth:`_add_item`.
+
+        :returns: The list of items that were created
+        """
+        publisher = self.parent
+
+        specs = []
+        icon_paths = []
+        for (item_name, item_type, context, properties) in item_specs:
+
+            # Get this item's info from the settings object
+            item_info = self._get_item_type_info(settings, item_type)
+
+            specs.append(
+                (item_type, item_info["type_display"], item_name, context, properties)
+            )
+
+            # construct a full path to the icon given the name defined above
+            icon_paths.append(publisher.expand_path(item_info["icon_path"]))
+
+        # create and populate the items
+        items = parent_item.create_items(specs)
+
+        for (item, icon_path) in zip(items, icon_paths):
+            self.logger.debug("Added %s of type %s" % (item.name, item.type_spec))
+
+            # Set the icon path
+            item.set_icon_from_path(icon_path)
+
+        return items
+
 
     def _get_item_type_info(self, settings, item_type):
         """
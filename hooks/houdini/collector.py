@@ -215,6 +215,9 @@ class HoudiniSessionCollector(HookBaseClass):
                     # Store a reference to the originating node
                     item.properties.node = node
 
+                    # identify the item by its node and output path across collections
+                    item.key = "%s %s" % (node.path(), file_path)
+
                     # Add item to the list
                     items.append(item)
 
@@ -276,6 +279,9 @@ class HoudiniSessionCollector(HookBaseClass):
             # Store a reference to the originating node
             item.properties.node = node
 
+            # identify the item by its node and output path across collections
+            item.key = "%s %s" % (node.path(), out_path)
+
             # Add item to the list
             items.append(item)
 
@@ -339,6 +345,9 @@ class HoudiniSessionCollector(HookBaseClass):
             # Store a reference to the originating node
             item.properties.node = node
 
+            # identify the item by its node and output path across collections
+            item.key = "%s %s" % (node.path(), out_path)
+
             # Add item to the list
             items.append(item)
 
@@ -202,6 +202,8 @@ class MariSessionCollector(HookBaseClass):
                 # TODO: should be replaced by create_settings_widget?
                 geo_udim_selection[geo_name] = [patch.udim() for patch in selected_patches]
 
+            channel_specs = []
+            channel_layers = []
             for channel in geo.channelList():
                 channel_name = channel.name()
 
@@ -237,12 +239,18 @@ class MariSessionCollector(HookBaseClass):
 
                 # add item for whole flattened channel:
                 item_name = "%s, %s" % (channel_name, geo_name)
-                channel_item = self._add_item(settings,
-                                              parent_item,
-                                              item_name,
-                                              "mari.channel",
-                                              parent_item.context,
-                                              properties)
+                channel_specs.append((item_name,
+                                      "mari.channel",
+                                      parent_item.context,
+                                      properties))
+                channel_layers.append(found_layers)
+
+            # create the items for all the channels of the geometry at once
+            channel_items = self._add_items(settings, parent_item, channel_specs)
+
+            for channel_item, found_layers in zip(channel_items, channel_layers):
+                # identify the item by its channel and geometry across collections
+                channel_item.key = channel_item.name
 
                 channel_item.set_thumbnail_from_path(thumbnail)
                 channel_item.thumbnail_enabled = True
@@ -303,9 +311,11 @@ class MariSessionCollector(HookBaseClass):
                                      channel_item,
                                      "Texture Channel Layers",
                                      "mari.layers")
+        layers_item.key = layers_item.name
         items.append(layers_item)
 
         # add item for each collected layer:
+        layer_specs = []
         found_layer_names = set()
         for layer in layer_list:
 
@@ -337,12 +347,15 @@ class MariSessionCollector(HookBaseClass):
             item_name = "%s (%s), %s" % (layer_properties["mari_channel_name"],
                                          layer_name,
                                          layer_properties["mari_geo_name"])
-            layer_item = self._add_item(settings,
-                                        layers_item,
-                                        item_name,
-                                        "mari.texture",
-                                        channel_item.context,
-                                        layer_properties)
+            layer_specs.append((item_name,
+                                "mari.texture",
+                                channel_item.context,
+                                layer_properties))
+
+        # create the items for all the layers at once
+        for layer_item in self._add_items(settings, layers_item, layer_specs):
+            # identify the item by its layer, channel and geometry across collections
+            layer_item.key = layer_item.name
 
             layer_item.set_thumbnail_from_path(thumbnail)
             layer_item.thumbnail_enabled = True
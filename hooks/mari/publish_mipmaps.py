@@ -214,7 +214,8 @@ class MariPublishMipmapsPlugin(HookBaseClass):
         :returns:                   list of created mipmap paths
         """
         publisher = self.parent
-        mipmap_paths = []
+        target_paths = []
+        jobs = []
 
         for source_path in source_paths:
             frame = publisher.util.get_frame_number(source_path)
@@ -228,7 +229,23 @@ class MariPublishMipmapsPlugin(HookBaseClass):
             else:
                 target_path = target_seq_path
 
-            if not self._create_mipmap(source_path, target_path):
+            # the conversion is CPU bound, run it in the publisher's process
+            # pool to convert several files at once, off the main thread
+            target_paths.append(target_path)
+            jobs.append(
+                publisher.process_pool.submit(
+                    _create_mipmap,
+                    (source_path, target_path),
+                    description="Mipmap {}".format(os.path.basename(target_path)),
+                    publish_logger=self.logger
+                )
+            )
+
+        mipmap_paths = []
+        for target_path, (created, error) in zip(target_paths, publisher.process_pool.wait(jobs)):
+            if error:
+                self.logger.warning(str(error))
+            if not created:
                 self.logger.warning("Mipmap not created for: {}. "
                                     "Touching empty file.".format(target_path))
                 open(target_path, 'a').close()
@@ -237,26 +254,6 @@ class MariPublishMipmapsPlugin(HookBaseClass):
 
         return mipmap_paths
 
-    def _create_mipmap(self, source_path, target_path):
-        """
-        Use OIIO to convert a given image into a mipmapped image.
-
-        :param source_path: path to source image file
-        :param target_path: path to write the mipmapped file to
-
-        :return: bool (success of mipmap creation)
-        """
-        # cast here as OIIO has an issue with unicode strings (C++ matches types strictly)
-        source_path = str(source_path)
-        target_path = str(target_path)
-
-        _img_input = oiio.ImageBuf(source_path)
-        _target_spec = oiio.ImageSpec(_img_input.spec())
-        _target_spec.attribute("maketx:filtername", "lanczos3")
-        _target_spec.attribute("maketx:fixnan", "box3")
-
-        return oiio.ImageBufAlgo.make_texture(oiio.MakeTxTexture, _img_input, target_path, _target_spec)
-
     def _valid_for_mipmap_multiimage(self, target_path):
         """
         Check if target object supports mipmapping or multi image capabilities
@@ -313,5 +310,28 @@ class MariPublishMipmapsPlugin(HookBaseClass):
         if not key:
             raise TankError("Publish Mipmaps needs the output of {} to run".format(INPUT_PLUGIN_NAME))
 
-        publish_path_texture = item._local_properties.get(key, {}).get("publish_path")
+        publish_path_texture = item._get_plugin_properties(key).get("publish_path")
         return [publish_path_texture]
+
+
+def _create_mipmap(source_path, target_path):
+    """
+    Use OIIO to convert a given image into a mipmapped image.
+
+    Runs in a worker process of the publisher's process pool.
+
+    :param source_path: path to source image file
+    :param target_path: path to write the mipmapped file to
+
+    :return: bool (success of mipmap creation)
+    """
+    # cast here as OIIO has an issue with unicode strings (C++ matches types strictly)
+    source_path = str(source_path)
+    target_path = str(target_path)
+
+    _img_input = oiio.ImageBuf(source_path)
+    _target_spec = oiio.ImageSpec(_img_input.spec())
+    _target_spec.attribute("maketx:filtername", "lanczos3")
+    _target_spec.attribute("maketx:fixnan", "box3")
+
+    return oiio.ImageBufAlgo.make_texture(oiio.MakeTxTexture, _img_input, target_path, _target_spec)
@@ -317,6 +317,9 @@ class NukeSessionCollector(HookBaseClass):
 
                 # Store a reference to the originating node
                 item.properties.node = node
+
+                # identify the item by its node and output path across collections
+                item.key = "%s %s" % (node.fullName(), file_path)
     
                 thumbnail = self._generate_thumbnail_from_rendered_image(file_path)
                 if not thumbnail and node_type in SG_WRITE_NODE_CLASSES:
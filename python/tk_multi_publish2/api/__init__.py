@@ -13,3 +13,4 @@ from .manager import PublishManager
 from .item import PublishItem
 from .task import PublishTask
 from .tree import PublishTree
+from . import batch, journal, process_pool, sharding
@@ -0,0 +1,314 @@
+# Copyright (c) 2018 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Runs publishes without a UI, typically on a render farm.
+
+Each job either loads a serialized publish tree or collects a list of files,
+then runs the validate, publish and finalize phases. The outcome and duration
+of every task are gathered in a report which can be saved as json.
+
+.. code-block:: python
+
+    report = run_batch(
+        [BatchJob(tree_path="/path/to/tree.json")],
+        report_path="/path/to/report.json"
+    )
+"""
+
+import argparse
+import json
+import multiprocessing
+import threading
+import time
+import traceback
+
+import sgtk
+from .manager import PublishManager
+from .plugins.instance_base import disable_event_processing
+
+logger = sgtk.platform.get_logger(__name__)
+
+# the phases of a publish, in order of execution
+PHASE_VALIDATE = "validate"
+PHASE_PUBLISH = "publish"
+PHASE_FINALIZE = "finalize"
+PHASES = (PHASE_VALIDATE, PHASE_PUBLISH, PHASE_FINALIZE)
+
+# statuses of the jobs and tasks
+STATUS_SUCCEEDED = "succeeded"
+STATUS_FAILED = "failed"
+STATUS_RUNNING = "running"
+
+
+class BatchJob(object):
+    """
+    An input of the batch runner: a serialized tree or a list of files to
+    collect.
+    """
+
+    def __init__(self, tree_path=None, file_paths=None):
+        """
+        :param str tree_path: The path to a serialized publish tree.
+        :param list file_paths: The paths of the files to collect, when no
+            tree is supplied.
+        """
+        if not tree_path and not file_paths:
+            raise sgtk.TankError("A batch job needs a publish tree or files to collect.")
+
+        self.tree_path = tree_path
+        self.file_paths = file_paths or []
+
+    @property
+    def name(self):
+        """A display name for the job."""
+        if self.tree_path:
+            return self.tree_path
+        return "%s files" % (len(self.file_paths),)
+
+
+class _TaskRecorder(object):
+    """
+    Records the outcome and duration of the tasks processed during a phase.
+
+    Used as the :attr:`PublishManager.task_monitor`, so that the tasks are
+    timed by the thread running them, including when they are published in
+    parallel.
+    """
+
+    def __init__(self, records):
+        """
+        :param list records: The list to append the task records to.
+        """
+        self._records = records
+        self._lock = threading.Lock()
+        self._running = {}
+
+    def task_started(self, task, phase):
+        """
+        Records that a task started to be processed.
+
+        :param task: The :class:`~.PublishTask` being processed.
+        :param str phase: The phase the task is processed for.
+        """
+        record = {
+            "phase": phase,
+            "item": task.item.name,
+            "task": task.name,
+            "status": STATUS_RUNNING,
+            "error": None,
+            "duration": None,
+        }
+        with self._lock:
+            self._records.append(record)
+            self._running[task] = (record, time.time())
+
+    def task_finished(self, task, phase, error):
+        """
+        Records the outcome of a task.
+
+        :param task: The :class:`~.PublishTask` processed.
+        :param str phase: The phase the task was processed for.
+        :param error: The error of the task, or ``None`` if it succeeded.
+        """
+        with self._lock:
+            (record, start) = self._running.pop(task)
+
+        record["duration"] = time.time() - start
+        if error:
+            record["status"] = STATUS_FAILED
+            record["error"] = str(error)
+        else:
+            record["status"] = STATUS_SUCCEEDED
+
+
+def run_job(job, phases=PHASES, publish_logger=None, max_workers=1):
+    """
+    Runs the publish phases for a job in the current process.
+
+    The phases stop at the first one that fails: validation failures prevent
+    the publish, and an error raised while publishing or finalizing aborts the
+    job.
+
+    :param job: The :class:`BatchJob` to run.
+    :param list phases: The phases to run, in order.
+    :param publish_logger: Optional logger used during publishing.
+    :param int max_workers: The maximum number of tasks to publish in
+        parallel. See :meth:`PublishManager.publish`.
+    :returns: A dictionary describing the outcome of the job.
+    """
+    report = {
+        "job": job.name,
+        "status": STATUS_SUCCEEDED,
+        "error": None,
+        "durations": {},
+        "tasks": [],
+    }
+    job_start = time.time()
+
+    try:
+        manager = PublishManager(publish_logger)
+        if job.tree_path:
+            manager.load(job.tree_path)
+        else:
+            manager.collect_files(job.file_paths)
+    except Exception, e:
+        logger.debug(traceback.format_exc())
+        report["status"] = STATUS_FAILED
+        report["error"] = str(e)
+        report["durations"]["total"] = time.time() - job_start
+        return report
+
+    manager.task_monitor = _TaskRecorder(report["tasks"])
+
+    for phase in phases:
+        phase_kwargs = {}
+        if phase == PHASE_PUBLISH:
+            phase_kwargs["max_workers"] = max_workers
+        phase_start = time.time()
+        try:
+            result = getattr(manager, phase)(**phase_kwargs)
+        except Exception, e:
+            logger.debug(traceback.format_exc())
+            report["status"] = STATUS_FAILED
+            report["error"] = str(e)
+        else:
+            # validate and publish return the tasks that failed
+            if result:
+                report["status"] = STATUS_FAILED
+                report["error"] = "%s tasks failed to %s." % (len(result), phase)
+        report["durations"][phase] = time.time() - phase_start
+
+        if report["status"] == STATUS_FAILED:
+            break
+
+    report["durations"]["total"] = time.time() - job_start
+    return report
+
+
+def run_batch(jobs, phases=PHASES, processes=1, report_path=None, max_workers=1):
+    """
+    Runs the publish phases for several jobs, without processing Qt events.
+
+    :param list jobs: The :class:`BatchJob` instances to run.
+    :param list phases: The phases to run, in order.
+    :param int processes: The number of jobs to run in parallel. Jobs run in
+        worker processes forked from the current one when more than one.
+    :param str report_path: Optional path to save the json report to.
+    :param int max_workers: The maximum number of tasks of a job to publish
+        in parallel.
+    :returns: A dictionary with the overall status and duration of the batch
+        and the report of each job.
+    """
+    start = time.time()
+
+    with disable_event_processing():
+        if processes > 1 and len(jobs) > 1:
+            pool = multiprocessing.Pool(min(processes, len(jobs)))
+            try:
+                job_reports = pool.map(
+                    _run_job_process, [(job, phases, max_workers) for job in jobs]
+                )
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            job_reports = [
+                run_job(job, phases, max_workers=max_workers) for job in jobs
+            ]
+
+    report = {
+        "status": STATUS_SUCCEEDED,
+        "duration": time.time() - start,
+        "jobs": job_reports,
+    }
+    if any(job_report["status"] == STATUS_FAILED for job_report in job_reports):
+        report["status"] = STATUS_FAILED
+
+    if report_path:
+        with open(report_path, "w") as report_file:
+            json.dump(report, report_file, indent=2)
+
+    return report
+
+
+def main(args):
+    """
+    Command line interface of the batch runner.
+
+    :param list args: The command line arguments.
+    :returns: The exit code.
+    """
+    parser = argparse.ArgumentParser(
+        prog="publish_batch",
+        description="Publishes serialized trees or files without a UI."
+    )
+    parser.add_argument(
+        "--tree", dest="trees", action="append", default=[],
+        help="Path to a serialized publish tree. Can be repeated."
+    )
+    parser.add_argument(
+        "--files", nargs="+", default=[],
+        help="Paths of files to collect and publish as a single job."
+    )
+    parser.add_argument(
+        "--phases", default=",".join(PHASES),
+        help="Comma separated phases to run. Defaults to %(default)s."
+    )
+    parser.add_argument(
+        "--processes", type=int, default=1,
+        help="Number of jobs to run in parallel."
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Number of tasks of a job to publish in parallel."
+    )
+    parser.add_argument("--report", help="Path to save the json report to.")
+
+    options = parser.parse_args(args)
+
+    phases = [phase.strip() for phase in options.phases.split(",") if phase.strip()]
+    unknown_phases = set(phases) - set(PHASES)
+    if unknown_phases:
+        parser.error("Unknown phases: %s" % (", ".join(sorted(unknown_phases)),))
+
+    jobs = [BatchJob(tree_path=tree_path) for tree_path in options.trees]
+    if options.files:
+        jobs.append(BatchJob(file_paths=options.files))
+    if not jobs:
+        parser.error("Supply publish trees or files to publish.")
+
+    report = run_batch(
+        jobs, phases, options.processes, options.report, options.workers
+    )
+
+    for job_report in report["jobs"]:
+        logger.info(
+            "%s: %s (%.1fs)%s" % (
+                job_report["job"],
+                job_report["status"],
+                job_report["durations"]["total"],
+                " - %s" % job_report["error"] if job_report["error"] else ""
+            )
+        )
+
+    return 0 if report["status"] == STATUS_SUCCEEDED else 1
+
+
+def _run_job_process(args):
+    """
+    Runs a job in a worker process of :func:`run_batch`.
+
+    :param tuple args: The job, the phases to run and the maximum number of
+        tasks to publish in parallel.
+    :returns: The report of the job.
+    """
+    (job, phases, max_workers) = args
+    return run_job(job, phases, max_workers=max_workers)
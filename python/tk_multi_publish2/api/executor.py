@@ -0,0 +1,431 @@
+# Copyright (c) 2018 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+from collections import deque
+import logging
+import sys
+import threading
+
+import sgtk
+
+logger = sgtk.platform.get_logger(__name__)
+
+# the interval at which the log records of the worker threads are handled
+# while waiting for a task
+LOG_RELAY_INTERVAL = 0.1
+
+
+class _Job(object):
+    """
+    A planned task and the state of its execution.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    SKIPPED = "skipped"
+
+    __slots__ = [
+        "task",
+        "thread_safe",
+        "dependencies",
+        "dependents",
+        "unfinished_dependencies",
+        "state",
+        "result",
+        "exc_info",
+    ]
+
+    def __init__(self, task, dependencies):
+        """
+        :param task: The :class:`~.PublishTask` to run.
+        :param list dependencies: The jobs which must be done first.
+        """
+        self.task = task
+        self.thread_safe = task.plugin.thread_safe
+        self.dependencies = dependencies
+        self.dependents = []
+        self.unfinished_dependencies = len(dependencies)
+        self.state = self.PENDING
+        self.result = None
+        self.exc_info = None
+
+        for dependency in dependencies:
+            dependency.dependents.append(self)
+
+
+class ParallelTaskExecutor(object):
+    """
+    Runs the tasks yielded by a task generator, running the tasks of thread
+    safe plugins ahead on a bounded pool of worker threads.
+
+    The generator's protocol is unchanged: the result of each task, or its
+    error, is sent back to the generator in the order the tasks are yielded,
+    on the calling thread. Since the generator only yields a task once it got
+    the result of the previous one, the tasks to run ahead are planned
+    upfront from a :class:`~.task_graph.TaskGraph`, typically of the active
+    tasks of the publish tree. A task only starts once the tasks it depends
+    on are done.
+
+    Tasks of plugins which aren't thread safe run on the calling thread when
+    they are yielded. Tasks yielded but not planned run on the calling thread
+    too. With a single worker, all the tasks run on the calling thread.
+
+    Once a task fails, no new task is started, unless failures are pruned: the
+    tasks depending on the failed task are then skipped while the other ones
+    keep running.
+
+    Tasks deactivated by a previous task aren't started by the workers, they
+    are only run if the generator yields them. The records logged by the
+    plugins on the worker threads are handled on the calling thread, since
+    the handlers of a publish logger may update the UI.
+    """
+
+    def __init__(self, max_workers, prune_failures=False):
+        """
+        :param int max_workers: The maximum number of tasks to run at once.
+        :param bool prune_failures: If ``True``, a failed task only prevents
+            the tasks depending on it from running. Errors are sent to the
+            generator instead of being raised.
+        """
+        self._max_workers = max_workers
+        self._prune_failures = prune_failures
+        self._condition = threading.Condition()
+        self._jobs = {}
+        self._ready_jobs = deque()
+        self._workers = []
+        self._stopped = False
+        self._failed = False
+        self._failed_tasks = []
+        self._log_relay = None
+
+    def run(self, task_generator, task_cb, task_graph):
+        """
+        Processes the tasks returned by the generator and invokes the callback
+        on each. The result of the callback is forwarded back to the generator.
+
+        :param task_generator: Iterator on the tasks to process.
+        :param task_cb: Callable processing a task, called with the task.
+        :param task_graph: The :class:`~.task_graph.TaskGraph` of the tasks
+            the generator is expected to yield. They are the only tasks run
+            ahead.
+        :returns: The tasks which failed or were skipped, in the order they
+            were yielded.
+        """
+        self._plan(task_graph)
+
+        worker_count = 0
+        if self._max_workers > 1:
+            worker_count = min(
+                self._max_workers,
+                len([job for job in self._jobs.itervalues() if job.thread_safe])
+            )
+        for index in range(worker_count):
+            worker = threading.Thread(
+                target=self._work,
+                args=(task_cb,),
+                name="PublishTaskWorker-%d" % index
+            )
+            worker.daemon = True
+            self._workers.append(worker)
+
+        if self._workers:
+            self._log_relay = _LogRelay(
+                set(job.task.plugin.logger for job in self._jobs.itervalues()),
+                self._workers
+            )
+
+        for worker in self._workers:
+            worker.start()
+
+        try:
+            # get the first task
+            task = None
+            try:
+                task = task_generator.next()
+            except StopIteration:
+                pass
+
+            while task:
+                return_value = self._wait(task, task_cb)
+                try:
+                    task = task_generator.send(return_value)
+                except StopIteration:
+                    break
+        finally:
+            self._stop()
+
+        return self._failed_tasks
+
+    def _plan(self, task_graph):
+        """
+        Creates the jobs of the planned tasks and queues the ones which are
+        ready to run.
+
+        :param task_graph: The :class:`~.task_graph.TaskGraph` of the planned
+            tasks.
+        """
+        # the graph is sorted, the dependencies of a task are planned first
+        for task in task_graph:
+            dependencies = [
+                self._jobs[dependency]
+                for dependency in task_graph.dependencies(task)
+            ]
+            job = _Job(task, dependencies)
+            self._jobs[task] = job
+            if job.thread_safe and not dependencies:
+                self._ready_jobs.append(job)
+
+    def _work(self, task_cb):
+        """
+        Runs the ready jobs of thread safe plugins until the executor stops.
+
+        :param task_cb: Callable processing a task.
+        """
+        while True:
+            with self._condition:
+                while not self._ready_jobs and not self._stopped:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                job = self._ready_jobs.popleft()
+
+                # an earlier task may have deactivated it, leave it to the
+                # generator
+                if not job.task.active:
+                    logger.debug("Not starting inactive task %s." % (job.task,))
+                    continue
+                job.state = _Job.RUNNING
+
+            self._run(job, task_cb)
+
+    def _wait(self, task, task_cb):
+        """
+        Returns the result of a task, running it on the calling thread if it
+        hasn't been started by a worker.
+
+        :param task: The task yielded by the generator.
+        :param task_cb: Callable processing a task.
+        :returns: The result of the callback, or its error if failures are
+            pruned.
+        :raises: The error raised by the callback, if any and failures aren't
+            pruned.
+        """
+        job = self._jobs.get(task)
+        if job is None:
+            job = _Job(task, [])
+            job.state = _Job.RUNNING
+        else:
+            self._claim(job)
+
+        if job.state == _Job.RUNNING:
+            self._run(job, task_cb)
+
+        if job.state == _Job.SKIPPED or job.exc_info:
+            self._failed_tasks.append(task)
+
+        if job.exc_info and not self._prune_failures:
+            (exc_type, exc_value, exc_traceback) = job.exc_info
+            raise exc_type, exc_value, exc_traceback
+
+        return job.result
+
+    def _claim(self, job):
+        """
+        Waits for a job to be done by a worker, or claims it to run it on the
+        calling thread.
+
+        :param job: The job of the task yielded by the generator. Its state is
+            running on return if it has been claimed.
+        """
+        while True:
+            with self._condition:
+                if job.state in (_Job.DONE, _Job.SKIPPED):
+                    break
+
+                # the generator is the authority on the order of the tasks,
+                # only wait for the dependencies that are running
+                if job.state == _Job.PENDING and not any(
+                    dependency.state == _Job.RUNNING
+                    for dependency in job.dependencies
+                ):
+                    if job in self._ready_jobs:
+                        self._ready_jobs.remove(job)
+                    job.state = _Job.RUNNING
+                    break
+
+                if self._log_relay:
+                    self._condition.wait(LOG_RELAY_INTERVAL)
+                else:
+                    self._condition.wait()
+
+            if self._log_relay:
+                self._log_relay.flush()
+
+        if self._log_relay:
+            self._log_relay.flush()
+
+    def _run(self, job, task_cb):
+        """
+        Runs a job and queues its dependents which become ready.
+
+        :param job: The job to run. Its state must be running.
+        :param task_cb: Callable processing a task.
+        """
+        try:
+            job.result = task_cb(job.task)
+        except Exception, e:
+            job.exc_info = sys.exc_info()
+            job.result = e
+
+        with self._condition:
+            job.state = _Job.DONE
+            if job.exc_info and self._prune_failures:
+                self._skip_dependents(job)
+            elif job.exc_info:
+                logger.debug("Task %s failed, no further task is started." % (job.task,))
+                self._failed = True
+                self._ready_jobs.clear()
+            else:
+                for dependent in job.dependents:
+                    dependent.unfinished_dependencies -= 1
+                    if (
+                        not self._failed and
+                        dependent.thread_safe and
+                        dependent.state == _Job.PENDING and
+                        not dependent.unfinished_dependencies
+                    ):
+                        self._ready_jobs.append(dependent)
+            self._condition.notify_all()
+
+    def _skip_dependents(self, failed_job):
+        """
+        Skips the pending jobs depending, directly or not, on a failed job.
+        Must be called with the condition acquired.
+
+        :param failed_job: The job whose task failed.
+        """
+        to_visit = list(failed_job.dependents)
+        while to_visit:
+            job = to_visit.pop()
+            if job.state != _Job.PENDING:
+                continue
+
+            logger.debug(
+                "Skipping task %s, it depends on the failed task %s." %
+                (job.task, failed_job.task)
+            )
+            job.state = _Job.SKIPPED
+            job.result = sgtk.TankError(
+                "Skipped because the task %s it depends on failed." %
+                (failed_job.task,)
+            )
+            if job in self._ready_jobs:
+                self._ready_jobs.remove(job)
+            to_visit.extend(job.dependents)
+
+    def _stop(self):
+        """
+        Stops the workers, once the tasks they are running are done.
+        """
+        with self._condition:
+            self._stopped = True
+            self._ready_jobs.clear()
+            self._condition.notify_all()
+
+        for worker in self._workers:
+            worker.join()
+
+        if self._log_relay:
+            self._log_relay.close()
+            self._log_relay = None
+
+
+class _LogRelay(object):
+    """
+    Defers the records logged on a set of worker threads to the handlers of a
+    set of loggers until the thread which created the relay flushes them.
+    """
+
+    def __init__(self, loggers, threads):
+        """
+        Starts deferring the records logged on the supplied threads and
+        handled by the handlers of the supplied loggers and of their ancestors
+        they propagate records to. The records of the other threads reaching
+        the same handlers are handled right away.
+
+        :param loggers: The loggers whose records to defer.
+        :param threads: The worker threads whose records to defer.
+        """
+        self._threads = frozenset(threads)
+        self._records = deque()
+        self._filters = []
+
+        handlers = set()
+        for publish_logger in loggers:
+            while publish_logger:
+                handlers.update(getattr(publish_logger, "handlers", []))
+                if not publish_logger.propagate:
+                    break
+                publish_logger = publish_logger.parent
+
+        for handler in handlers:
+            handler_filter = _DeferringFilter(self, handler)
+            handler.addFilter(handler_filter)
+            self._filters.append(handler_filter)
+
+    def defer(self, handler, record):
+        """
+        Defers a record logged on one of the worker threads.
+
+        :returns: ``True`` if the record can be handled now, on the thread
+            logging it.
+        """
+        if threading.current_thread() not in self._threads:
+            return True
+        self._records.append((handler, record))
+        return False
+
+    def flush(self):
+        """
+        Handles the deferred records. Must be called on the thread which
+        created the relay.
+        """
+        while self._records:
+            (handler, record) = self._records.popleft()
+            handler.handle(record)
+
+    def close(self):
+        """
+        Handles the deferred records and stops deferring new ones.
+        """
+        for handler_filter in self._filters:
+            handler_filter.handler.removeFilter(handler_filter)
+        self._filters = []
+        self.flush()
+
+
+class _DeferringFilter(logging.Filter):
+    """
+    A handler filter deferring the records logged on worker threads to a
+    :class:`_LogRelay`.
+    """
+
+    def __init__(self, relay, handler):
+        """
+        :param relay: The :class:`_LogRelay` to defer records to.
+        :param handler: The handler the filter is added to.
+        """
+        logging.Filter.__init__(self)
+        self.relay = relay
+        self.handler = handler
+
+    def filter(self, record):
+        return self.relay.defer(self.handler, record)
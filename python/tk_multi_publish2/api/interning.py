@@ -0,0 +1,137 @@
+# Copyright (c) 2018 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+from contextlib import contextmanager
+import json
+import threading
+
+import sgtk
+from .plugins import PublishPluginInstance
+from .plugins.setting import get_context_key
+
+logger = sgtk.platform.get_logger(__name__)
+
+
+class _Interns(threading.local):
+    """
+    Per-thread stack of the scopes interning deserialized objects.
+    """
+
+    def __init__(self):
+        """
+        Constructor.
+        """
+        self.scopes = []
+
+
+_interns = _Interns()
+
+
+class _InterningScope(object):
+    """
+    The contexts and plugin instances deserialized during a scope.
+    """
+
+    def __init__(self, load_plugin):
+        """
+        Constructor.
+
+        :param load_plugin: Callable returning the plugin instance for a
+            plugin name, hook path and context, or ``None``.
+        """
+        self.contexts = {}
+        self.plugins = {}
+        self.load_plugin = load_plugin
+
+
+@contextmanager
+def interning(load_plugin=None):
+    """
+    Creates a scope during which identical contexts and plugin instances
+    deserialized on this thread are only created once.
+
+    Nested scopes share the objects of the outermost scope.
+
+    .. code-block:: python
+
+        with interning():
+            tree = PublishTree.from_dict(tree_dict)
+
+    :param load_plugin: Optional callable used to create the plugin instances
+        of the outermost scope. It is called with the plugin name, hook path
+        and context. By default, a new plugin instance is created.
+    """
+    if _interns.scopes:
+        yield
+        return
+
+    _interns.scopes.append(_InterningScope(load_plugin))
+    try:
+        yield
+    finally:
+        _interns.scopes.pop()
+
+
+def intern_context(context_dict):
+    """
+    Returns the context for the supplied serialized context.
+
+    :param dict context_dict: A dictionary created by ``sgtk.Context.to_dict``.
+    :returns: A :class:`sgtk.Context` instance, shared with the identical
+        contexts deserialized during the current interning scope.
+    """
+    if not _interns.scopes:
+        return _create_context(context_dict)
+
+    contexts = _interns.scopes[0].contexts
+    key = json.dumps(context_dict, sort_keys=True)
+    context = contexts.get(key)
+    if context is None:
+        context = contexts[key] = _create_context(context_dict)
+    return context
+
+
+def intern_plugin(name, path, context):
+    """
+    Returns the publish plugin instance for the supplied plugin name, hook path
+    and context.
+
+    :param str name: The name of the plugin instance.
+    :param str path: The path to the plugin's hook.
+    :param context: The context used to resolve the plugin's settings.
+    :returns: A :class:`PublishPluginInstance`, shared with the identical
+        plugins deserialized during the current interning scope.
+    """
+    if not _interns.scopes:
+        return PublishPluginInstance(name, path, context)
+
+    scope = _interns.scopes[0]
+    key = (name, path, get_context_key(context))
+    plugin = scope.plugins.get(key)
+    if plugin is None:
+        if scope.load_plugin:
+            plugin = scope.load_plugin(name, path, context)
+        else:
+            plugin = PublishPluginInstance(name, path, context)
+        scope.plugins[key] = plugin
+    return plugin
+
+
+def _create_context(context_dict):
+    """
+    Deserializes a context.
+
+    :param dict context_dict: A dictionary created by ``sgtk.Context.to_dict``.
+    :returns: A :class:`sgtk.Context` instance.
+    """
+    return sgtk.Context.from_dict(
+        sgtk.platform.current_bundle().sgtk,
+        context_dict
+    )
@@ -8,21 +8,33 @@
 # agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
 # not expressly granted therein are reserved by Shotgun Software Inc.
 
-from collections import defaultdict
-import fnmatch
-import inspect
+from collections import OrderedDict
+from contextlib import contextmanager
 import os
+import sys
 import tempfile
+import threading
 
 import sgtk
 
 from .data import PublishData
+from .interning import intern_context
+from .plugins.plugin_stack import get_current_plugin
+from .plugins.setting import get_context_key
 from .task import PublishTask
+from .temp_files import session_temp_files
 
 logger = sgtk.platform.get_logger(__name__)
 
 _qt_pixmap_is_usable = None
 
+# Shared, immutable default for the item containers that are usually empty.
+# Items only allocate their own container when something is added to it.
+_EMPTY = ()
+
+# Marks a value inherited from the parent items that hasn't been resolved yet.
+_UNRESOLVED = object()
+
 
 def _is_qt_pixmap_usable():
     """
@@ -57,6 +69,158 @@ def _is_qt_pixmap_usable():
     return _qt_pixmap_is_usable
 
 
+class _UnallocatedPublishData(PublishData):
+    """
+    The empty local properties of a publish plugin which hasn't stored
+    anything on an item yet.
+
+    The properties are only allocated on the item once a value is stored.
+    """
+
+    __slots__ = ["_item", "_plugin_id"]
+
+    def __init__(self, item, plugin_id):
+        """
+        :param item: The :ref:`publish-api-item` the properties belong to.
+        :param str plugin_id: The id of the publish plugin.
+        """
+        object.__setattr__(self, "_item", item)
+        object.__setattr__(self, "_plugin_id", plugin_id)
+        super(_UnallocatedPublishData, self).__init__()
+
+    def __setattr__(self, name, value):
+        self[name] = value
+
+    def __setitem__(self, key, value):
+        plugin_properties = self._item._allocate_plugin_properties(
+            self._plugin_id, self)
+        if plugin_properties is not self:
+            # allocated through another view in the meantime
+            plugin_properties[key] = value
+        super(_UnallocatedPublishData, self).__setitem__(key, value)
+
+
+class _CreationJournals(threading.local):
+    """
+    Per-thread list of the journals recording created items.
+    """
+
+    def __init__(self):
+        """
+        Constructor.
+        """
+        self.journals = []
+
+
+_creation_journals = _CreationJournals()
+
+
+@contextmanager
+def record_created_items():
+    """
+    Creates a scope during which the items created on this thread are
+    recorded.
+
+    Items removed from their parent during the scope are dropped from the
+    record, along with their descendants.
+
+    .. code-block:: python
+
+        with record_created_items() as created_items:
+            collector.run_process_file(parent_item, path)
+
+        new_items = list(created_items)
+
+    :returns: An ordered dictionary whose keys are the created items, in
+        order of creation.
+    """
+    journal = OrderedDict()
+    _creation_journals.journals.append(journal)
+    try:
+        yield journal
+    finally:
+        _creation_journals.journals.remove(journal)
+
+
+class _TaskRefreshes(threading.local):
+    """
+    Per-thread count of the scopes deferring the refresh of item tasks.
+    """
+
+    def __init__(self):
+        """
+        Constructor.
+        """
+        self.deferred = 0
+
+
+_task_refreshes = _TaskRefreshes()
+
+
+@contextmanager
+def defer_task_refresh():
+    """
+    Creates a scope during which the tasks of the items are not refreshed when
+    their context is set.
+
+    This is used during collection, since the plugins are attached to all the
+    collected items at once when the collection is complete.
+    """
+    _task_refreshes.deferred += 1
+    try:
+        yield
+    finally:
+        _task_refreshes.deferred -= 1
+
+
+class _ImageValidations(threading.local):
+    """
+    Per-thread list of the image paths waiting to be validated.
+    """
+
+    def __init__(self):
+        """
+        Constructor.
+        """
+        self.batches = []
+
+
+_image_validations = _ImageValidations()
+
+
+@contextmanager
+def defer_image_validation():
+    """
+    Creates a scope during which the icons and thumbnails set from a path on
+    this thread are not validated right away.
+
+    When the outermost scope exits, each distinct path is validated once and
+    the items whose image can't be loaded are updated accordingly. This avoids
+    loading the same image for every item created during a collection.
+    """
+    batches = _image_validations.batches
+    if batches:
+        # the outermost scope validates everything
+        yield
+        return
+
+    batch = []
+    batches.append(batch)
+    try:
+        yield
+    finally:
+        batches.remove(batch)
+
+        validated_paths = {}
+        for (item, attr_name, path) in batch:
+            if getattr(item, attr_name) != path:
+                # the image was changed since
+                continue
+            if path not in validated_paths:
+                validated_paths[path] = item._validate_image(path)
+            setattr(item, attr_name, validated_paths[path])
+
+
 class PublishItem(object):
     """
     Publish items represent what is being published. They are the nodes in the
@@ -64,6 +228,7 @@ class PublishItem(object):
     """
 
     __slots__ = [
+        "__weakref__",
         "_active",
         "_allows_context_change",
         "_children",
@@ -76,6 +241,9 @@ class PublishItem(object):
         "_global_properties",
         "_icon_path",
         "_icon_pixmap",
+        "_inherited_context",
+        "_inherited_logger",
+        "_key",
         "_local_properties",
         "_logger",
         "_name",
@@ -86,6 +254,7 @@ class PublishItem(object):
         "_thumbnail_explicit",
         "_thumbnail_path",
         "_thumbnail_pixmap",
+        "_tree",
         "_type_display",
         "_type_spec"
     ]
@@ -104,63 +273,17 @@ class PublishItem(object):
         :param parent: An optional parent to assign to this deserialized item.
         """
 
-        # create the instance
-        new_item = PublishItem(
-            item_dict["name"],
-            item_dict["type_spec"],
-            item_dict["type_display"]
-        )
-
-        # populate all the instance data from the dictionary
-        new_item._active = item_dict["active"]
-        new_item._allows_context_change = item_dict["allows_context_change"]
-        new_item._description = item_dict["description"]
-        new_item._enabled = item_dict["enabled"]
-        new_item._expanded = item_dict["expanded"]
-        new_item._icon_path = item_dict["icon_path"]
-        new_item._thumbnail_enabled = item_dict["thumbnail_enabled"]
-        new_item._thumbnail_explicit = item_dict["thumbnail_explicit"]
-        new_item._thumbnail_path = item_dict["thumbnail_path"]
+        new_item = cls._from_record(item_dict, serialization_version, parent)
 
         # create the children of this item
-        for child_dict in item_dict["children"]:
-            new_item._children.append(
-                PublishItem.from_dict(
-                    child_dict,
-                    serialization_version,
-                    parent=new_item
-                )
-            )
-
-        # ---- handle the properties
-
-        # global
-        new_item._global_properties = PublishData.from_dict(
-            item_dict["global_properties"])
-
-        # local
-        for (k, prop_dict) in item_dict["local_properties"].iteritems():
-            new_item._local_properties[k] = PublishData.from_dict(prop_dict)
-
-        new_item._parent = parent
-        new_item._persistent = item_dict["persistent"]
-
-        # set the context
-        if item_dict["context"]:
-            new_item._context = sgtk.Context.from_dict(
-                sgtk.platform.current_bundle().sgtk,
-                item_dict["context"]
-            )
-
-        # finally, create any tasks for this item
-        for task_dict in item_dict["tasks"]:
-            new_item._tasks.append(
-                PublishTask.from_dict(
-                    task_dict,
-                    serialization_version,
-                    item=new_item
-                )
+        new_item._children = [
+            PublishItem.from_dict(
+                child_dict,
+                serialization_version,
+                parent=new_item
             )
+            for child_dict in item_dict["children"]
+        ] or _EMPTY
 
         return new_item
 
@@ -180,87 +303,47 @@ class PublishItem(object):
         # ensure data is maintained between the `to_dict` and `from_dict`
         # methods.
 
+        # NOTE: containers default to the shared `_EMPTY` tuple or to `None`
+        # and are allocated on first use, since most items never store
+        # anything in them.
+
         self._active = True
         self._allows_context_change = True
-        self._children = []
+        self._children = _EMPTY
         self._context = None
-        self._created_temp_files = []
+        self._created_temp_files = _EMPTY
         self._current_temp_file_path = None
         self._description = None
         self._enabled = True
         self._expanded = True
-        self._global_properties = PublishData()
+        self._global_properties = None
         self._icon_path = None
         self._icon_pixmap = None
-        self._local_properties = defaultdict(PublishData)
+        self._inherited_context = _UNRESOLVED
+        self._inherited_logger = _UNRESOLVED
+        self._key = None
+        self._local_properties = None
         self._logger = publish_logger
         self._name = name
         self._parent = parent
         self._persistent = False
-        self._tasks = []
+        self._tasks = _EMPTY
         self._thumbnail_enabled = True
         self._thumbnail_explicit = True
         self._thumbnail_path = None
         self._thumbnail_pixmap = None
+        self._tree = parent._tree if parent else None
         self._type_display = type_display
         self._type_spec = type_spec
 
-    def __del__(self):
-        """
-        Destructor.
-        """
-
-        # clean up temp files created by this item
-        for temp_file in self._created_temp_files:
-            if os.path.exists(temp_file):
-                try:
-                    os.remove(temp_file)
-                except Exception, e:
-                    logger.warning(
-                        "Could not remove temporary file '%s': %s" % (temp_file, e)
-                    )
-                else:
-                    logger.debug("Removed temp file '%s'" % temp_file)
-
     def to_dict(self):
         """
         Returns a dictionary representation of the publish item. Typically used
         during serialization.
         """
-
-        converted_local_properties = {}
-        for (k, prop) in self._local_properties.iteritems():
-            converted_local_properties[k] = prop.to_dict()
-
-        context_value = None
-
-        # check _context here to avoid traversing parent. if no context manually
-        # assigned to the item, it will inherit it from the parent or current
-        # bundle context on the other side of deserialization.
-        if self._context:
-            context_value = self._context.to_dict()
-
-        # build the full dictionary representation of this item
-        return {
-            "active": self.active,
-            "allows_context_change": self._allows_context_change,
-            "children": [c.to_dict() for c in self._children],
-            "context": context_value,
-            "description": self.description,
-            "enabled": self.enabled,
-            "expanded": self.expanded,
-            "global_properties": self._global_properties.to_dict(),
-            "icon_path": self._icon_path,
-            "local_properties": converted_local_properties,
-            "name": self.name,
-            "persistent": self.persistent,
-            "tasks": [t.to_dict() for t in self._tasks],
-            "thumbnail_enabled": self._thumbnail_enabled,
-            "thumbnail_explicit": self._thumbnail_explicit,
-            "thumbnail_path": self._thumbnail_path,
-            "type_display": self.type_display,
-            "type_spec": self.type_spec,
-        }
+        item_dict = self._to_record()
+        item_dict["children"] = [c.to_dict() for c in self._children]
+        return item_dict
 
     def __repr__(self):
         """Representation of the item as a string."""
@@ -279,6 +362,8 @@ class PublishItem(object):
 
         # create the task item and add it to the tree
         child_task = PublishTask(plugin, self)
+        if not self._tasks:
+            self._tasks = []
         self._tasks.append(child_task)
 
         return child_task
@@ -287,7 +372,7 @@ class PublishItem(object):
         """
         Clear all tasks for this item.
         """
-        self._tasks = []
+        self._tasks = _EMPTY
 
     def create_item(self, type_spec, type_display, name, context=None, properties=None):
         """
@@ -344,25 +429,83 @@ class PublishItem(object):
             purposes.
         :param str name: The name to represent the item in a UI. This can be an
             item name in a DCC or a file name.
+        :param context: The :class:`sgtk.Context` to set for the item.
+        :param dict properties: The initial properties of the item.
         """
+        return self.create_items(
+            [(type_spec, type_display, name, context, properties)]
+        )[0]
 
-        child_item = PublishItem(
-            name,
-            type_spec,
-            type_display,
-            None,
-            parent=self
-        )
-        self._children.append(child_item)
+    def create_items(self, specs):
+        """
+        Factory method for generating several new items at once.
 
-        # Set any initial global properties
-        child_item._global_properties = PublishData.from_dict(properties or {})
+        Each spec is a tuple of the :meth:`create_item` arguments:
+        ``(type_spec, type_display, name, context, properties)``. The context
+        and properties can be omitted.
+
+        .. code-block:: python
+
+            parent_item.create_items([
+                ("file.image", "Image File", "shot_010.exr"),
+                ("file.image", "Image File", "shot_020.exr", context),
+                ("file.video", "Movie File", "shot_010.mov", None, properties),
+            ])
+
+        Creating the items in a single call is faster than calling
+        :meth:`create_item` for each of them. The collector's
+        ``on_context_changed`` method and the task acceptance are run once for
+        all the new items sharing a context.
+
+        :param list specs: A list of item specs.
+        :returns: The list of created items, in the order of the specs.
+        """
+
+        new_items = []
+        items_by_context = OrderedDict()
+
+        for spec in specs:
+            (type_spec, type_display, name, context, properties) = \
+                tuple(spec) + (None,) * (5 - len(spec))
+
+            child_item = PublishItem(
+                name,
+                type_spec,
+                type_display,
+                None,
+                parent=self
+            )
 
-        # Set the context on the child item if defined
-        if context:
-            child_item.context = context
+            # Set any initial global properties
+            if properties:
+                child_item._global_properties = PublishData.from_dict(properties)
 
-        return child_item
+            # The context is applied to all the items sharing it at once below
+            if context:
+                child_item._context = context
+                items_by_context.setdefault(
+                    get_context_key(context), (context, [])
+                )[1].append(child_item)
+
+            new_items.append(child_item)
+
+        if not self._children:
+            self._children = []
+        self._children.extend(new_items)
+
+        for journal in _creation_journals.journals:
+            for child_item in new_items:
+                journal[child_item] = None
+
+        tree = self._get_tree()
+        if tree:
+            for child_item in new_items:
+                tree._item_created(child_item)
+
+        for (context, context_items) in items_by_context.itervalues():
+            PublishItem._set_context_for_items(context_items, context, self.logger)
+
+        return new_items
 
     def get_property(self, name, default_value=None):
         """
@@ -381,12 +524,14 @@ class PublishItem(object):
         :return: The value of the supplied property.
         """
 
-        local_properties = self._get_local_properties()
+        # reading doesn't allocate the local properties of the plugin
+        local_properties = self._find_plugin_properties(
+            self._get_current_plugin_id())
 
         if name in local_properties:
             return local_properties[name]
-        elif name in self.properties:
-            return self.properties[name]
+        elif self._global_properties and name in self._global_properties:
+            return self._global_properties[name]
         else:
             return default_value
 
@@ -429,7 +574,8 @@ class PublishItem(object):
 
             if os.path.getsize(temp_path) > 0:
                 self._current_temp_file_path = temp_path
-                self._created_temp_files.append(temp_path)
+                self._created_temp_files += (temp_path,)
+                self._get_temp_files().add(temp_path)
             else:
                 logger.debug(
                     "A zero-size thumbnail was written for %s, "
@@ -459,6 +605,16 @@ class PublishItem(object):
 
         self._children.remove(child_item)
 
+        tree = self._get_tree()
+        if tree:
+            tree._item_removed(child_item)
+
+        for journal in _creation_journals.journals:
+            if child_item in journal:
+                del journal[child_item]
+            for descendant in child_item.descendants:
+                journal.pop(descendant, None)
+
     def set_icon_from_path(self, path):
         """
         Sets the icon for the item given a path to an image on disk. This path
@@ -473,7 +629,7 @@ class PublishItem(object):
         """
         # Do not remove this. The original version of the API validated the icon
         # path and ensured it could be loaded into a pixmap.
-        self._icon_path = self._validate_image(path)
+        self._set_image_path("_icon_path", path)
 
     def set_thumbnail_from_path(self, path):
         """
@@ -491,7 +647,24 @@ class PublishItem(object):
         """
         # Do not remove this. The original version of the API validated the thumbnail
         # path and ensured it could be loaded into a pixmap.
-        self._thumbnail_path = self._validate_image(path)
+        self._set_image_path("_thumbnail_path", path)
+
+    def _set_image_path(self, attr_name, path):
+        """
+        Sets the path of an image once validated.
+
+        The validation is postponed when running inside a
+        :func:`defer_image_validation` scope.
+
+        :param str attr_name: Name of the attribute storing the image path.
+        :param str path: Path to a file on disk.
+        """
+        batches = _image_validations.batches
+        if batches and path:
+            setattr(self, attr_name, path)
+            batches[-1].append((self, attr_name, path))
+        else:
+            setattr(self, attr_name, self._validate_image(path))
 
     def _validate_image(self, path):
         """
@@ -596,17 +769,27 @@ class PublishItem(object):
         A generator that yields all the :ref:`publish-api-item` children and their children
         of this item.
         """
-        for item in self._visit_recursive():
+        for item in self._visit_depth_first():
             yield item
 
-    def _visit_recursive(self):
+    def _visit_depth_first(self):
         """
-        Yields all the children from an item and their descendants.
+        Yields all the children from an item and their descendants, depth
+        first.
+
+        The traversal keeps an explicit stack of children iterators rather
+        than nesting generators, so yielding an item doesn't get more
+        expensive with its depth in the tree.
         """
-        for c in self.children:
-            yield c
-            for sub_c in c.descendants:
-                yield sub_c
+        stack = [iter(self._children)]
+        while stack:
+            for child in stack[-1]:
+                yield child
+                # visit the child's own children before its next sibling
+                stack.append(iter(child._children))
+                break
+            else:
+                stack.pop()
 
     @property
     def context(self):
@@ -618,13 +801,10 @@ class PublishItem(object):
         had a context set explicitly, the publisher's launch context will be
         returned.
         """
-
-        if self._context:
-            return self._context
-        elif self.parent:
-            return self.parent.context
-        else:
-            return sgtk.platform.current_bundle().context
+        return (
+            self._get_explicit_context() or
+            sgtk.platform.current_bundle().context
+        )
 
     @context.setter
     def context(self, item_context):
@@ -643,9 +823,57 @@ class PublishItem(object):
 
         self._context = item_context
 
+        # The children inheriting the context need to resolve it again
+        for child in self.descendants:
+            child._inherited_context = _UNRESOLVED
+
         # Process any associated tasks or child items as well
         self._set_context_r(item_context)
 
+    def _get_explicit_context(self):
+        """
+        Returns the context explicitly set on this item or on its closest
+        parent.
+
+        The context inherited from the parents is cached until the context of
+        one of them changes.
+
+        :returns: A :class:`sgtk.Context` or ``None`` if no context was
+            explicitly set along the hierarchy.
+        """
+        if self._context:
+            return self._context
+
+        if self._inherited_context is _UNRESOLVED:
+            parent = self.parent
+            if parent:
+                self._inherited_context = parent._get_explicit_context()
+            else:
+                self._inherited_context = None
+
+        return self._inherited_context
+
+    @staticmethod
+    def _set_context_for_items(items, context, publish_logger):
+        """
+        Update the supplied new items, and their tasks, for their context.
+
+        :param list items: The items which were created with the context.
+        :param context: The :class:`sgtk.Context` of the items.
+        :param publish_logger: The logger to use for the publish plugins.
+        """
+
+        # Get the collector object for the new context
+        from .manager import PublishManager
+        collector = PublishManager.load_collector(context, publish_logger)
+
+        # Update the items' properties using the new collector
+        for item in items:
+            collector.run_on_context_changed(item)
+
+        # Next initialize the items' list of tasks
+        PublishItem._refresh_tasks_for_items(items, context, publish_logger)
+
     def _set_context_r(self, context):
         """
         Update context for item, plus any associated tasks or child items
@@ -673,55 +901,62 @@ class PublishItem(object):
         """
         Refresh the list of tasks for this item based on the provided Context object
         """
-        # Get the list of publish plugins for this context
+        PublishItem._refresh_tasks_for_items([self], context, publish_logger)
+
+    @staticmethod
+    def _refresh_tasks_for_items(items, context, publish_logger):
+        """
+        Refresh the list of tasks for the supplied items based on the provided
+        Context object.
+
+        The items are grouped by type so that the matching plugins are looked
+        up once per type and each plugin runs its acceptance logic once for
+        all the items of a group.
+
+        :param list items: The items to refresh the tasks for.
+        :param context: The context to get the publish plugins for.
+        :param publish_logger: The logger used by the publish plugins.
+        """
+        if _task_refreshes.deferred:
+            # the tasks will be refreshed once the items are all created
+            return
+
+        # Get the publish plugins for this context
         from .manager import PublishManager
-        context_plugins = PublishManager.load_publish_plugins(context, publish_logger)
+        plugin_index = PublishManager.load_publish_plugin_index(
+            context, publish_logger)
         logger.debug(
-            "Offering %s plugins for context: %s" % (len(context_plugins), context)
+            "Offering %s plugins for context: %s" %
+            (len(plugin_index.plugins), context)
         )
 
-        # Run the Item's filters on this list
-        valid_plugins = []
-        for context_plugin in context_plugins:
+        items_by_type = OrderedDict()
+        for item in items:
+            items_by_type.setdefault(item.type_spec, []).append(item)
 
-            logger.debug("Checking plugin: %s" % (context_plugin,))
-            if self._filters_match(context_plugin):
-                valid_plugins.append(context_plugin)
+        for (type_spec, type_items) in items_by_type.iteritems():
 
-        # Clear the current list of tasks
-        self._tasks = []
-        for plugin in valid_plugins:
+            # Clear the current list of tasks
+            for item in type_items:
+                item._tasks = _EMPTY
 
-            # Create a new task for this Item
-            task = self.add_task(plugin)
+            # Get the plugins matching the items' type
+            for plugin in plugin_index.get_plugins(type_spec):
 
-            # Run task acceptance
-            logger.debug("Running task acceptance method...")
-            task.accept()
-
-    def _filters_match(self, publish_plugin):
-        """
-        Returns ``True`` if the supplied item's type specification matches
-        the publish plugin's item filters.
+                # Create a new task for each item
+                tasks = [item.add_task(plugin) for item in type_items]
 
-        :param publish_plugin: The publish plugin instance to compare
-        """
-
-        for item_filter in publish_plugin.item_filters:
-            if fnmatch.fnmatch(self.type_spec, item_filter):
-                # there is a match!
+                # Run task acceptance
                 logger.debug(
-                    "Item %s with spec '%s' matches plugin filters: '%s'" %
-                    (self, self.type_spec, item_filter)
+                    "Running task acceptance method for %s items..." %
+                    (len(tasks),)
                 )
-                return True
-
-        # no filters match the item's type
-        logger.debug(
-            "Item %s with spec '%s' does not match any plugin filters: '%s'" %
-            (self, self.type_spec, publish_plugin.item_filters)
-        )
-        return False
+                accept_data_list = plugin.run_accept_many(
+                    [task.settings for task in tasks],
+                    type_items
+                )
+                for (task, accept_data) in zip(tasks, accept_data_list):
+                    task._process_accept_data(accept_data)
 
     @property
     def context_change_allowed(self):
@@ -865,6 +1100,25 @@ class PublishItem(object):
         """
         return self.parent is None
 
+    @property
+    def key(self):
+        """
+        A string identifying the item across collections, or ``None``.
+
+        Collectors can set a key on the items they create, built from what
+        identifies the item's content. For example, the path of the node an
+        item was collected from and its output path. When the session is
+        collected again incrementally, items with the same key and type are
+        considered unchanged and are kept, along with their tasks and
+        settings. Items without a key are always collected again.
+        """
+        return self._key
+
+    @key.setter
+    def key(self, new_key):
+        """Sets the key identifying the item."""
+        self._key = new_key
+
     @property
     def local_properties(self):
         """
@@ -929,10 +1183,13 @@ class PublishItem(object):
 
         if self._logger:
             return self._logger
-        elif self.parent:
-            return self.parent.logger
-        else:
-            return None
+
+        # the logger can't be changed, the inherited one is resolved once
+        if self._inherited_logger is _UNRESOLVED:
+            parent = self.parent
+            self._inherited_logger = parent.logger if parent else None
+
+        return self._inherited_logger
 
     @property
     def name(self):
@@ -993,6 +1250,8 @@ class PublishItem(object):
           properties dictionary. You should stick to data that can be
           JSON-serialized.
         """
+        if self._global_properties is None:
+            self._global_properties = PublishData()
         return self._global_properties
 
     @property
@@ -1133,23 +1392,207 @@ class PublishItem(object):
     ############################################################################
     # internal methods
 
+    @classmethod
+    def _from_record(cls, item_dict, serialization_version, parent=None):
+        """
+        Create a publish item instance given the supplied dictionary, without
+        creating its children. The supplied dictionary is typically the result
+        of calling ``_to_record`` on a publish item instance.
+
+        :param dict item_dict: A dictionary with the deserialized contents of
+            a publish item.
+        :param int serialization_version: The version of publish item
+            serialization used for this item.
+        :param parent: An optional parent to assign to this deserialized item.
+        """
+
+        # create the instance
+        new_item = PublishItem(
+            item_dict["name"],
+            item_dict["type_spec"],
+            item_dict["type_display"]
+        )
+
+        # populate all the instance data from the dictionary
+        new_item._active = item_dict["active"]
+        new_item._allows_context_change = item_dict["allows_context_change"]
+        new_item._description = item_dict["description"]
+        new_item._enabled = item_dict["enabled"]
+        new_item._expanded = item_dict["expanded"]
+        new_item._icon_path = item_dict["icon_path"]
+        new_item._key = item_dict.get("key")
+        new_item._thumbnail_enabled = item_dict["thumbnail_enabled"]
+        new_item._thumbnail_explicit = item_dict["thumbnail_explicit"]
+        new_item._thumbnail_path = item_dict["thumbnail_path"]
+
+        # ---- handle the properties
+
+        # global
+        if item_dict["global_properties"]:
+            new_item._global_properties = PublishData.from_dict(
+                item_dict["global_properties"])
+
+        # local
+        for (k, prop_dict) in item_dict["local_properties"].iteritems():
+            new_item._get_plugin_properties(k).update(prop_dict)
+
+        new_item._parent = parent
+        new_item._persistent = item_dict["persistent"]
+
+        # set the context
+        if item_dict["context"]:
+            new_item._context = intern_context(item_dict["context"])
+
+        # finally, create any tasks for this item
+        new_item._tasks = [
+            PublishTask.from_dict(
+                task_dict,
+                serialization_version,
+                item=new_item
+            )
+            for task_dict in item_dict["tasks"]
+        ] or _EMPTY
+
+        return new_item
+
+    def _to_record(self):
+        """
+        Returns a dictionary representation of the publish item, without its
+        children. Typically used during streaming serialization, where every
+        item is written on its own.
+        """
+
+        converted_local_properties = {}
+        for (k, prop) in (self._local_properties or {}).iteritems():
+            converted_local_properties[k] = prop.to_dict()
+
+        global_properties = {}
+        if self._global_properties:
+            global_properties = self._global_properties.to_dict()
+
+        context_value = None
+
+        # check _context here to avoid traversing parent. if no context manually
+        # assigned to the item, it will inherit it from the parent or current
+        # bundle context on the other side of deserialization.
+        if self._context:
+            context_value = self._context.to_dict()
+
+        # build the full dictionary representation of this item
+        return {
+            "active": self.active,
+            "allows_context_change": self._allows_context_change,
+            "context": context_value,
+            "description": self.description,
+            "enabled": self.enabled,
+            "expanded": self.expanded,
+            "global_properties": global_properties,
+            "icon_path": self._icon_path,
+            "key": self._key,
+            "local_properties": converted_local_properties,
+            "name": self.name,
+            "persistent": self.persistent,
+            "tasks": [t.to_dict() for t in self._tasks],
+            "thumbnail_enabled": self._thumbnail_enabled,
+            "thumbnail_explicit": self._thumbnail_explicit,
+            "thumbnail_path": self._thumbnail_path,
+            "type_display": self.type_display,
+            "type_spec": self.type_spec,
+        }
+
+    def _set_parent(self, parent):
+        """
+        Moves this item under the supplied parent.
+
+        The caller is responsible for updating the list of children of the
+        previous and new parents.
+
+        :param parent: The new parent :ref:`publish-api-item`.
+        """
+        self._parent = parent
+
+        # the item and its children need to resolve what they inherit again
+        self._inherited_context = _UNRESOLVED
+        self._inherited_logger = _UNRESOLVED
+        for item in self.descendants:
+            item._inherited_context = _UNRESOLVED
+            item._inherited_logger = _UNRESOLVED
+
+    def _attach_to_tree(self, tree_ref):
+        """
+        Attaches the item to a tree.
+
+        :param tree_ref: A weak reference to the :ref:`publish-api-tree`.
+        """
+        self._tree = tree_ref
+
+    def _get_tree(self):
+        """
+        Returns the :ref:`publish-api-tree` this item belongs to or ``None`` if
+        the item was created outside of a tree.
+        """
+        if self._tree:
+            return self._tree()
+        return None
+
+    def _get_temp_files(self):
+        """
+        Returns the registry tracking the temporary files created by this
+        item.
+
+        Items that belong to a tree use the tree's registry. Other items use
+        the session registry, which is cleared when the interpreter exits.
+        """
+        tree = self._get_tree()
+        if tree:
+            return tree._temp_files
+        return session_temp_files
+
+    def _release_temp_files(self):
+        """
+        Forgets about the temporary files created by this item.
+
+        :returns: The list of temporary files that were created by this item.
+        """
+        temp_files = self._created_temp_files
+        self._created_temp_files = _EMPTY
+        self._current_temp_file_path = None
+        return temp_files
+
     def _get_local_properties(self):
         """
         Return properties local to the currently executing publish plugin.
 
-        This is done by walking up the call stack to find a caller that is a
-        Hook. This method will raise if no caller in the stack is a hook.
+        See :meth:`_get_current_plugin_id` for how the plugin is determined.
+        """
+        return self._get_plugin_properties(self._get_current_plugin_id())
+
+    def _get_current_plugin_id(self):
+        """
+        Return the id of the currently executing publish plugin.
+
+        The plugin instances register themselves while running their hook
+        methods, which makes this lookup cheap. Hooks calling in through other
+        paths (custom UIs, direct hook calls) are resolved by walking up the
+        call stack to find a caller that is a Hook. This method will raise if
+        no caller in the stack is a hook.
         """
 
+        plugin = get_current_plugin()
+        if plugin is not None:
+            return plugin.id
+
         hook_object = None
 
-        for frame_record in inspect.stack():
-            frame_object = frame_record[0]
-            if frame_object:
-                calling_object = frame_object.f_locals.get("self")
-                if calling_object and isinstance(calling_object, sgtk.hook.Hook):
-                    hook_object = calling_object
-                    break
+        # walk the frames directly rather than via inspect.stack(), which
+        # reads the source lines of every frame from disk
+        frame_object = sys._getframe(1)
+        while frame_object:
+            calling_object = frame_object.f_locals.get("self")
+            if calling_object and isinstance(calling_object, sgtk.hook.Hook):
+                hook_object = calling_object
+                break
+            frame_object = frame_object.f_back
 
         if not hook_object:
             raise AttributeError(
@@ -1163,22 +1606,47 @@ class PublishItem(object):
                 (hook_object,)
             )
 
-        plugin_id = hook_object.plugin.id
+        return hook_object.plugin.id
+
+    def _get_plugin_properties(self, plugin_id):
+        """
+        Return the properties local to the supplied publish plugin.
+
+        If the plugin hasn't stored anything on the item yet, an empty
+        :class:`PublishData` is returned which is only allocated on the item
+        once a value is stored in it.
 
-        return self._local_properties[plugin_id]
+        :param str plugin_id: The id of the publish plugin.
+        :returns: A :class:`PublishData` instance.
+        """
+        plugin_properties = self._find_plugin_properties(plugin_id)
+        if plugin_properties is _EMPTY:
+            plugin_properties = _UnallocatedPublishData(self, plugin_id)
+        return plugin_properties
 
-    def _traverse_item(self, item):
+    def _find_plugin_properties(self, plugin_id):
         """
-        A recursive method for generating all items in the tree, depth-first.
+        Return the properties local to the supplied publish plugin, for
+        reading only.
+
+        :param str plugin_id: The id of the publish plugin.
+        :returns: A :class:`PublishData` instance or the shared, empty
+            ``_EMPTY`` container if the plugin hasn't stored anything on the
+            item.
         """
+        if not self._local_properties:
+            return _EMPTY
+        return self._local_properties.get(plugin_id, _EMPTY)
 
-        # yield each child item
-        for child_item in item.children:
-            yield child_item
+    def _allocate_plugin_properties(self, plugin_id, plugin_properties):
+        """
+        Stores the properties local to a publish plugin on the item, unless
+        they were already allocated.
 
-            # now recurse over the each child's children. the recursion will
-            # yield  the grand children back to this method. we need to yield
-            # these back to the calling method. in later versions of Python, the
-            # `yield from` could be used to make this cleaner/clearer
-            for grandchild_item in self._traverse_item(child_item):
-                yield grandchild_item
+        :param str plugin_id: The id of the publish plugin.
+        :param plugin_properties: The :class:`PublishData` instance to store.
+        :returns: The :class:`PublishData` instance stored on the item.
+        """
+        if self._local_properties is None:
+            self._local_properties = {}
+        return self._local_properties.setdefault(plugin_id, plugin_properties)
@@ -0,0 +1,325 @@
+# Copyright (c) 2018 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Checkpoints the progress of a publish so that it can be resumed after it was
+interrupted, without redoing the work already done.
+
+.. code-block:: python
+
+    manager.collect_session()
+    manager.create_journal("/path/to/publish.journal")
+    manager.validate()
+    manager.publish()   # interrupted
+    ...
+
+    # in a new session
+    manager = PublishManager()
+    manager.resume("/path/to/publish.journal")
+"""
+
+from collections import OrderedDict
+import os
+import threading
+
+import sgtk
+from .tree import PublishTree, _json_to_objects
+
+logger = sgtk.platform.get_logger(__name__)
+
+# the phases recorded in a journal, in order of execution
+PHASE_VALIDATE = "validate"
+PHASE_PUBLISH = "publish"
+PHASE_FINALIZE = "finalize"
+PHASES = (PHASE_VALIDATE, PHASE_PUBLISH, PHASE_FINALIZE)
+
+# the outcomes of a task
+OUTCOME_SUCCEEDED = "succeeded"
+OUTCOME_FAILED = "failed"
+
+# the outcome of the records marking that the tree was saved again once a
+# phase was complete
+OUTCOME_CHECKPOINT = "checkpoint"
+
+# the phases after which the whole tree is saved again. the tasks which
+# completed these phases only count as completed once the tree is saved,
+# since validation sets item properties publishing relies on, like the
+# publish path and version, that aren't recorded individually.
+CHECKPOINTED_PHASES = (PHASE_VALIDATE,)
+
+# the item properties set by publish plugins which are recorded when a task
+# completes a phase, and restored when resuming
+RECORDED_PROPERTIES = ("publish_paths_expanded", "sg_publish_data_list")
+
+
+class PublishJournal(object):
+    """
+    A journal of the tasks which completed a phase of a publish.
+
+    The journal is a file with a json record per line, a header referencing
+    the publish tree saved next to it followed by a record for each task
+    completing a phase. Records are written to disk as soon as they are
+    added, a partially written record left by an interrupted publish is
+    ignored.
+
+    Tasks are identified by the position of their item in the tree and their
+    position on the item, the tree must therefore be the one saved with the
+    journal.
+
+    Once the validation phase is complete, the tree is saved again with the
+    properties set by the validated tasks, see :meth:`checkpoint`. Tasks only
+    count as validated once the tree holding their properties is saved.
+    """
+
+    JOURNAL_FORMAT = "publish_journal"
+    JOURNAL_VERSION = 1
+
+    def __init__(self, path):
+        """
+        Opens an existing journal.
+
+        :param str path: The path to the journal file.
+        :raises: :class:`~sgtk.TankError` if the file isn't a journal.
+        """
+        self._path = path
+        self._lock = threading.Lock()
+        self._records = []
+
+        with open(path, "r") as journal_file:
+            lines = journal_file.readlines()
+
+        # records are appended on a new line if the last one was cut short
+        self._needs_newline = bool(lines) and not lines[-1].endswith("\n")
+
+        try:
+            header = sgtk.util.json.loads(lines[0])
+        except (IndexError, ValueError):
+            header = None
+
+        if not isinstance(header, dict) or header.get("format") != self.JOURNAL_FORMAT:
+            raise sgtk.TankError("'%s' is not a publish journal." % (path,))
+
+        if header.get("version") != self.JOURNAL_VERSION:
+            raise sgtk.TankError(
+                "Unrecognized publish journal version %s in '%s'." %
+                (header.get("version"), path)
+            )
+
+        self._tree_path = os.path.join(os.path.dirname(path), header["tree_path"])
+        self._recorded_properties = header["recorded_properties"]
+
+        for line in lines[1:]:
+            try:
+                self._records.append(
+                    sgtk.util.json.loads(line, object_hook=_json_to_objects)
+                )
+            except ValueError:
+                # the last record may have been cut short by a crash
+                logger.debug("Ignoring incomplete journal record: %r" % (line,))
+
+    @classmethod
+    def create(cls, path, tree, recorded_properties=RECORDED_PROPERTIES):
+        """
+        Saves a publish tree and creates an empty journal for it.
+
+        The tree is saved next to the journal, with the same name and a
+        ``.tree`` extension.
+
+        :param str path: The path to the journal file to create.
+        :param tree: The :class:`~.PublishTree` being published.
+        :param list recorded_properties: The names of the item properties to
+            record when a task completes a phase.
+        :returns: A :class:`PublishJournal` instance.
+        """
+        tree_path = "%s.tree" % (os.path.splitext(path)[0],)
+        tree.save_file(tree_path)
+
+        header = {
+            "format": cls.JOURNAL_FORMAT,
+            "version": cls.JOURNAL_VERSION,
+            # relative to the journal so that both can be moved together
+            "tree_path": os.path.basename(tree_path),
+            "recorded_properties": list(recorded_properties),
+        }
+        with open(path, "w") as journal_file:
+            _write_durably(journal_file, header)
+
+        return cls(path)
+
+    @property
+    def path(self):
+        """The path to the journal file."""
+        return self._path
+
+    @property
+    def tree_path(self):
+        """The path to the publish tree saved with the journal."""
+        return self._tree_path
+
+    @property
+    def records(self):
+        """
+        The list of recorded task outcomes, in order. Each record is a
+        dictionary with the ``task`` id, the ``phase``, the ``outcome``, the
+        ``error`` message of failed tasks and the recorded ``properties`` and
+        ``local_properties`` of the task's item.
+        """
+        return list(self._records)
+
+    def record(self, task_id, task, phase, outcome, error=None):
+        """
+        Records the outcome of a task for a phase and writes it to disk.
+
+        :param str task_id: The id of the task. See :func:`get_task_ids`.
+        :param task: The :class:`~.PublishTask` which completed the phase.
+        :param str phase: The phase completed.
+        :param str outcome: The outcome of the task.
+        :param error: Optional error raised by the task.
+        """
+        item = task.item
+        local_properties = item._get_plugin_properties(task.plugin.id)
+        record = {
+            "task": task_id,
+            "phase": phase,
+            "outcome": outcome,
+            "error": str(error) if error else None,
+            "properties": dict(
+                (name, item.properties[name])
+                for name in self._recorded_properties if name in item.properties
+            ),
+            "local_properties": dict(
+                (name, local_properties[name])
+                for name in self._recorded_properties if name in local_properties
+            ),
+        }
+
+        # tasks can complete concurrently when published in parallel
+        with self._lock:
+            with open(self._path, "a") as journal_file:
+                if self._needs_newline:
+                    journal_file.write("\n")
+                    self._needs_newline = False
+                try:
+                    _write_durably(journal_file, record)
+                except (TypeError, ValueError), e:
+                    # the outcome matters more than the properties
+                    logger.warning(
+                        "The properties of task %s can't be recorded in the "
+                        "publish journal: %s" % (task, e)
+                    )
+                    record["properties"] = {}
+                    record["local_properties"] = {}
+                    _write_durably(journal_file, record)
+            self._records.append(record)
+
+    def checkpoint(self, tree, phase):
+        """
+        Saves the tree again once a phase is complete, along with the item
+        properties set by its tasks, and records it.
+
+        The tree is written next to the previous one first so that an
+        interrupted save leaves the previous tree untouched.
+
+        :param tree: The :class:`~.PublishTree` being published.
+        :param str phase: The phase completed.
+        """
+        with self._lock:
+            new_tree_path = "%s.new" % (self._tree_path,)
+            tree.save_file(new_tree_path)
+            if os.path.exists(self._tree_path):
+                # renaming doesn't replace existing files on Windows
+                os.remove(self._tree_path)
+            os.rename(new_tree_path, self._tree_path)
+
+            record = {
+                "task": None,
+                "phase": phase,
+                "outcome": OUTCOME_CHECKPOINT,
+                "error": None,
+                "properties": {},
+                "local_properties": {},
+            }
+            with open(self._path, "a") as journal_file:
+                if self._needs_newline:
+                    journal_file.write("\n")
+                    self._needs_newline = False
+                _write_durably(journal_file, record)
+            self._records.append(record)
+
+    def completed_tasks(self, phase):
+        """
+        Returns the ids of the tasks which completed a phase successfully.
+
+        For the phases followed by a :meth:`checkpoint`, only the tasks which
+        completed the phase before the last checkpoint are returned.
+
+        :param str phase: The phase to look up.
+        :returns: A set of task ids.
+        """
+        completed = set()
+        checkpointed = set()
+        for record in self._records:
+            if record["phase"] != phase:
+                continue
+            if record["outcome"] == OUTCOME_CHECKPOINT:
+                checkpointed = set(completed)
+            elif record["outcome"] == OUTCOME_SUCCEEDED:
+                completed.add(record["task"])
+            else:
+                completed.discard(record["task"])
+
+        if phase in CHECKPOINTED_PHASES:
+            return checkpointed
+        return completed
+
+    def restore(self, tree):
+        """
+        Restores the recorded properties of the tasks which completed a phase
+        on the items of the supplied tree.
+
+        :param tree: The :class:`~.PublishTree` loaded from :attr:`tree_path`.
+        """
+        tasks = dict((task_id, task) for (task, task_id) in get_task_ids(tree).iteritems())
+        for record in self._records:
+            task = tasks.get(record["task"])
+            if task is None or record["outcome"] != OUTCOME_SUCCEEDED:
+                continue
+
+            item = task.item
+            item.properties.update(record["properties"])
+            item._get_plugin_properties(task.plugin.id).update(
+                record["local_properties"]
+            )
+
+
+def get_task_ids(tree):
+    """
+    Returns the ids journals identify the tasks of a tree with.
+
+    :param tree: A :class:`~.PublishTree`.
+    :returns: An ordered dictionary of the ids by task, in tree order.
+    """
+    task_ids = OrderedDict()
+    for (item_index, item) in enumerate(tree):
+        for (task_index, task) in enumerate(item.tasks):
+            task_ids[task] = "%d/%d" % (item_index, task_index)
+    return task_ids
+
+
+def _write_durably(file_obj, record):
+    """
+    Writes a record on its own line and waits for it to be written to disk.
+
+    :param file file_obj: The journal file.
+    :param dict record: The record to write.
+    """
+    PublishTree._write_record(file_obj, record)
+    file_obj.flush()
+    os.fsync(file_obj.fileno())
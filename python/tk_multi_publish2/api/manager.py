@@ -8,46 +8,206 @@
 # agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
 # not expressly granted therein are reserved by Shotgun Software Inc.
 
+from collections import OrderedDict
+from contextlib import contextmanager
+import fnmatch
+import os
+import re
+
 import sgtk
 
+from .item import (
+    PublishItem,
+    defer_image_validation,
+    defer_task_refresh,
+    record_created_items
+)
+from .executor import ParallelTaskExecutor
+from . import journal as publish_journal
+from .journal import PublishJournal
+from .task_graph import TaskGraph
+from .interning import interning
 from .tree import PublishTree
 from .plugins import CollectorPluginInstance, PublishPluginInstance
 from .plugins import setting
+from .plugins.setting import get_context_key
 from ..util import Threaded
 
 logger = sgtk.platform.get_logger(__name__)
 
 class PluginsCache(Threaded):
     """
-    Cache of plugin settings per context.
+    Cache of plugin instances per context.
+
+    The cache is bounded. When full, the least recently used entry is evicted
+    to make room for new entries.
     """
-    def __init__(self):
+
+    # default maximum number of cached entries
+    DEFAULT_MAX_SIZE = 200
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE):
         """
         Constructor.
+
+        :param int max_size: Maximum number of entries to keep in the cache.
         """
         Threaded.__init__(self)
-        self._cache = dict()
+        self._cache = OrderedDict()
+        self._max_size = max_size
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
 
     @Threaded.exclusive
     def get(self, plugin_type, context):
         """
-        Retrieve the cached settings for a given context.
+        Retrieve the cached plugins for a given context.
 
-        :param context: The context for which we desire settings.
+        :param plugin_type: The type of plugins to retrieve.
+        :param context: The context for which we desire plugins.
 
-        :returns: The settings dictionary or None
+        :returns: The list of plugins or None
         """
-        return self._cache.get((plugin_type, repr(context)))
+        key = (plugin_type, get_context_key(context))
+        plugins = self._cache.pop(key, None)
+        if plugins is None:
+            self._misses += 1
+            return None
+
+        # re-insert the entry to mark it as the most recently used
+        self._cache[key] = plugins
+        self._hits += 1
+        return plugins
 
     @Threaded.exclusive
     def add(self, plugin_type, context, plugins):
         """
         Cache plugins for a given context.
 
-        :param context: Context for which these settings need to be cached.
-        :param settings: Settings to cache.
+        :param plugin_type: The type of plugins to cache.
+        :param context: Context for which these plugins need to be cached.
+        :param plugins: Plugins to cache.
+        """
+        key = (plugin_type, get_context_key(context))
+        self._cache.pop(key, None)
+        self._cache[key] = plugins
+
+        while len(self._cache) > self._max_size:
+            self._cache.popitem(last=False)
+            self._evictions += 1
+
+    @Threaded.exclusive
+    def invalidate(self, context=None):
+        """
+        Removes cached plugins.
+
+        :param context: If supplied, only the plugins cached for this context
+            are removed. Otherwise, the whole cache is cleared.
+        """
+        if context is None:
+            self._cache.clear()
+            return
+
+        context_key = get_context_key(context)
+        for key in list(self._cache):
+            if key[1] == context_key:
+                del self._cache[key]
+
+    @property
+    def max_size(self):
+        """Maximum number of entries kept in the cache."""
+        return self._max_size
+
+    @property
+    def hits(self):
+        """Number of lookups that were answered from the cache."""
+        return self._hits
+
+    @property
+    def misses(self):
+        """Number of lookups that found nothing in the cache."""
+        return self._misses
+
+    @property
+    def evictions(self):
+        """Number of entries evicted to keep the cache within its bounds."""
+        return self._evictions
+
+    def __len__(self):
+        """Number of entries currently in the cache."""
+        return len(self._cache)
+
+
+class PluginFilterIndex(Threaded):
+    """
+    Index of the publish plugins matching each item type.
+
+    The item filters of each plugin are compiled into a single regular
+    expression when the index is built. The plugins matching a given type
+    specification are computed once and memoized.
+    """
+
+    def __init__(self, plugins):
+        """
+        Constructor.
+
+        :param list plugins: The publish plugin instances to index.
+        """
+        Threaded.__init__(self)
+        self._plugins = plugins
+        self._matches = dict()
+
+        self._matchers = []
+        for plugin in plugins:
+            item_filters = plugin.item_filters
+            if not item_filters:
+                continue
+            pattern = "|".join(
+                "(?:%s)" % (fnmatch.translate(os.path.normcase(item_filter)),)
+                for item_filter in item_filters
+            )
+            self._matchers.append((plugin, re.compile(pattern)))
+
+    @property
+    def plugins(self):
+        """The list of plugins this index was built from."""
+        return self._plugins
+
+    def get_plugins(self, type_spec):
+        """
+        Returns the plugins with item filters matching the supplied item type.
+
+        :param str type_spec: The item type specification to match.
+
+        :returns: A list of publish plugin instances, in configuration order.
+        """
+        # this is the hot path, avoid taking the lock for memoized types
+        matching_plugins = self._matches.get(type_spec)
+        if matching_plugins is None:
+            matching_plugins = self._match(type_spec)
+        return matching_plugins
+
+    @Threaded.exclusive
+    def _match(self, type_spec):
         """
-        self._cache[(plugin_type, repr(context))] = plugins
+        Matches the supplied item type against the plugins' filters and
+        memoizes the result.
+
+        :param str type_spec: The item type specification to match.
+
+        :returns: A list of publish plugin instances.
+        """
+        normalized_type_spec = os.path.normcase(type_spec)
+        matching_plugins = [
+            plugin for (plugin, matcher) in self._matchers
+            if matcher.match(normalized_type_spec)
+        ]
+        logger.debug(
+            "Item type '%s' matches plugins: %s" % (type_spec, matching_plugins)
+        )
+        self._matches[type_spec] = matching_plugins
+        return matching_plugins
 
 
 class PublishManager(object):
@@ -59,7 +219,9 @@ class PublishManager(object):
         "_logger",
         "_tree",
         "_collector_instance",
-        "_post_phase_hook"
+        "_post_phase_hook",
+        "_journal",
+        "_task_monitor"
     ]
 
     ############################################################################
@@ -70,9 +232,21 @@ class PublishManager(object):
     CONFIG_PLUGIN_DEFINITIONS = "publish_plugins"
     CONFIG_POST_PHASE_HOOK_PATH = "post_phase"
 
+    # key used to cache the item filter index of the publish plugins
+    PLUGIN_FILTER_INDEX = "publish_plugin_filter_index"
+
+    # key used to cache the publish plugins created for deserialized tasks
+    DESERIALIZED_PUBLISH_PLUGINS = "deserialized_publish_plugins"
+
     # a lookup of context to publish plugins.
     _plugins_cache = PluginsCache()
 
+    # the item filter indexes and the plugins created for deserialized tasks
+    # are cached separately, so that they don't evict the configured plugins
+    # and have their own statistics.
+    _plugin_index_cache = PluginsCache()
+    _deserialized_plugins_cache = PluginsCache()
+
     ############################################################################
     # special item property keys
 
@@ -80,7 +254,7 @@ class PublishManager(object):
     # are collected via a file path. we can use this later on to determine which
     # items were added to the tree via path collection and what that original
     # path was (client code could add multiple items for a single path).
-    PROPERTY_KEY_COLLECTED_FILE_PATH = "__collected_file_path__"
+    PROPERTY_KEY_COLLECTED_FILE_PATH = PublishTree.PROPERTY_KEY_COLLECTED_FILE_PATH
 
     ############################################################################
     # instance methods
@@ -104,6 +278,12 @@ class PublishManager(object):
         # the underlying tree representation of the items to publish
         self._tree = PublishTree(self._logger)
 
+        # the journal the outcome of the tasks is recorded in, if any
+        self._journal = None
+
+        # the object notified when tasks are processed, if any
+        self._task_monitor = None
+
         # collector instance for this context
         self._collector_instance = None
 
@@ -143,16 +323,17 @@ class PublishManager(object):
 
         for file_path in file_paths:
 
-            # get a list of all items in the tree prior to collection
-            items_before = list(self.tree)
-
             if self._path_already_collected(file_path):
                 logger.debug(
                     "Skipping previously collected file path: '%s'" %
                     (file_path,)
                 )
-            else:
-                logger.debug("Collecting file path: %s" % (file_path,))
+                continue
+
+            logger.debug("Collecting file path: %s" % (file_path,))
+
+            # record the items created during collection
+            with _collecting() as created_items:
 
                 # we supply the root item of the tree for parenting of items
                 # that are collected.
@@ -161,11 +342,7 @@ class PublishManager(object):
                     file_path
                 )
 
-            # get a list of all items in the tree after collection
-            items_after = list(self.tree)
-
-            # calculate which items are new
-            new_file_items = list(set(items_after) - set(items_before))
+            new_file_items = list(created_items)
 
             if not new_file_items:
                 logger.debug("No items collected for path: %s" % (file_path,))
@@ -179,6 +356,7 @@ class PublishManager(object):
                     file_item.persistent = True
                 file_item.properties[self.PROPERTY_KEY_COLLECTED_FILE_PATH] = \
                     file_path
+                self.tree._add_to_path_index(file_item)
 
             # attach the appropriate plugins to the new items
             self._attach_plugins(new_file_items)
@@ -187,7 +365,7 @@ class PublishManager(object):
 
         return new_items
 
-    def collect_session(self):
+    def collect_session(self, incremental=False):
         """
         Run the collection logic to populate the tree with items to publish.
 
@@ -198,50 +376,151 @@ class PublishManager(object):
         everything. Any externally added file path items, or other items, marked
         as :py:attr:`~.api.PublishItem.persistent` will be retained.
 
-        :returns: A list of the created :ref:`publish-api-item` instances.
-        """
-
-        # this will clear the tree of all non-persistent items.
-        self.tree.clear(clear_persistent=False)
+        When collecting incrementally, the newly collected items are compared
+        with the items already in the tree using their
+        :py:attr:`~.api.PublishItem.key`. Unchanged items are kept, along with
+        their tasks and settings, and only the items that changed are created
+        or removed.
 
-        # get a list of all items in the tree prior to collection (this should
-        # be only the persistent items)
-        items_before = list(self.tree)
-
-        # we supply the root item of the tree for parenting of items that
-        # are collected.
-        self._collector_instance.run_process_current_session(
-            self.tree.root_item)
-
-        # get a list of all items in the tree after collection
-        items_after = list(self.tree)
+        :param bool incremental: If ``True``, keep the unchanged items.
+        :returns: A list of the created :ref:`publish-api-item` instances. When
+            collecting incrementally, the unchanged items kept in the tree are
+            returned in place of the newly collected ones.
+        """
 
-        # calculate which items are new
-        new_items = list(set(items_after) - set(items_before))
+        if incremental:
+            old_items = [
+                item for item in self.tree.root_item.children
+                if not item.persistent
+            ]
+        else:
+            # this will clear the tree of all non-persistent items.
+            self.tree.clear(clear_persistent=False)
+
+        # record the items created during collection
+        with _collecting() as created_items:
+
+            # we supply the root item of the tree for parenting of items that
+            # are collected.
+            self._collector_instance.run_process_current_session(
+                self.tree.root_item)
+
+        new_items = list(created_items)
+        items_to_attach = new_items
+
+        if incremental:
+            substitutes = self.tree._reconcile_items(
+                old_items,
+                [item for item in new_items if item.parent == self.tree.root_item]
+            )
+            logger.debug(
+                "Keeping %s unchanged items out of %s collected." %
+                (len(substitutes), len(new_items))
+            )
+            items_to_attach = [
+                item for item in new_items if item not in substitutes
+            ]
+            new_items = [substitutes.get(item, item) for item in new_items]
 
         # attach the appropriate plugins to the new items
-        if new_items:
-            self._attach_plugins(new_items)
+        if items_to_attach:
+            self._attach_plugins(items_to_attach)
 
         return new_items
 
-    def load(self, path):
+    def load(self, path, select=None):
         """
         Load a publish tree that was serialized and saved to disk.
 
         This is a convenience method that replaces the manager's underlying
         :ref:`publish-api-tree` with the deserialized contents stored in the
         supplied file.
+
+        :param str path: The path to a serialized publish tree.
+        :param select: Optional callable selecting the items to load, such as
+            the ones returned by :meth:`PublishTree.item_selector`. See
+            :meth:`PublishTree.load` for details.
         """
-        self._tree = PublishTree.load_file(path)
+        # the tasks of the loaded tree share the plugins already loaded
+        with interning(load_plugin=self.load_deserialized_publish_plugin):
+            new_tree = PublishTree.load_file(path, select=select)
+
+        # the temporary files of the replaced tree are no longer needed
+        self._tree._clear_temp_files()
+        self._tree = new_tree
+
+        # the journal refers to the tasks of the replaced tree
+        self._journal = None
 
-    def save(self, path):
+    def save(self, path, compress=False):
         """
         Saves a publish tree to disk.
+
+        :param str path: The path to save the tree to.
+        :param bool compress: If ``True``, the file is gzip compressed.
+        """
+        self._tree.save_file(path, compress=compress)
+
+    def create_journal(self, path):
         """
-        self._tree.save_file(path)
+        Saves the publish tree and starts recording the outcome of the tasks
+        processed by the following phases in a journal, so that the publish
+        can be resumed with :meth:`resume` if it is interrupted.
+
+        Once a task completes a phase, its outcome and the output properties
+        of its item, like ``sg_publish_data_list``, are written to disk. Once
+        the validation is complete, the tree is saved again with the
+        properties set while validating, like ``publish_path``. The tasks
+        which already completed the phase being run are then skipped, whether
+        they are yielded by the default task generator or by a custom one.
+
+        The tree shouldn't be modified while the journal is recorded, since
+        tasks are identified by their position in the tree.
+
+        :param str path: The path to the journal file. The tree is saved next
+            to it.
+        :returns: The :class:`~.journal.PublishJournal` instance.
+        """
+        self._journal = PublishJournal.create(path, self._tree)
+        return self._journal
+
+    def resume(self, journal, max_workers=1):
+        """
+        Resumes an interrupted publish recorded in a journal.
+
+        The tree saved with the journal is loaded and the properties recorded
+        for the tasks which completed a phase are restored. The validate,
+        publish and finalize phases are then run for the remaining tasks only,
+        stopping after validation if some tasks fail to validate. If the
+        publish was interrupted while validating, all the tasks are validated
+        again. The outcome of the tasks keeps being recorded in the journal.
+
+        :param journal: The path to a journal created by
+            :meth:`create_journal`, or a :class:`~.journal.PublishJournal`
+            instance.
+        :param int max_workers: The maximum number of tasks to publish in
+            parallel. See :meth:`publish`.
+        :returns: The list of ``(task, error)`` tuples of the tasks which
+            failed to validate, see :meth:`validate`.
+        """
+        if not isinstance(journal, PublishJournal):
+            journal = PublishJournal(journal)
+
+        self.load(journal.tree_path)
+        journal.restore(self._tree)
+        self._journal = journal
 
-    def _process_tasks(self, task_generator, task_cb):
+        failed_to_validate = self.validate()
+        if failed_to_validate:
+            return failed_to_validate
+
+        self.publish(max_workers=max_workers)
+        self.finalize()
+        return []
+
+    def _process_tasks(self, task_generator, task_cb, max_workers=1,
+                       prune_failures=False, phase=None, result_error=None,
+                       completed_result=None):
         """
         Processes tasks returned by the generator and invokes the passed in
         callback on each. The result of the task callback will be forwarded back
@@ -252,11 +531,54 @@ class PublishManager(object):
             The signature is
             def task_cb(task):
                 ...
+        :param int max_workers: The maximum number of tasks to process in
+            parallel. See :class:`~.executor.ParallelTaskExecutor`.
+        :param bool prune_failures: If ``True``, a failed task only prevents
+            the tasks depending on it from being processed.
+        :param str phase: The phase the tasks are processed for. When a
+            journal is recorded, the outcome of the tasks is recorded for this
+            phase and the tasks which already completed it are skipped.
+        :param result_error: Optional callable returning the error of a task
+            from the result of the callback, for callbacks reporting errors
+            rather than raising them.
+        :param completed_result: The result sent to the generator for the
+            tasks which already completed the phase.
+        :returns: The tasks which failed or were skipped when failures are
+            pruned.
         """
+        # the workers start the tasks planned upfront, ahead of the generator.
+        # a custom generator only decides which task comes next once it got
+        # the result of the previous one, so its tasks can't be planned.
+        if task_generator and max_workers > 1:
+            raise sgtk.TankError(
+                "Tasks can't be processed in parallel with a custom task "
+                "generator."
+            )
+
+        if self._task_monitor is not None and phase:
+            task_cb = self._monitored_task_cb(phase, task_cb, result_error)
+
+        completed_tasks = set()
+        if self._journal is not None and phase:
+            (task_cb, completed_tasks) = self._journal_task_cb(
+                phase, task_cb, result_error, completed_result)
+
+        use_executor = max_workers > 1 or prune_failures
+
+        task_graph = None
+        if use_executor or not task_generator:
+            # the tasks the default generator would yield are scheduled
+            task_graph = self._task_graph(exclude=completed_tasks)
+
         # calling code can supply its own generator for tasks to process. if not
         # supplied, we'll use our own generator.
         if not task_generator:
-            task_generator = self._task_generator()
+            task_generator = self._task_generator(task_graph)
+
+        if use_executor:
+            return ParallelTaskExecutor(max_workers, prune_failures).run(
+                task_generator, task_cb, task_graph
+            )
 
         # get the first task
         task = None
@@ -278,7 +600,9 @@ class PublishManager(object):
             except StopIteration:
                 break
 
-    def validate(self, task_generator=None):
+        return []
+
+    def validate(self, task_generator=None, force=False):
         """
         Validate items to be published.
 
@@ -307,7 +631,13 @@ class PublishManager(object):
 
             publish_manager.validate(task_generator=all_tasks_generator)
 
+        Tasks which passed a previous validation are not validated again if
+        nothing they depend on changed since, see :meth:`PublishTask.validate`.
+        Supply ``force`` to validate them regardless, for example when the
+        data checked by a plugin in Shotgun may have changed.
+
         :param task_generator: A generator of :class:`~PublishTask` instances.
+        :param bool force: If ``True``, all the tasks are validated.
 
         :returns: A list of tuples of (:class:`~PublishTask`,
             optional :class:`Exception`) that failed to validate.
@@ -316,6 +646,9 @@ class PublishManager(object):
         # we'll use this to build a list of tasks that failed to validate
         failed_to_validate = []
 
+        # and this one to refresh the state of the tasks that passed
+        validated = []
+
         def task_cb(task):
             error = None
             # do the actual validation and send the status back to the generator
@@ -323,7 +656,7 @@ class PublishManager(object):
             # the UI's generator to update the display of the task as it is
             # being processed.
             try:
-                is_valid = task.validate()
+                is_valid = task.validate(force=force)
             except Exception, e:
                 is_valid = False
                 error = e
@@ -332,19 +665,39 @@ class PublishManager(object):
             # failed.
             if not is_valid:
                 failed_to_validate.append((task, error))
+            else:
+                validated.append(task)
 
             return (is_valid, error)
 
-        self._process_tasks(task_generator, task_cb)
+        self._process_tasks(
+            task_generator,
+            task_cb,
+            phase=publish_journal.PHASE_VALIDATE,
+            result_error=lambda result: (
+                None if result[0] else result[1] or "Validation failed."
+            ),
+            completed_result=(True, None)
+        )
+
+        # the tasks of an item may set its properties while validating, the
+        # tasks are unchanged for the next validation if they stay as is
+        for task in validated:
+            task._refresh_validation_fingerprint()
 
         # execute the post validate method of the phase phase hook
         self._post_phase_hook.post_validate(
             self.tree,
         )
 
+        # the properties set while validating are needed to publish, save
+        # them in case the publish has to be resumed
+        if self._journal is not None:
+            self._journal.checkpoint(self.tree, publish_journal.PHASE_VALIDATE)
+
         return failed_to_validate
 
-    def publish(self, task_generator=None):
+    def publish(self, task_generator=None, max_workers=1, prune_failures=False):
         """
         Publish items in the tree.
 
@@ -374,13 +727,42 @@ class PublishManager(object):
         If an exception is raised by one of the published task, the publishing
         is aborted and the exception is raised back to the caller.
 
+        The tasks of plugins declaring themselves thread safe can be published
+        in parallel by supplying ``max_workers``. These tasks are then started
+        on worker threads as soon as the tasks they depend on are published.
+        Since the tasks are planned upfront, from the active tasks of the
+        active items, ``max_workers`` can't be combined with a custom
+        ``task_generator``. See :attr:`~.base_hooks.PublishPlugin.thread_safe`
+        and :attr:`~.base_hooks.PublishPlugin.run_after`.
+
+        Rather than aborting the publish, ``prune_failures`` only skips the
+        tasks depending on a failed task: the tasks of its item declared to
+        run after it and the tasks of the child items. The error of the
+        failed and skipped tasks is sent to the generator and the tasks are
+        returned.
+
         :param task_generator: A generator of :class:`~PublishTask` instances.
+        :param int max_workers: The maximum number of tasks to publish in
+            parallel. Tasks are published one at a time by default.
+        :raises: :class:`~sgtk.TankError` if ``max_workers`` is supplied
+            along with a custom ``task_generator``.
+        :param bool prune_failures: If ``True``, the tasks which don't depend
+            on a failed task are still published.
+        :returns: The list of tasks which failed or were skipped.
         """
-        self._process_tasks(task_generator, lambda task: task.publish())
+        failed_tasks = self._process_tasks(
+            task_generator,
+            lambda task: task.publish(),
+            max_workers=max_workers,
+            prune_failures=prune_failures,
+            phase=publish_journal.PHASE_PUBLISH
+        )
 
         # execute the post publish method of the phase phase hook
         self._post_phase_hook.post_publish(self.tree)
 
+        return failed_tasks
+
     def finalize(self, task_generator=None):
         """
         Finalize items in the tree.
@@ -413,7 +795,11 @@ class PublishManager(object):
 
         :param task_generator: A generator of :class:`~PublishTask` instances.
         """
-        self._process_tasks(task_generator, lambda task: task.finalize())
+        self._process_tasks(
+            task_generator,
+            lambda task: task.finalize(),
+            phase=publish_journal.PHASE_FINALIZE
+        )
 
         # execute the post finalize method of the phase phase hook
         self._post_phase_hook.post_finalize(self.tree)
@@ -430,6 +816,33 @@ class PublishManager(object):
         """
         return self._logger
 
+    @property
+    def journal(self):
+        """
+        Returns the :class:`~.journal.PublishJournal` the outcome of the tasks
+        is recorded in, or ``None``. See :meth:`create_journal`.
+        """
+        return self._journal
+
+    @property
+    def task_monitor(self):
+        """
+        An object notified when the tasks are processed by the validate,
+        publish and finalize phases, or ``None``.
+
+        Its ``task_started(task, phase)`` method is called right before a task
+        is processed and its ``task_finished(task, phase, error)`` method right
+        after, with the error of the task or ``None`` if it succeeded. Both are
+        called on the thread processing the task, which is a worker thread for
+        the tasks published in parallel.
+        """
+        return self._task_monitor
+
+    @task_monitor.setter
+    def task_monitor(self, monitor):
+        """Sets the object notified when tasks are processed."""
+        self._task_monitor = monitor
+
     @property
     def collected_files(self):
         """
@@ -460,10 +873,24 @@ class PublishManager(object):
         For each item supplied, given it's context, load the appropriate plugins
         and add any matching tasks. If any tasks exist on the supplied items,
         they will be removed.
+
+        The items are processed in groups sharing the same context so that the
+        plugins are looked up and run their acceptance logic once per group.
         """
+        items_by_context = OrderedDict()
         for item in items:
-            logger.debug("Processing item: %s" % (item,))
-            item.refresh_tasks(item.context, self._logger)
+            context = item.context
+            (_, context_items) = items_by_context.setdefault(
+                get_context_key(context), (context, []))
+            context_items.append(item)
+
+        for (context, context_items) in items_by_context.itervalues():
+            logger.debug(
+                "Processing %s items for context: %s" %
+                (len(context_items), context)
+            )
+            PublishItem._refresh_tasks_for_items(
+                context_items, context, self._logger)
 
     @classmethod
     def load_collector(cls, context, publish_logger):
@@ -505,6 +932,11 @@ class PublishManager(object):
         plugin_defs = setting.get_setting_for_context(
             cls.CONFIG_PLUGIN_DEFINITIONS, context).value
 
+        # the plugins are all resolved against the same app settings. share
+        # them so that each plugin only has to resolve its own entry.
+        settings_resolver = setting.PluginSettingsResolver(
+            cls.CONFIG_PLUGIN_DEFINITIONS, context)
+
         # build up a list of all configured publish plugins here
         plugins = []
 
@@ -520,7 +952,8 @@ class PublishManager(object):
                 publish_plugin_instance_name,
                 publish_plugin_hook_path,
                 context,
-                publish_logger
+                publish_logger,
+                settings_resolver=settings_resolver
             )
             plugins.append(plugin_instance)
             logger.debug("Created publish plugin: %s" % (plugin_instance,))
@@ -530,34 +963,161 @@ class PublishManager(object):
 
         return plugins
 
+    @classmethod
+    def load_deserialized_publish_plugin(cls, name, path, context):
+        """
+        Returns a publish plugin instance for a deserialized task.
+
+        The plugins configured for the context are reused when they match the
+        serialized plugin. Otherwise, a new plugin instance is created and
+        cached so that subsequent loads can reuse it.
+
+        :param str name: The name of the plugin instance.
+        :param str path: The path to the plugin's hook.
+        :param context: The context used to resolve the plugin's settings.
+        :returns: A :class:`PublishPluginInstance`.
+        """
+        for plugin in cls._plugins_cache.get(cls.CONFIG_PLUGIN_DEFINITIONS, context) or []:
+            if plugin.name == name and plugin.path == path:
+                return plugin
+
+        # the deserialized plugins are stored by name and path, the lookup
+        # is cached for the context and updated in place.
+        plugins = cls._deserialized_plugins_cache.get(
+            cls.DESERIALIZED_PUBLISH_PLUGINS, context)
+        if plugins is None:
+            plugins = {}
+            cls._deserialized_plugins_cache.add(
+                cls.DESERIALIZED_PUBLISH_PLUGINS, context, plugins)
+
+        plugin = plugins.get((name, path))
+        if plugin is None:
+            plugin = plugins.setdefault(
+                (name, path), PublishPluginInstance(name, path, context))
+
+        return plugin
+
+    @classmethod
+    def load_publish_plugin_index(cls, context, publish_logger):
+        """
+        Given a context, returns a :class:`PluginFilterIndex` of the
+        corresponding, configured publish plugins.
+        """
+        plugins = cls.load_publish_plugins(context, publish_logger)
+
+        # return the cached index if it was built for the current plugins
+        indexes = cls._plugin_index_cache.get(cls.PLUGIN_FILTER_INDEX, context)
+        if indexes and indexes[0].plugins is plugins:
+            return indexes[0]
+
+        plugin_index = PluginFilterIndex(plugins)
+
+        # ensure the index is cached
+        cls._plugin_index_cache.add(cls.PLUGIN_FILTER_INDEX, context, [plugin_index])
+
+        return plugin_index
+
     def _path_already_collected(self, file_path):
         """
         Returns ``True`` if the supplied file path has been collected into the
         tree already. ``False`` otherwise.
         """
 
-        # check each persistent item for a collected file path. if it matches
-        # the supplied path, then the path has already been collected.
-        for item in self.tree.persistent_items:
-            if self.PROPERTY_KEY_COLLECTED_FILE_PATH in item.properties:
-                collected_path = \
-                    item.properties[self.PROPERTY_KEY_COLLECTED_FILE_PATH]
-                if collected_path == file_path:
-                    return True
+        # the tree indexes the items by the path they were collected from. if
+        # any of them is still persistent, the path has already been collected.
+        for item in self.tree.find_by_path(file_path):
+            if item.persistent:
+                return True
 
         # no existing, persistent item was collected with this path
         return False
 
-    def _task_generator(self):
+    def _journal_task_cb(self, phase, task_cb, result_error=None,
+                         completed_result=None):
         """
-        This method generates all active tasks for all active items in the
-        publish tree and yields them to the caller.
+        Wraps a task callback to record the outcome of the tasks in the
+        manager's journal.
+
+        The tasks which already completed the phase aren't processed again,
+        so that they are also skipped when yielded by a custom generator.
+
+        :param str phase: The phase the tasks are processed for.
+        :param task_cb: Callable processing a task.
+        :param result_error: Optional callable returning the error of a task
+            from the result of the callback.
+        :param completed_result: The result returned for the tasks which
+            already completed the phase.
+        :returns: A tuple with the wrapped callback and the set of tasks which
+            already completed the phase.
+        """
+        journal = self._journal
+        task_ids = publish_journal.get_task_ids(self.tree)
 
-        This is the default task generator used by validate, publish, and
-        finalize if no custom task generator is supplied.
+        completed_task_ids = journal.completed_tasks(phase)
+        completed_tasks = set(
+            task for (task, task_id) in task_ids.iteritems()
+            if task_id in completed_task_ids
+        )
+
+        def journaled_task_cb(task):
+            task_id = task_ids.get(task)
+            if task_id is None:
+                # not a task of the tree the journal was created for
+                return task_cb(task)
+
+            if task in completed_tasks:
+                logger.debug("Skipping completed task: %s" % (task,))
+                return completed_result
+
+            try:
+                result = task_cb(task)
+            except Exception, e:
+                journal.record(task_id, task, phase, publish_journal.OUTCOME_FAILED, e)
+                raise
+
+            error = result_error(result) if result_error else None
+            if error:
+                journal.record(task_id, task, phase, publish_journal.OUTCOME_FAILED, error)
+            else:
+                journal.record(task_id, task, phase, publish_journal.OUTCOME_SUCCEEDED)
+            return result
+
+        return (journaled_task_cb, completed_tasks)
+
+    def _monitored_task_cb(self, phase, task_cb, result_error=None):
         """
+        Wraps a task callback to notify the manager's task monitor.
 
-        self.logger.debug("Iterating over tasks...")
+        :param str phase: The phase the tasks are processed for.
+        :param task_cb: Callable processing a task.
+        :param result_error: Optional callable returning the error of a task
+            from the result of the callback.
+        :returns: The wrapped callback.
+        """
+        monitor = self._task_monitor
+
+        def monitored_task_cb(task):
+            monitor.task_started(task, phase)
+            try:
+                result = task_cb(task)
+            except Exception, e:
+                monitor.task_finished(task, phase, e)
+                raise
+
+            monitor.task_finished(
+                task, phase, result_error(result) if result_error else None)
+            return result
+
+        return monitored_task_cb
+
+    def _task_graph(self, exclude=None):
+        """
+        Builds the :class:`~.task_graph.TaskGraph` of all active tasks for all
+        active items in the publish tree.
+
+        :param exclude: Optional set of tasks to leave out of the graph.
+        """
+        tasks = []
         for item in self.tree:
 
             if not item.active:
@@ -572,12 +1132,63 @@ class PublishManager(object):
                 )
                 continue
 
-            logger.debug("Processing item: %s" % (item,))
             for task in item.tasks:
 
                 if not task.active:
                     logger.debug("Skipping inactive task: %s" % (task,))
                     continue
 
-                status = (yield task)
-                logger.debug("Task %s status: %s" % (task, status))
+                if exclude and task in exclude:
+                    logger.debug("Skipping completed task: %s" % (task,))
+                    continue
+
+                tasks.append(task)
+
+        return TaskGraph(tasks)
+
+    def _task_generator(self, task_graph=None):
+        """
+        This method generates all active tasks for all active items in the
+        publish tree and yields them to the caller, in an order satisfying the
+        dependencies declared by their plugins.
+
+        This is the default task generator used by validate, publish, and
+        finalize if no custom task generator is supplied.
+
+        The tasks are planned upfront, the tasks or items deactivated by the
+        previous tasks are skipped when their turn comes.
+
+        :param task_graph: The :class:`~.task_graph.TaskGraph` of the active
+            tasks, if already built.
+        """
+
+        self.logger.debug("Iterating over tasks...")
+        if task_graph is None:
+            task_graph = self._task_graph()
+
+        for task in task_graph:
+
+            if not task.active or not task.item.active:
+                logger.debug("Skipping task deactivated while processing: %s" % (task,))
+                continue
+
+            logger.debug("Processing task: %s" % (task,))
+            status = (yield task)
+            logger.debug("Task %s status: %s" % (task, status))
+
+
+@contextmanager
+def _collecting():
+    """
+    Creates the scope in which the collector runs.
+
+    The images of the collected items are validated and their tasks are
+    refreshed once the collection is complete, rather than for each item.
+
+    :returns: An ordered dictionary whose keys are the items created during
+        the collection. See :func:`~.item.record_created_items`.
+    """
+    with record_created_items() as created_items, \
+            defer_image_validation(), \
+            defer_task_refresh():
+        yield created_items
@@ -13,7 +13,7 @@ import copy
 import traceback
 
 import sgtk
-from .instance_base import PluginInstanceBase
+from .instance_base import PluginInstanceBase, process_events
 from .setting import get_setting_for_context
 
 logger = sgtk.platform.get_logger(__name__)
@@ -45,13 +45,8 @@ class CollectorPluginInstance(PluginInstanceBase):
         implementation.
         """
         bundle = sgtk.platform.current_bundle()
-        hook = bundle.create_hook_instance(
-            path,
-            base_class=bundle.base_hooks.CollectorPlugin,
-            plugin=self
-        )
-        hook.id = path
-        return hook
+        return self._create_shared_hook_instance(
+            path, bundle.base_hooks.CollectorPlugin)
 
     def get_plugin_settings(self, context=None):
         """
@@ -100,9 +95,7 @@ class CollectorPluginInstance(PluginInstanceBase):
                 extra = _get_error_extra_info(error_msg)
             )
         finally:
-            if not sgtk.platform.current_engine().has_ui:
-                from sgtk.platform.qt import QtCore
-                QtCore.QCoreApplication.processEvents()
+            process_events()
 
     def run_create_properties_widget(self, parent, items):
         """
@@ -171,9 +164,7 @@ class CollectorPluginInstance(PluginInstanceBase):
                 extra = _get_error_extra_info(error_msg)
             )
         finally:
-            if not sgtk.platform.current_engine().has_ui:
-                from sgtk.platform.qt import QtCore
-                QtCore.QCoreApplication.processEvents()
+            process_events()
 
     def run_on_context_changed(self, item):
         """
@@ -213,9 +204,7 @@ class CollectorPluginInstance(PluginInstanceBase):
             if success_msg:
                 self._logger.debug(success_msg)
         finally:
-            if not sgtk.platform.current_engine().has_ui:
-                from sgtk.platform.qt import QtCore
-                QtCore.QCoreApplication.processEvents()
+            process_events()
 
 
 def _get_error_extra_info(error_msg):
@@ -8,12 +8,198 @@
 # agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
 # not expressly granted therein are reserved by Shotgun Software Inc.
 
+from contextlib import contextmanager
+import inspect
+import os
+import threading
 import traceback
+
 import sgtk
 
+from ...util import Threaded
+
 logger = sgtk.platform.get_logger(__name__)
 
 
+class _EventProcessing(object):
+    """
+    Process-wide count of the scopes during which plugins don't process the
+    pending Qt events.
+    """
+
+    def __init__(self):
+        """
+        Constructor.
+        """
+        self.disabled = 0
+
+
+_event_processing = _EventProcessing()
+
+
+@contextmanager
+def disable_event_processing():
+    """
+    Creates a scope during which the plugins don't process the pending Qt
+    events after running hook code.
+
+    This is used by the batch runner, which runs without a Qt event loop.
+    """
+    _event_processing.disabled += 1
+    try:
+        yield
+    finally:
+        _event_processing.disabled -= 1
+
+
+def process_events():
+    """
+    Processes the pending Qt events after running hook code without a UI,
+    unless event processing is disabled.
+
+    Events are only processed on the main thread, hooks running on worker
+    threads leave them to it.
+    """
+    if _event_processing.disabled:
+        return
+
+    if not isinstance(threading.current_thread(), threading._MainThread):
+        return
+
+    if not sgtk.platform.current_engine().has_ui:
+        from sgtk.platform.qt import QtCore
+        QtCore.QCoreApplication.processEvents()
+
+
+class HookClassRegistry(Threaded):
+    """
+    Process-wide registry of the hook classes created for plugins.
+
+    Creating a hook instance through the bundle resolves the hook expression
+    and derives the hook class chain every time. Plugins are instantiated for
+    every context a publish spans, so the resulting classes are registered
+    here and reused to create lightweight instances.
+
+    The same hook expression resolves to different files for different
+    bundles, configurations and engines, classes are therefore registered
+    for the bundle resolving the expression. A registered class is only
+    reused while the files it was loaded from are unchanged on disk. The
+    registry is cleared when the app is destroyed.
+    """
+
+    def __init__(self):
+        """
+        Constructor.
+        """
+        Threaded.__init__(self)
+        self._classes = dict()
+
+    @Threaded.exclusive
+    def get(self, bundle, path, base_class):
+        """
+        Retrieve the registered hook class for a given hook path and base class.
+
+        :param bundle: The bundle resolving the hook path.
+        :param str path: The hook path, as configured.
+        :param base_class: The base class injected into the hook chain.
+
+        :returns: The hook class or None
+        """
+        key = (_get_resolution_key(bundle), path, base_class)
+        registered = self._classes.get(key)
+        if registered is None:
+            return None
+
+        (hook_class, file_stamps) = registered
+        if _get_file_stamps(file_stamps) != file_stamps:
+            logger.debug("Hook files changed on disk, reloading: %s" % (path,))
+            del self._classes[key]
+            return None
+
+        return hook_class
+
+    @Threaded.exclusive
+    def add(self, bundle, path, base_class, hook_class):
+        """
+        Register the hook class for a given hook path and base class.
+
+        :param bundle: The bundle which resolved the hook path.
+        :param str path: The hook path, as configured.
+        :param base_class: The base class injected into the hook chain.
+        :param hook_class: The hook class resolved for the path.
+        """
+        file_stamps = _get_file_stamps(_get_hook_files(hook_class, base_class))
+        self._classes[(_get_resolution_key(bundle), path, base_class)] = (
+            hook_class, file_stamps)
+
+    @Threaded.exclusive
+    def clear(self):
+        """
+        Clears all registered hook classes.
+        """
+        self._classes.clear()
+
+
+def _get_resolution_key(bundle):
+    """
+    Returns what the files a hook expression resolves to depend on: the
+    bundle's location, the pipeline configuration and the engine.
+
+    :param bundle: The bundle resolving the hook expression.
+    :returns: A hashable key.
+    """
+    return (
+        bundle.disk_location,
+        bundle.sgtk.pipeline_configuration.get_path(),
+        bundle.engine.instance_name,
+    )
+
+
+def _get_hook_files(hook_class, base_class):
+    """
+    Returns the files the classes of a hook chain were loaded from.
+
+    :param hook_class: The most derived class of the hook chain.
+    :param base_class: The base class injected into the hook chain.
+    :returns: A list of file paths.
+    """
+    hook_files = []
+    for cls in inspect.getmro(hook_class):
+        if cls is base_class:
+            break
+        try:
+            hook_file = inspect.getfile(cls)
+        except TypeError:
+            # built-in class
+            continue
+        # the source file is the one edited
+        if hook_file.endswith((".pyc", ".pyo")):
+            hook_file = hook_file[:-1]
+        hook_files.append(hook_file)
+    return hook_files
+
+
+def _get_file_stamps(file_paths):
+    """
+    Returns the modification time of the supplied files.
+
+    :param file_paths: The paths of the files to stamp.
+    :returns: A dictionary of the modification time of each file, ``None``
+        for missing files.
+    """
+    stamps = {}
+    for file_path in file_paths:
+        try:
+            stamps[file_path] = os.path.getmtime(file_path)
+        except OSError:
+            stamps[file_path] = None
+    return stamps
+
+
+# hook classes shared by all plugin instances
+hook_class_registry = HookClassRegistry()
+
+
 class PluginInstanceBase(object):
     """
     A base class for functionality common to plugin hooks (collectors and
@@ -72,11 +258,31 @@ class PluginInstanceBase(object):
         :return: A hook instance
         """
         bundle = sgtk.platform.current_bundle()
-        hook = bundle.create_hook_instance(
-            path,
-            base_class=bundle.base_hooks.PluginBase,
-            plugin=self
-        )
+        return self._create_shared_hook_instance(
+            path, bundle.base_hooks.PluginBase)
+
+    def _create_shared_hook_instance(self, path, base_class):
+        """
+        Create a hook instance for this plugin, reusing the hook class
+        registered for the path and base class if possible.
+
+        :param str path: The path to the hook file.
+        :param base_class: The base class to inject into the hook chain.
+        :return: A hook instance
+        """
+        bundle = sgtk.platform.current_bundle()
+
+        hook_class = hook_class_registry.get(bundle, path, base_class)
+        if hook_class:
+            hook = hook_class(bundle, plugin=self)
+        else:
+            hook = bundle.create_hook_instance(
+                path,
+                base_class=base_class,
+                plugin=self
+            )
+            hook_class_registry.add(bundle, path, base_class, hook.__class__)
+
         hook.id = path
         return hook
 
@@ -0,0 +1,58 @@
+# Copyright (c) 2018 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+from contextlib import contextmanager
+import threading
+
+
+class _PluginStack(threading.local):
+    """
+    Per-thread stack of the plugin instances currently executing hook code.
+    """
+
+    def __init__(self):
+        """
+        Constructor.
+        """
+        self.plugins = []
+
+
+_plugin_stack = _PluginStack()
+
+
+def get_current_plugin():
+    """
+    Returns the plugin instance currently executing on this thread.
+
+    :returns: The innermost plugin instance being executed or ``None`` if
+        no plugin is executing on the calling thread.
+    """
+    plugins = _plugin_stack.plugins
+    if plugins:
+        return plugins[-1]
+    return None
+
+
+@contextmanager
+def executing_plugin(plugin):
+    """
+    Creates a scope during which the supplied plugin is considered the
+    currently executing plugin on this thread.
+
+    Scopes can be nested. When the scope exits, the previously executing
+    plugin, if any, becomes current again.
+
+    :param plugin: The plugin instance about to execute hook code.
+    """
+    _plugin_stack.plugins.append(plugin)
+    try:
+        yield
+    finally:
+        _plugin_stack.plugins.pop()
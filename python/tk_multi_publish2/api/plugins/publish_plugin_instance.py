@@ -13,7 +13,8 @@ import copy
 import traceback
 
 import sgtk
-from .instance_base import PluginInstanceBase
+from .instance_base import PluginInstanceBase, process_events
+from .plugin_stack import executing_plugin
 from .setting import get_setting_for_context
 
 logger = sgtk.platform.get_logger(__name__)
@@ -26,14 +27,17 @@ class PublishPluginInstance(PluginInstanceBase):
     Each plugin object reflects an instance in the app configuration.
     """
 
-    def __init__(self, name, path, context, publish_logger=None):
+    def __init__(self, name, path, context, publish_logger=None, settings_resolver=None):
         """
         :param name: Name to be used for this plugin instance
         :param path: Path to publish plugin hook
         :param context: The Context to use to resolve this plugin's settings
         :param publish_logger: a logger object that will be used by the hook
+        :param settings_resolver: Optional :class:`PluginSettingsResolver`
+            shared by all the plugins being loaded for the same context.
         """
         self._icon_pixmap = None
+        self._settings_resolver = settings_resolver
 
         super(PublishPluginInstance, self).__init__(
             name,
@@ -42,6 +46,9 @@ class PublishPluginInstance(PluginInstanceBase):
             publish_logger
         )
 
+        # the resolver is only needed to initialize the settings
+        self._settings_resolver = None
+
     def _create_hook_instance(self, path):
         """
         Create the plugin's hook instance.
@@ -50,14 +57,8 @@ class PublishPluginInstance(PluginInstanceBase):
         implementation.
         """
         bundle = sgtk.platform.current_bundle()
-        hook = bundle.create_hook_instance(
-            path,
-            base_class=bundle.base_hooks.PublishPlugin,
-            plugin=self
-        )
-
-        hook.id = path
-        return hook
+        return self._create_shared_hook_instance(
+            path, bundle.base_hooks.PublishPlugin)
 
     @property
     def plugin_name(self):
@@ -116,6 +117,28 @@ class PublishPluginInstance(PluginInstanceBase):
         except AttributeError:
             return []
 
+    @property
+    def thread_safe(self):
+        """
+        ``True`` if the plugin's publish method can run on a worker thread.
+        """
+        try:
+            return bool(self._hook_instance.thread_safe)
+        except AttributeError:
+            return False
+
+    @property
+    def run_after(self):
+        """
+        The names of the plugins whose tasks on the same item must be
+        processed before this plugin's task, or ``None`` if the task must
+        follow all the preceding tasks of the item.
+        """
+        try:
+            return self._hook_instance.run_after
+        except AttributeError:
+            return None
+
     @property
     def has_custom_ui(self):
         """
@@ -137,6 +160,10 @@ class PublishPluginInstance(PluginInstanceBase):
         # Set the context if not specified
         context = context or self._context
 
+        # Only resolve this plugin's entry when loaded as part of a batch
+        if self._settings_resolver and self._settings_resolver.context == context:
+            return self._settings_resolver.resolve(self.name, self.settings_schema)
+
         # Inject this plugin's schema in the correct location for proper resolution
         plugin_schema = {
             "publish_plugins" : {
@@ -169,7 +196,8 @@ class PublishPluginInstance(PluginInstanceBase):
         """
         try:
             # get the initialized user defined task settings
-            task_settings = self._hook_instance.init_task_settings(item)
+            with executing_plugin(self):
+                task_settings = self._hook_instance.init_task_settings(item)
 
         except Exception:
             error_msg = traceback.format_exc()
@@ -179,9 +207,7 @@ class PublishPluginInstance(PluginInstanceBase):
             )
             task_settings = {}
         finally:
-            if not sgtk.platform.current_engine().has_ui:
-                from sgtk.platform.qt import QtCore
-                QtCore.QCoreApplication.processEvents()
+            process_events()
 
         # return a deep copy of the settings
         return copy.deepcopy(task_settings)
@@ -195,7 +221,8 @@ class PublishPluginInstance(PluginInstanceBase):
         """
 
         try:
-            return self._hook_instance.accept(task_settings, item)
+            with executing_plugin(self):
+                return self._hook_instance.accept(task_settings, item)
         except Exception:
             error_msg = traceback.format_exc()
             self._logger.error(
@@ -204,9 +231,46 @@ class PublishPluginInstance(PluginInstanceBase):
             )
             return {"accepted": False}
         finally:
-            if not sgtk.platform.current_engine().has_ui:
-                from sgtk.platform.qt import QtCore
-                QtCore.QCoreApplication.processEvents()
+            process_events()
+
+    def run_accept_many(self, task_settings, items):
+        """
+        Executes the hook accept_many method for the given items. If the hook
+        doesn't implement it, the accept method is executed for each item.
+
+        :param list task_settings: List of task settings, one for each item
+        :param list items: Items to analyze
+        :returns: list of dictionaries with boolean keys
+            accepted/visible/enabled/checked, one for each item
+        """
+
+        try:
+            with executing_plugin(self):
+                accept_data = self._hook_instance.accept_many(task_settings, items)
+        except NotImplementedError:
+            # the hook only knows how to accept items one at a time
+            return [
+                self.run_accept(item_settings, item)
+                for (item_settings, item) in zip(task_settings, items)
+            ]
+        except Exception:
+            error_msg = traceback.format_exc()
+            self._logger.error(
+                "Error running accept_many for %s" % self,
+                extra=_get_error_extra_info(error_msg)
+            )
+            return [{"accepted": False} for _ in items]
+        finally:
+            process_events()
+
+        if len(accept_data) != len(items):
+            self._logger.error(
+                "Error running accept_many for %s: %s results returned for %s "
+                "items." % (self, len(accept_data), len(items))
+            )
+            return [{"accepted": False} for _ in items]
+
+        return accept_data
 
     def run_validate(self, task_settings, item):
         """
@@ -232,6 +296,32 @@ class PublishPluginInstance(PluginInstanceBase):
 
         return status
 
+    def run_get_validation_fingerprint(self, task_settings, item):
+        """
+        Returns the state the plugin's validation of the item depends on.
+
+        :param settings: Dictionary of settings
+        :param item: Item to analyze
+        :return: A JSON serializable value, or ``None`` if the item has to be
+            validated again.
+        """
+        try:
+            get_validation_fingerprint = self._hook_instance.get_validation_fingerprint
+        except AttributeError:
+            return ""
+
+        try:
+            with executing_plugin(self):
+                return get_validation_fingerprint(task_settings, item)
+        except Exception:
+            # the item is validated again and the plugin reports the error
+            # if it persists
+            self.logger.debug(
+                "Unable to get the validation fingerprint of %s." % (item,),
+                exc_info=True
+            )
+            return None
+
     def run_publish(self, task_settings, item):
         """
         Executes the publish logic for this plugin instance.
@@ -324,8 +414,11 @@ class PublishPluginInstance(PluginInstanceBase):
 
         try:
             # Execute's the code inside the with statement. Any errors will be
-            # caught and logged and the events will be processed
-            yield
+            # caught and logged and the events will be processed. The plugin is
+            # marked as executing so that items can resolve their local
+            # properties without inspecting the call stack.
+            with executing_plugin(self):
+                yield
         except Exception as e:
             exception_msg = traceback.format_exc()
             self._logger.error(
@@ -337,9 +430,7 @@ class PublishPluginInstance(PluginInstanceBase):
             if success_msg:
                 self._logger.debug(success_msg)
         finally:
-            if not sgtk.platform.current_engine().has_ui:
-                from sgtk.platform.qt import QtCore
-                QtCore.QCoreApplication.processEvents()
+            process_events()
 
     def _load_plugin_icon(self):
         """
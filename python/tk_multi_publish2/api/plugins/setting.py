@@ -10,15 +10,268 @@
 
 import collections
 import copy
+import json
+import os
+import time
 
 import sgtk
 from sgtk import TankError
+from tank_vendor import yaml
 from sgtk.platform import create_setting
 
+from ...util import Threaded
+
 logger = sgtk.platform.get_logger(__name__)
 
+
+class SettingsCache(Threaded):
+    """
+    Cache of resolved app settings.
+
+    Resolving a setting for a context requires finding the app settings for
+    the context's environment, injecting the plugin's schema and creating a
+    new application object. The value and schema of the setting only depend
+    on the environment, the engine and app instances, the setting and the
+    injected schema, so they are cached using those as the key and shared by
+    all the contexts using the same environment. Only the setting objects,
+    bound to an application object created for a context, are kept per
+    context, see :class:`ResolvedSetting`.
+
+    Cached entries are discarded when the environment file they were
+    resolved from, or any file it includes, is modified. The files are
+    checked at most once every ``config_check_interval`` seconds. The app
+    clears the cache when it is destroyed, e.g. when the engine is restarted
+    after a configuration change.
+    """
+
+    # default interval, in seconds, between checks of the environment files
+    CONFIG_CHECK_INTERVAL = 1.0
+
+    def __init__(self, config_check_interval=CONFIG_CHECK_INTERVAL):
+        """
+        Constructor.
+
+        :param float config_check_interval: Minimum interval, in seconds,
+            between checks of the environment files for modifications.
+        """
+        Threaded.__init__(self)
+        self._config_check_interval = config_check_interval
+        self._app_settings = dict()
+        self._settings = dict()
+        self._config_files = dict()
+        self._hits = 0
+        self._misses = 0
+
+    @Threaded.exclusive
+    def get_app_settings(self, key):
+        """
+        Retrieve the cached raw app settings for a given context key.
+
+        :param key: Key identifying the context the app settings were found for.
+
+        :returns: The app settings dictionary or None
+        """
+        entry = self._app_settings.get(key)
+        if entry is None:
+            return None
+
+        (stamp, app_settings) = entry
+        if stamp != self._get_config_stamp(app_settings["env_instance"]):
+            # the environment changed on disk, the entry is stale.
+            del self._app_settings[key]
+            return None
+
+        return app_settings
+
+    @Threaded.exclusive
+    def add_app_settings(self, key, app_settings):
+        """
+        Cache the raw app settings found for a given context key.
+
+        :param key: Key identifying the context the app settings were found for.
+        :param app_settings: The app settings dictionary to cache.
+        """
+        self._app_settings[key] = (
+            self._get_config_stamp(app_settings["env_instance"]),
+            app_settings
+        )
+
+    @Threaded.exclusive
+    def get_setting(self, key, stamp):
+        """
+        Retrieve a cached resolved setting.
+
+        :param key: Key identifying the resolved setting.
+        :param stamp: The current state of the environment the setting is
+            resolved from. Entries cached for a different state are discarded.
+
+        :returns: The :class:`ResolvedSetting` or None
+        """
+        entry = self._settings.get(key)
+        if entry is not None and entry[0] != stamp:
+            del self._settings[key]
+            entry = None
+
+        if entry is None:
+            self._misses += 1
+            return None
+
+        self._hits += 1
+        return entry[1]
+
+    @Threaded.exclusive
+    def add_setting(self, key, stamp, setting):
+        """
+        Cache a resolved setting.
+
+        :param key: Key identifying the resolved setting.
+        :param stamp: The current state of the environment the setting was
+            resolved from.
+        :param setting: The :class:`ResolvedSetting` to cache.
+        :returns: The cached :class:`ResolvedSetting`, which may have been
+            added by another thread in the meantime.
+        """
+        entry = self._settings.get(key)
+        if entry is None or entry[0] != stamp:
+            entry = (stamp, setting)
+            self._settings[key] = entry
+        return entry[1]
+
+    @Threaded.exclusive
+    def get_config_stamp(self, env):
+        """
+        Returns a value identifying the state on disk of the supplied
+        environment and of the files it includes.
+
+        :param env: An environment instance.
+
+        :returns: The modification times of the environment files or None if
+            they can't be determined.
+        """
+        return self._get_config_stamp(env)
+
+    @Threaded.exclusive
+    def clear(self):
+        """
+        Clears all cached settings and resets the statistics.
+        """
+        self._app_settings.clear()
+        self._settings.clear()
+        self._config_files.clear()
+        self._hits = 0
+        self._misses = 0
+
+    def _get_config_stamp(self, env):
+        """
+        Non thread safe implementation of :meth:`get_config_stamp`.
+
+        The files included by the environment are only looked up again when
+        one of the files changed, the stamp is otherwise computed from their
+        modification times. The stamp computed last is returned if the files
+        were checked less than ``config_check_interval`` seconds ago.
+        """
+        try:
+            env_path = env.disk_location
+        except AttributeError:
+            return None
+
+        if not env_path:
+            return None
+
+        now = time.time()
+        entry = self._config_files.get(env_path)
+        if entry is not None:
+            (config_files, stamp, checked) = entry
+            if now - checked < self._config_check_interval:
+                return stamp
+            if _get_files_stamp(config_files) == stamp:
+                self._config_files[env_path] = (config_files, stamp, now)
+                return stamp
+
+        config_files = _find_config_files(env_path)
+        stamp = _get_files_stamp(config_files)
+        self._config_files[env_path] = (config_files, stamp, now)
+        return stamp
+
+    @property
+    def hits(self):
+        """Number of settings that were resolved from the cache."""
+        return self._hits
+
+    @property
+    def misses(self):
+        """Number of settings that had to be resolved."""
+        return self._misses
+
+
+class ResolvedSetting(object):
+    """
+    The value and schema of a setting resolved for an environment, and the
+    setting objects created from them for each context.
+
+    Setting objects are bound to an application object created for a
+    context, which resolves the setting's hook paths and templates, so they
+    are created once per context.
+    """
+
+    def __init__(self, setting_key, value, schema, validate=False):
+        """
+        :param str setting_key: Name of the setting.
+        :param value: The raw value of the setting.
+        :param dict schema: The schema of the setting.
+        :param bool validate: If ``True``, the settings created are validated.
+        """
+        self._setting_key = setting_key
+        self._value = value
+        self._schema = schema
+        self._validate = validate
+        self._settings = dict()
+
+    def get(self, context, get_app_obj):
+        """
+        Returns the setting object for the supplied context.
+
+        :param context: The context to get the setting for.
+        :param get_app_obj: Callable returning the application object for the
+            context, called if the setting hasn't been created for it yet.
+
+        :returns: The setting object.
+        """
+        context_key = get_context_key(context)
+        setting = self._settings.get(context_key)
+        if setting is None:
+            setting = create_setting(
+                self._setting_key,
+                self._value,
+                self._schema,
+                get_app_obj()
+            )
+            if self._validate:
+                setting.validate()
+            setting = self._settings.setdefault(context_key, setting)
+        return setting
+
+
+# resolved settings shared by all plugin instances
+settings_cache = SettingsCache()
+
+
 def get_setting_for_context(setting_key, context=None, plugin_schema={}, validate=False):
     """
+    Resolve an app setting for the supplied context.
+
+    The plugin's schema is injected into the app's configuration schema so
+    that the plugin settings are properly resolved. Results are cached, see
+    :class:`SettingsCache`.
+
+    :param str setting_key: Name of the app setting to resolve.
+    :param context: Context in which to look for settings. Defaults to the
+        app's context.
+    :param dict plugin_schema: Schema to merge into the app's configuration
+        schema before resolving the setting.
+    :param bool validate: If ``True``, the resolved setting is validated.
+
+    :returns: The resolved setting.
     """
     # the current bundle (the publisher instance)
     app = sgtk.platform.current_bundle()
@@ -28,7 +281,283 @@ def get_setting_for_context(setting_key, context=None, plugin_schema={}, validat
 
     logger.debug("Finding plugin setting '%s' for context: %s" % (setting_key, context))
 
+    config_path = app.sgtk.pipeline_configuration.get_path()
+
     # find the matching raw app settings for this context
+    app_settings = _get_app_settings(app, context)
+
+    new_env = app_settings["env_instance"]
+    new_eng = app_settings["engine_instance"]
+    new_app = app_settings["app_instance"]
+    new_settings = app_settings["settings"]
+
+    setting_cache_key = (
+        config_path,
+        new_env.name,
+        new_eng,
+        new_app,
+        setting_key,
+        _get_schema_fingerprint(plugin_schema),
+        validate
+    )
+    stamp = settings_cache.get_config_stamp(new_env)
+
+    resolved_setting = settings_cache.get_setting(setting_cache_key, stamp)
+    if resolved_setting is None:
+        new_descriptor = new_env.get_app_descriptor(new_eng, new_app)
+
+        # Inject the plugin's schema for proper settings resolution
+        new_schema = copy.deepcopy(new_descriptor.configuration_schema)
+        dict_merge(new_schema, plugin_schema)
+
+# At present, there is no way to override the configuration_schema on a
+# descriptor object, hence we cannot use the app object's settings dict
+# since it will lack our injected plugin schema data. The workaround is
+# to create a new Setting object, which is less efficient.
+#    # Get the context-specific app instance's setting value
+#    setting = app_obj.settings.get(setting_key)
+
+        resolved_setting = settings_cache.add_setting(
+            setting_cache_key,
+            stamp,
+            ResolvedSetting(
+                setting_key,
+                new_settings.get(setting_key),
+                new_schema.get(setting_key),
+                validate
+            )
+        )
+
+    # the setting is bound to a new app instance created for the context
+    return resolved_setting.get(
+        context,
+        lambda: _get_app_obj(app, app_settings, context)
+    )
+
+
+class PluginSettingsResolver(object):
+    """
+    Resolves the settings of individual plugins configured in a list setting,
+    such as ``publish_plugins``, for a given context.
+
+    The app settings and application object for the context are looked up
+    once and shared by all the plugins resolved through this object. Each
+    plugin only resolves and validates its own entry in the list, using its
+    own schema.
+    """
+
+    def __init__(self, setting_key, context=None):
+        """
+        :param str setting_key: Name of the app setting listing the plugins.
+        :param context: Context in which to look for settings. Defaults to the
+            app's context.
+        """
+        self._app = sgtk.platform.current_bundle()
+        self._context = context or self._app.context
+        self._setting_key = setting_key
+        self._app_settings = _get_app_settings(self._app, self._context)
+        self._app_obj = None
+        self._setting_schema = None
+
+    @property
+    def context(self):
+        """The context the settings are resolved for."""
+        return self._context
+
+    def resolve(self, plugin_name, settings_schema):
+        """
+        Resolve and validate the settings of the named plugin.
+
+        :param str plugin_name: Name of the plugin as configured.
+        :param dict settings_schema: The plugin's settings schema.
+
+        :returns: The plugin's resolved settings or None if no plugin with the
+            supplied name is configured.
+        """
+        new_env = self._app_settings["env_instance"]
+        new_settings = self._app_settings["settings"]
+
+        setting_cache_key = (
+            self._app.sgtk.pipeline_configuration.get_path(),
+            new_env.name,
+            self._app_settings["engine_instance"],
+            self._app_settings["app_instance"],
+            self._setting_key,
+            plugin_name,
+            _get_schema_fingerprint(settings_schema)
+        )
+        stamp = settings_cache.get_config_stamp(new_env)
+
+        resolved_setting = settings_cache.get_setting(setting_cache_key, stamp)
+        if resolved_setting is None:
+
+            # only resolve the entries configured for this plugin
+            plugin_values = [
+                plugin_def for plugin_def in new_settings.get(self._setting_key) or []
+                if plugin_def.get("name") == plugin_name
+            ]
+
+            # Inject the plugin's schema for proper settings resolution
+            plugin_schema = copy.deepcopy(self._get_setting_schema())
+            dict_merge(
+                plugin_schema,
+                {
+                    "values": {
+                        "items": {
+                            "settings": {
+                                "items": settings_schema
+                            }
+                        }
+                    }
+                }
+            )
+
+            resolved_setting = settings_cache.add_setting(
+                setting_cache_key,
+                stamp,
+                ResolvedSetting(
+                    self._setting_key,
+                    plugin_values,
+                    plugin_schema,
+                    validate=True
+                )
+            )
+
+        setting = resolved_setting.get(self._context, self._get_app_obj)
+
+        # Now get the plugin settings matching this plugin
+        for plugin_def in setting:
+            if plugin_def["name"] == plugin_name:
+                return plugin_def["settings"]
+
+    def _get_app_obj(self):
+        """
+        Returns the application object for the context, creating it on demand.
+        """
+        if self._app_obj is None:
+            self._app_obj = _get_app_obj(
+                self._app, self._app_settings, self._context)
+        return self._app_obj
+
+    def _get_setting_schema(self):
+        """
+        Returns the configuration schema of the plugins setting.
+        """
+        if self._setting_schema is None:
+            new_env = self._app_settings["env_instance"]
+            new_descriptor = new_env.get_app_descriptor(
+                self._app_settings["engine_instance"],
+                self._app_settings["app_instance"]
+            )
+            self._setting_schema = new_descriptor.configuration_schema.get(
+                self._setting_key, {})
+        return self._setting_schema
+
+
+def _get_app_obj(app, app_settings, context):
+    """
+    Creates a new application object for the supplied context.
+
+    :param app: The current app instance.
+    :param dict app_settings: The raw app settings found for the context.
+    :param context: The context to create the application object for.
+
+    :returns: The application object.
+    """
+    new_env = app_settings["env_instance"]
+    new_descriptor = new_env.get_app_descriptor(
+        app_settings["engine_instance"],
+        app_settings["app_instance"]
+    )
+    return sgtk.platform.application.get_application(
+        app.engine,
+        new_descriptor.get_path(),
+        new_descriptor,
+        app_settings["settings"],
+        app_settings["app_instance"],
+        new_env,
+        context
+    )
+
+
+def _get_app_settings(app, context):
+    """
+    Returns the raw settings of the supplied app for the given context,
+    using the settings cache when possible.
+
+    :param app: The app instance to find the settings for.
+    :param context: The context to find the settings for.
+
+    :returns: The app settings dictionary.
+    """
+    app_settings_key = (
+        app.sgtk.pipeline_configuration.get_path(),
+        app.engine.instance_name,
+        app.instance_name,
+        get_context_key(context)
+    )
+    app_settings = settings_cache.get_app_settings(app_settings_key)
+    if app_settings is None:
+        app_settings = _find_app_settings(app, context)
+        settings_cache.add_app_settings(app_settings_key, app_settings)
+
+    return app_settings
+
+
+def get_context_key(context):
+    """
+    Returns a stable, hashable key identifying the supplied context.
+
+    Two context instances pointing to the same entities produce the same key.
+
+    :param context: A :class:`sgtk.Context` instance.
+
+    :returns: A tuple of the entities of the context.
+    """
+    if context is None:
+        return None
+
+    try:
+        return (
+            _get_entity_key(context.project),
+            _get_entity_key(context.entity),
+            _get_entity_key(context.step),
+            _get_entity_key(context.task),
+            _get_entity_key(context.user),
+            tuple(
+                _get_entity_key(entity)
+                for entity in context.additional_entities or []
+            ),
+            _get_entity_key(getattr(context, "source_entity", None)),
+        )
+    except AttributeError:
+        # not a context, fall back to its string representation
+        return repr(context)
+
+
+def _get_entity_key(entity):
+    """
+    Returns a hashable key for an entity dictionary.
+
+    :param dict entity: An entity dictionary or None.
+
+    :returns: A tuple of the entity type and id or None.
+    """
+    if not entity:
+        return None
+    return (entity.get("type"), entity.get("id"))
+
+
+def _find_app_settings(app, context):
+    """
+    Find the raw settings of the supplied app for the given context.
+
+    :param app: The app instance to find the settings for.
+    :param context: The context to find the settings for.
+
+    :returns: The app settings dictionary as returned by
+        :meth:`sgtk.platform.engine.find_app_settings`.
+    """
     context_settings = sgtk.platform.engine.find_app_settings(
         app.engine.name,
         app.name,
@@ -41,6 +570,7 @@ def get_setting_for_context(setting_key, context=None, plugin_schema={}, validat
     if not context_settings:
         raise TankError("Cannot find settings for %s for context %s" % (app.name, context))
 
+    app_settings = None
     if len(context_settings) > 1:
         # There's more than one instance of the app for the engine instance, so we'll
         # need to deterministically pick one. We'll pick the one with the same
@@ -60,41 +590,77 @@ def get_setting_for_context(setting_key, context=None, plugin_schema={}, validat
             app.instance_name)
         )
 
-    new_env = app_settings["env_instance"]
-    new_eng = app_settings["engine_instance"]
-    new_app = app_settings["app_instance"]
-    new_settings = app_settings["settings"]
-    new_descriptor = new_env.get_app_descriptor(new_eng, new_app)
-
-    # Inject the plugin's schema for proper settings resolution
-    new_schema = copy.deepcopy(new_descriptor.configuration_schema)
-    dict_merge(new_schema, plugin_schema)
-
-    # Create a new app instance for the new context
-    app_obj = sgtk.platform.application.get_application(
-            app.engine,
-            new_descriptor.get_path(),
-            new_descriptor,
-            new_settings,
-            new_app,
-            new_env,
-            context)
+    return app_settings
 
-# At present, there is no way to override the configuration_schema on a
-# descriptor object, hence we cannot use the app object's settings dict
-# since it will lack our injected plugin schema data. The workaround is
-# to create a new Setting object, which is less efficient.
-#    # Get the context-specific app instance's setting value
-#    setting = app_obj.settings.get(setting_key)
 
-    setting_value = new_settings.get(setting_key)
-    setting_schema = new_schema.get(setting_key)
+def _find_config_files(env_path):
+    """
+    Returns the environment file and all the files it includes, recursively.
+
+    Includes are resolved the same way the core resolves them: environment
+    variables and ``~`` are expanded and relative paths are relative to the
+    including file. Includes depending on the context, such as template
+    paths, can't be resolved here and are skipped.
+
+    :param str env_path: Path to the environment file.
+
+    :returns: A sorted tuple of file paths.
+    """
+    config_files = set()
+    pending = [os.path.normpath(env_path)]
+    while pending:
+        path = pending.pop()
+        if path in config_files:
+            continue
+        config_files.add(path)
+
+        try:
+            with open(path, "r") as fh:
+                data = yaml.load(fh) or {}
+        except Exception, e:
+            logger.debug("Could not read config file '%s': %s" % (path, e))
+            continue
+
+        includes = data.get("includes") if isinstance(data, dict) else None
+        for include in includes or []:
+            if not isinstance(include, basestring) or "{" in include:
+                continue
+            include = os.path.expanduser(os.path.expandvars(include))
+            if not os.path.isabs(include):
+                include = os.path.join(os.path.dirname(path), include)
+            pending.append(os.path.normpath(include))
+
+    return tuple(sorted(config_files))
+
 
-    setting = create_setting(setting_key, setting_value, setting_schema, app_obj)
-    if validate:
-        setting.validate()
+def _get_files_stamp(paths):
+    """
+    Returns a value identifying the state of the supplied files on disk.
+
+    :param paths: A list of file paths.
+
+    :returns: A tuple of the modification times of the files, None for the
+        files which don't exist.
+    """
+    stamp = []
+    for path in paths:
+        try:
+            stamp.append(os.path.getmtime(path))
+        except OSError:
+            stamp.append(None)
+    return tuple(stamp)
+
+
+def _get_schema_fingerprint(schema):
+    """
+    Returns a hashable fingerprint of the supplied schema dictionary.
+
+    :param dict schema: The schema to fingerprint.
+
+    :returns: A string uniquely representing the schema's contents.
+    """
+    return json.dumps(schema, sort_keys=True, default=repr)
 
-    return setting
 
 def dict_merge(dct, merge_dct):
     """ Recursive dict merge. Inspired by :meth:``dict.update()``, instead of
@@ -0,0 +1,594 @@
+# Copyright (c) 2018 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Runs CPU bound work, like image conversions or checksums, in worker processes
+so that it doesn't hold the host application's main thread.
+
+Plugins submit jobs to the publisher's pool and wait for their results:
+
+.. code-block:: python
+
+    def _make_texture(source_path, target_path, progress):
+        progress("Converting %s" % source_path)
+        ...
+
+    class MipmapPlugin(HookBaseClass):
+
+        def publish(self, settings, item):
+            pool = self.parent.process_pool
+            jobs = [
+                pool.submit(
+                    _make_texture,
+                    (source_path, target_path),
+                    description="Mipmap %s" % target_path,
+                    publish_logger=self.logger,
+                    with_progress=True
+                )
+                for (source_path, target_path) in ...
+            ]
+            for (result, error) in pool.wait(jobs):
+                ...
+
+A job runs a module level function with picklable arguments. Its result and
+the progress it reports are sent back to the publish process.
+
+The workers are forked from the publish process. Where processes can't be
+forked, like on Windows, and in applications with a UI, which shouldn't be
+forked, the jobs are run in the publish process instead, on worker threads.
+The application's events are still processed while waiting for them and
+they can be cancelled, although jobs already running are left to complete in
+the background. They only run in parallel if their work releases the GIL,
+like most image processing libraries do.
+"""
+
+import itertools
+import multiprocessing
+import os
+from multiprocessing.queues import SimpleQueue
+import pickle
+import Queue
+import sys
+import threading
+import time
+import traceback
+
+import sgtk
+from .plugins.instance_base import process_events
+
+logger = sgtk.platform.get_logger(__name__)
+
+# the interval at which progress is dispatched and events are processed while
+# waiting for a job
+POLL_INTERVAL = 0.1
+
+# the messages sent by the workers
+_MESSAGE_STARTED = "started"
+_MESSAGE_PROGRESS = "progress"
+
+# the queue the progress is sent through, in the worker processes
+_progress_queue = None
+
+
+class ProcessJob(object):
+    """
+    A job submitted to a :class:`ProcessPool`.
+    """
+
+    def __init__(self, pool, job_id, description, publish_logger):
+        """
+        :param pool: The :class:`ProcessPool` running the job.
+        :param int job_id: The identifier of the job in the pool.
+        :param str description: A description of the job for the log.
+        :param publish_logger: The logger the progress is reported to.
+        """
+        self._pool = pool
+        self._id = job_id
+        self._description = description
+        self._logger = publish_logger
+        self._async_result = None
+        self._cancelled = False
+        self._start_time = None
+
+    def __repr__(self):
+        return "<ProcessJob %s: %s>" % (self._id, self._description)
+
+    @property
+    def description(self):
+        """A description of the job."""
+        return self._description
+
+    @property
+    def cancelled(self):
+        """``True`` if the job has been cancelled."""
+        return self._cancelled
+
+    @property
+    def done(self):
+        """``True`` if the job has completed, failed or been cancelled."""
+        return self._cancelled or self._async_result.ready()
+
+    def result(self):
+        """
+        Waits for the job to complete and returns its result.
+
+        While waiting, the progress of the pool's jobs is reported and the
+        host application's events are processed.
+
+        :returns: The value returned by the job's function.
+        :raises: :class:`~sgtk.TankError` if the job failed or was cancelled.
+        """
+        while not self.done:
+            self._async_result.wait(POLL_INTERVAL)
+            self._pool._dispatch_progress()
+            process_events()
+
+        self._pool._dispatch_progress()
+        # the outcome is only logged the first time the result is collected
+        first_collection = self._pool._forget(self)
+
+        if self._cancelled:
+            raise sgtk.TankError("%s was cancelled." % (self._description,))
+
+        (succeeded, value, error_traceback) = self._async_result.get()
+        if not succeeded:
+            if first_collection:
+                self._logger.debug(
+                    "%s failed:\n%s" % (self._description, error_traceback)
+                )
+            raise sgtk.TankError("%s failed: %s" % (self._description, value))
+
+        if first_collection and self._start_time is not None:
+            self._logger.info(
+                "Finished %s in %.1fs." %
+                (self._description, time.time() - self._start_time)
+            )
+
+        return value
+
+    ############################################################################
+    # internal methods
+
+    def _report(self, message_type, message, percent, timestamp):
+        """
+        Reports a message sent by the worker running the job.
+        """
+        if message_type == _MESSAGE_STARTED:
+            self._start_time = timestamp
+            self._logger.debug("Started %s." % (self._description,))
+        elif percent is None:
+            self._logger.info("%s: %s" % (self._description, message))
+        else:
+            self._logger.info(
+                "%s: %s (%d%%)" % (self._description, message, percent)
+            )
+
+
+class ProcessPool(object):
+    """
+    A pool of worker processes running picklable jobs.
+
+    The workers are started on the first submitted job, and restarted after
+    the pool is cancelled. Since the workers are forked from the current
+    process, the functions they run must be defined in modules loaded before
+    they start. The pool is restarted when a job's function is defined in a
+    module loaded since.
+
+    When worker processes aren't used, the jobs are run in the current
+    process, on as many worker threads.
+    """
+
+    def __init__(self, max_workers=None, use_processes=True):
+        """
+        :param int max_workers: The number of worker processes. Defaults to
+            the number of CPUs.
+        :param bool use_processes: If ``False``, the jobs are run in the
+            current process. Jobs are always run in the current process on
+            platforms which can't fork processes.
+        """
+        self._max_workers = max_workers or multiprocessing.cpu_count()
+        self._use_processes = use_processes and hasattr(os, "fork")
+        self._lock = threading.Lock()
+        self._progress_lock = threading.Lock()
+        self._pool = None
+        self._pool_modules = set()
+        self._retired_pools = []
+        self._progress_queue = None
+        self._jobs = {}
+        self._job_ids = itertools.count()
+
+        # the jobs run in process and the threads running them
+        self._local_queue = Queue.Queue()
+        self._local_progress_queue = Queue.Queue()
+        self._local_threads = []
+
+    @property
+    def max_workers(self):
+        """The number of worker processes."""
+        return self._max_workers
+
+    @property
+    def use_processes(self):
+        """``True`` if the jobs are run in worker processes."""
+        return self._use_processes
+
+    def submit(self, function, args=(), kwargs=None, description=None,
+               publish_logger=None, with_progress=False):
+        """
+        Submits a job to the pool.
+
+        :param function: The module level function to run.
+        :param tuple args: The picklable positional arguments of the function.
+        :param dict kwargs: The picklable keyword arguments of the function.
+        :param str description: A description of the job for the log.
+            Defaults to the name of the function.
+        :param publish_logger: The logger the progress of the job is reported
+            to, typically a plugin's publish logger.
+        :param bool with_progress: If ``True``, the function is called with a
+            ``progress`` keyword argument, a callable accepting a message and
+            an optional percentage to report the progress of the job.
+        :returns: A :class:`ProcessJob`.
+        :raises: :class:`~sgtk.TankError` if the job can't be pickled to run
+            in a worker process.
+        """
+        with self._lock:
+            job_id = self._job_ids.next()
+
+        job = ProcessJob(
+            self,
+            job_id,
+            description or function.__name__,
+            publish_logger or logger
+        )
+
+        kwargs = dict(kwargs or {})
+
+        if not self._use_processes:
+            if with_progress:
+                kwargs["progress"] = _LocalProgressReporter(
+                    job_id, self._local_progress_queue)
+            job._async_result = _LocalResult()
+            with self._lock:
+                self._jobs[job_id] = job
+                self._start_local_thread()
+            self._local_queue.put((job, function, args, kwargs))
+            return job
+
+        if with_progress:
+            kwargs["progress"] = _ProgressReporter(job_id)
+
+        # pickle upfront so that unpicklable jobs fail here rather than in the
+        # pool's internal threads
+        try:
+            payload = pickle.dumps((function, args, kwargs), pickle.HIGHEST_PROTOCOL)
+        except Exception, e:
+            raise sgtk.TankError("%s can't be run in a process: %s" % (job.description, e))
+
+        with self._lock:
+            pool = self._get_pool(function.__module__)
+            self._jobs[job_id] = job
+            job._async_result = pool.apply_async(_run_job, (job_id, payload))
+
+        return job
+
+    def wait(self, jobs):
+        """
+        Waits for several jobs to complete.
+
+        :param list jobs: The :class:`ProcessJob` instances to wait for.
+        :returns: A list with a ``(result, error)`` tuple for each job, in
+            order. The error is the :class:`~sgtk.TankError` raised by
+            :meth:`ProcessJob.result` if the job failed or was cancelled, and
+            ``None`` otherwise.
+        """
+        results = []
+        for job in jobs:
+            try:
+                results.append((job.result(), None))
+            except sgtk.TankError, e:
+                results.append((None, e))
+
+        return results
+
+    def cancel(self):
+        """
+        Cancels all the submitted jobs and stops the workers.
+
+        Jobs submitted afterwards run in new workers.
+        """
+        with self._lock:
+            jobs = self._jobs.values()
+            if jobs:
+                logger.debug("Cancelling %s process jobs." % (len(jobs),))
+            for job in jobs:
+                job._cancelled = True
+            self._jobs.clear()
+
+            # the jobs run in process which haven't started are dropped, the
+            # running ones complete in the background
+            stopped_threads = 0
+            while True:
+                try:
+                    entry = self._local_queue.get_nowait()
+                except Queue.Empty:
+                    break
+                if entry is None:
+                    stopped_threads += 1
+            for index in range(stopped_threads):
+                self._local_queue.put(None)
+
+            if self._pool is None:
+                return
+
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+            self._stop_retired_pools(terminate=True)
+
+            # a terminated worker may have held the queue's lock
+            self._progress_queue = None
+
+    def shutdown(self):
+        """
+        Stops the workers once the submitted jobs are done.
+        """
+        with self._lock:
+            if self._pool is not None:
+                self._retired_pools.append(self._pool)
+                self._pool = None
+            self._stop_retired_pools()
+
+            local_threads = self._local_threads
+            self._local_threads = []
+            for thread in local_threads:
+                self._local_queue.put(None)
+
+        for thread in local_threads:
+            thread.join()
+
+    ############################################################################
+    # internal methods
+
+    def _get_pool(self, module_name):
+        """
+        Returns the pool of workers able to run a function of the supplied
+        module, starting one if needed. Must be called with the lock acquired.
+        """
+        if self._pool is not None and module_name not in self._pool_modules:
+            logger.debug(
+                "Restarting the process pool to run jobs from %s." % (module_name,)
+            )
+            # the running jobs are completed by the retired workers
+            self._pool.close()
+            self._retired_pools.append(self._pool)
+            self._pool = None
+
+        if self._pool is None:
+            if self._progress_queue is None:
+                # progress is sent synchronously so that it is received
+                # before the result of the job
+                self._progress_queue = SimpleQueue()
+            self._pool = multiprocessing.Pool(
+                self._max_workers,
+                initializer=_init_worker,
+                initargs=(self._progress_queue,)
+            )
+            self._pool_modules = set(sys.modules)
+
+        return self._pool
+
+    def _start_local_thread(self):
+        """
+        Starts a thread running the jobs in process, unless all the threads
+        are running. Must be called with the lock acquired.
+        """
+        if len(self._local_threads) >= self._max_workers:
+            return
+
+        thread = threading.Thread(
+            target=_run_local_jobs,
+            args=(self._local_queue, self._local_progress_queue),
+            name="ProcessPoolThread-%d" % (len(self._local_threads),)
+        )
+        thread.daemon = True
+        thread.start()
+        self._local_threads.append(thread)
+
+    def _stop_retired_pools(self, terminate=False):
+        """
+        Stops the pools replaced by a new one. Must be called with the lock
+        acquired.
+        """
+        for pool in self._retired_pools:
+            if terminate:
+                pool.terminate()
+            else:
+                pool.close()
+            pool.join()
+        self._retired_pools = []
+
+    def _dispatch_progress(self):
+        """
+        Reports the progress sent by the workers to the jobs' loggers.
+        """
+        with self._progress_lock:
+            progress_queue = self._progress_queue
+            while progress_queue is not None and not progress_queue.empty():
+                self._report(progress_queue.get())
+
+            while True:
+                try:
+                    message = self._local_progress_queue.get_nowait()
+                except Queue.Empty:
+                    break
+                self._report(message)
+
+    def _report(self, message):
+        """
+        Reports a message sent by a job to the job's logger, if the job is
+        still tracked.
+
+        :param tuple message: The job id, message type, message, percentage
+            and timestamp sent.
+        """
+        (job_id, message_type, message, percent, timestamp) = message
+        job = self._jobs.get(job_id)
+        if job:
+            job._report(message_type, message, percent, timestamp)
+
+    def _forget(self, job):
+        """
+        Stops tracking a job once its result has been collected.
+
+        :returns: ``True`` if the job was tracked.
+        """
+        with self._lock:
+            return self._jobs.pop(job._id, None) is not None
+
+
+class _LocalResult(object):
+    """
+    The outcome of a job run in the current process, with the interface of
+    the pool's asynchronous results.
+    """
+
+    def __init__(self):
+        """
+        Constructor.
+        """
+        self._event = threading.Event()
+        self._outcome = None
+
+    def ready(self):
+        return self._event.is_set()
+
+    def wait(self, timeout=None):
+        self._event.wait(timeout)
+
+    def get(self):
+        return self._outcome
+
+    def set(self, outcome):
+        """
+        Sets the outcome of the job.
+
+        :param tuple outcome: The tuple returned by :func:`_run_job`.
+        """
+        self._outcome = outcome
+        self._event.set()
+
+
+class _LocalProgressReporter(object):
+    """
+    The callable jobs run in the current process report their progress with.
+
+    The progress is reported by the thread waiting for the job.
+    """
+
+    def __init__(self, job_id, progress_queue):
+        """
+        :param int job_id: The identifier of the job reporting its progress.
+        :param progress_queue: The queue the progress is sent through.
+        """
+        self._job_id = job_id
+        self._progress_queue = progress_queue
+
+    def __call__(self, message, percent=None):
+        """
+        Reports the progress of the job.
+
+        :param str message: A description of the progress.
+        :param percent: Optional percentage of completion of the job.
+        """
+        self._progress_queue.put(
+            (self._job_id, _MESSAGE_PROGRESS, message, percent, time.time())
+        )
+
+
+class _ProgressReporter(object):
+    """
+    The callable jobs report their progress with, in the worker processes.
+    """
+
+    def __init__(self, job_id):
+        """
+        :param int job_id: The identifier of the job reporting its progress.
+        """
+        self._job_id = job_id
+
+    def __call__(self, message, percent=None):
+        """
+        Reports the progress of the job.
+
+        :param str message: A description of the progress.
+        :param percent: Optional percentage of completion of the job.
+        """
+        _send(self._job_id, _MESSAGE_PROGRESS, message, percent)
+
+
+def _init_worker(progress_queue):
+    """
+    Initializes a worker process.
+
+    :param progress_queue: The queue the progress is sent through.
+    """
+    global _progress_queue
+    _progress_queue = progress_queue
+
+
+def _send(job_id, message_type, message=None, percent=None):
+    """
+    Sends a message to the publish process, from a worker process.
+    """
+    if _progress_queue is not None:
+        _progress_queue.put((job_id, message_type, message, percent, time.time()))
+
+
+def _run_job(job_id, payload):
+    """
+    Runs a job in a worker process.
+
+    :param int job_id: The identifier of the job.
+    :param str payload: The pickled function and arguments to run.
+    :returns: A tuple with a success flag, the result of the function or the
+        error message, and the formatted traceback of the error, if any.
+    """
+    _send(job_id, _MESSAGE_STARTED)
+    try:
+        (function, args, kwargs) = pickle.loads(payload)
+        return (True, function(*args, **kwargs), None)
+    except Exception, e:
+        return (False, str(e), traceback.format_exc())
+
+
+def _run_local_jobs(job_queue, progress_queue):
+    """
+    Runs the jobs run in the current process, on a thread of the pool, until
+    it is stopped.
+
+    :param job_queue: The queue of ``(job, function, args, kwargs)`` tuples
+        to run. ``None`` stops the thread.
+    :param progress_queue: The queue the progress is sent through.
+    """
+    while True:
+        entry = job_queue.get()
+        if entry is None:
+            return
+
+        (job, function, args, kwargs) = entry
+        if job.cancelled:
+            continue
+
+        progress_queue.put((job._id, _MESSAGE_STARTED, None, None, time.time()))
+        try:
+            outcome = (True, function(*args, **kwargs), None)
+        except Exception, e:
+            outcome = (False, str(e), traceback.format_exc())
+        job._async_result.set(outcome)
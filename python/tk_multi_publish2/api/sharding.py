@@ -0,0 +1,407 @@
+# Copyright (c) 2018 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Distributes the publish of a validated tree over several processes or
+machines.
+
+The top-level items of the tree are split into shards of balanced estimated
+cost, each saved to its own file. Every shard is published independently,
+typically by a farm job, and saved as a result tree. The result trees are then
+merged back into the original tree, in which the finalize phase runs.
+
+.. code-block:: python
+
+    shard_paths = split_tree(manager.tree, 8, "/path/to/shards")
+
+    # on each worker
+    publish_shard(shard_path, result_path)
+
+    # once all the shards are published
+    failures = merge_shards(manager, result_paths)
+    manager.finalize(task_generator=iter_published_tasks(manager.tree))
+"""
+
+import argparse
+import heapq
+import multiprocessing
+import os
+import traceback
+
+import sgtk
+from .manager import PublishManager
+
+logger = sgtk.platform.get_logger(__name__)
+
+# item property storing the position of a top-level item in the split tree
+PROPERTY_KEY_SHARD_INDEX = "__shard_index__"
+
+# item property storing the outcome of the item's tasks in a shard
+PROPERTY_KEY_SHARD_RESULTS = "__shard_results__"
+
+# statuses of the tasks processed in a shard
+STATUS_PUBLISHED = "published"
+STATUS_FAILED = "failed"
+STATUS_SKIPPED = "skipped"
+
+# Publishing a file has a fixed cost, registering it in Shotgun for example,
+# on top of the cost of copying its bytes. It is estimated as the cost of
+# copying this many bytes.
+FILE_COST_IN_BYTES = 1024 * 1024
+
+
+def estimate_item_cost(item):
+    """
+    Estimates the cost of publishing an item and its descendants.
+
+    The cost is based on the number and size of the files referenced by the
+    ``sequence_paths`` or ``path`` properties of the items. Items with tasks
+    which don't reference any file count as a single file.
+
+    :param item: A top-level :ref:`publish-api-item`.
+    :returns: The estimated cost, in bytes.
+    """
+    cost = 0
+    for sub_item in [item] + list(item.descendants):
+        properties = sub_item.properties
+        paths = properties.get("sequence_paths") or []
+        if not paths and properties.get("path"):
+            paths = [properties["path"]]
+
+        if not paths:
+            if sub_item.tasks:
+                cost += FILE_COST_IN_BYTES
+            continue
+
+        for path in paths:
+            cost += FILE_COST_IN_BYTES
+            try:
+                cost += os.path.getsize(path)
+            except (OSError, TypeError):
+                # the file doesn't exist yet, only count its fixed cost
+                pass
+
+    return cost
+
+
+def split_tree(tree, shard_count, output_dir, compress=False):
+    """
+    Splits the top-level items of a tree into shards of balanced estimated
+    cost and saves each shard to its own file.
+
+    The position of each top-level item in the tree is stored in its
+    properties so that the published shards can be merged back into the tree
+    by :func:`merge_shards`.
+
+    :param tree: The :ref:`publish-api-tree` to split.
+    :param int shard_count: The maximum number of shards to create.
+    :param str output_dir: The folder to save the shards to.
+    :param bool compress: If ``True``, the shard files are gzip compressed.
+    :returns: The list of paths of the shard files, without the empty shards.
+    """
+    top_level_items = list(tree.root_item.children)
+    for (index, item) in enumerate(top_level_items):
+        item.properties[PROPERTY_KEY_SHARD_INDEX] = index
+
+    # assign the most expensive items first, each to the cheapest shard
+    shards = [(0, index, []) for index in range(max(shard_count, 1))]
+    costs = sorted(
+        ((estimate_item_cost(item), index) for (index, item) in enumerate(top_level_items)),
+        reverse=True
+    )
+    for (cost, item_index) in costs:
+        (shard_cost, shard_index, shard_items) = heapq.heappop(shards)
+        shard_items.append(item_index)
+        heapq.heappush(shards, (shard_cost + cost, shard_index, shard_items))
+
+    if not os.path.isdir(output_dir):
+        os.makedirs(output_dir)
+
+    shard_paths = []
+    for (shard_cost, shard_index, shard_items) in sorted(shards, key=lambda s: s[1]):
+        if not shard_items:
+            continue
+
+        shard_path = os.path.join(output_dir, "shard_%04d.json" % shard_index)
+        tree.save_file(
+            shard_path,
+            compress=compress,
+            items=[top_level_items[index] for index in sorted(shard_items)]
+        )
+        logger.debug(
+            "Saved %s items with an estimated cost of %s bytes to shard '%s'." %
+            (len(shard_items), shard_cost, shard_path)
+        )
+        shard_paths.append(shard_path)
+
+    return shard_paths
+
+
+def publish_shard(shard_path, result_path, publish_logger=None):
+    """
+    Publishes the items of a shard and saves the result tree.
+
+    The outcome of each task is stored in the properties of its item. When a
+    task fails, the remaining tasks of its top-level item and of the
+    descendants of that item are skipped. The other top-level items are
+    published regardless.
+
+    :param str shard_path: The path to the shard to publish.
+    :param str result_path: The path to save the result tree to.
+    :param publish_logger: Optional logger used during publishing.
+    :returns: The list of ``(item, task name, error message)`` tuples of the
+        tasks that failed.
+    """
+    manager = PublishManager(publish_logger)
+    manager.load(shard_path)
+
+    failures = []
+    failed_items = set()
+
+    def task_cb(task):
+        item = task.item
+        top_level_item = _get_top_level_item(item)
+        results = item.properties.setdefault(PROPERTY_KEY_SHARD_RESULTS, [])
+
+        if top_level_item in failed_items:
+            results.append(
+                {"task": task.name, "status": STATUS_SKIPPED, "error": None}
+            )
+            return
+
+        try:
+            task.publish()
+        except Exception, e:
+            logger.debug(traceback.format_exc())
+            failed_items.add(top_level_item)
+            failures.append((item, task.name, str(e)))
+            results.append(
+                {"task": task.name, "status": STATUS_FAILED, "error": str(e)}
+            )
+        else:
+            results.append(
+                {"task": task.name, "status": STATUS_PUBLISHED, "error": None}
+            )
+
+    manager._process_tasks(None, task_cb)
+    manager.save(result_path)
+
+    return failures
+
+
+def merge_shards(manager, result_paths):
+    """
+    Merges the result trees of published shards back into the tree they were
+    split from, then runs the ``post_publish`` method of the post phase hook
+    on the merged tree.
+
+    Each top-level item of the tree is replaced by its published counterpart,
+    which carries the properties set while publishing, such as
+    ``sg_publish_data_list``.
+
+    :param manager: The :class:`PublishManager` holding the split tree.
+    :param list result_paths: The paths to the result trees.
+    :returns: The list of ``(item, task name, error message)`` tuples of the
+        tasks that failed to publish.
+    :raises: :class:`sgtk.TankError` if a result tree doesn't match the tree.
+    """
+    tree = manager.tree
+    top_level_items = list(tree.root_item.children)
+
+    for result_path in result_paths:
+        result_tree = tree.load_file(result_path)
+        for result_item in list(result_tree.root_item.children):
+            index = result_item.properties.get(PROPERTY_KEY_SHARD_INDEX)
+            if (
+                index is None or
+                index >= len(top_level_items) or
+                top_level_items[index].name != result_item.name
+            ):
+                raise sgtk.TankError(
+                    "Item '%s' of shard result '%s' does not match the publish "
+                    "tree." % (result_item.name, result_path)
+                )
+            tree._substitute_item(top_level_items[index], result_item)
+
+    failures = []
+    for item in tree:
+        for result in item.properties.get(PROPERTY_KEY_SHARD_RESULTS, []):
+            if result["status"] == STATUS_FAILED:
+                failures.append((item, result["task"], result["error"]))
+
+    manager._post_phase_hook.post_publish(tree)
+
+    return failures
+
+
+def iter_published_tasks(tree):
+    """
+    A task generator yielding the tasks that were published in a shard, for
+    use with :meth:`PublishManager.finalize` once the shards are merged.
+
+    :param tree: The merged :ref:`publish-api-tree`.
+    """
+    for item in tree:
+        if not item.active:
+            continue
+
+        published_task_names = set(
+            result["task"]
+            for result in item.properties.get(PROPERTY_KEY_SHARD_RESULTS, [])
+            if result["status"] == STATUS_PUBLISHED
+        )
+        for task in item.tasks:
+            if task.active and task.name in published_task_names:
+                yield task
+
+
+def publish_sharded(manager, shard_count, work_dir, processes=None):
+    """
+    Publishes the tree of a manager by splitting it into shards, which are
+    published by a pool of local processes, and merging the results back.
+
+    .. note:: The worker processes are forked from the current process. This
+        runner is meant for testing, farm jobs should call
+        :func:`publish_shard` instead.
+
+    :param manager: The :class:`PublishManager` holding a validated tree.
+    :param int shard_count: The maximum number of shards to create.
+    :param str work_dir: The folder to save the shards and results to.
+    :param int processes: The number of worker processes. Defaults to the
+        number of shards.
+    :returns: The list of ``(item, task name, error message)`` tuples of the
+        tasks that failed to publish.
+    """
+    shard_paths = split_tree(manager.tree, shard_count, work_dir)
+    jobs = [
+        (shard_path, _get_result_path(shard_path)) for shard_path in shard_paths
+    ]
+
+    pool = multiprocessing.Pool(processes or len(jobs) or 1)
+    try:
+        pool.map(_publish_shard_job, jobs)
+    finally:
+        pool.close()
+        pool.join()
+
+    return merge_shards(manager, [result_path for (_, result_path) in jobs])
+
+
+def main(args):
+    """
+    Command line interface to split, publish and merge shards.
+
+    :param list args: The command line arguments.
+    :returns: The exit code.
+    """
+    parser = argparse.ArgumentParser(
+        prog="publish_shards",
+        description="Distributes the publish of a validated publish tree."
+    )
+    commands = parser.add_subparsers(dest="command")
+
+    split_parser = commands.add_parser(
+        "split", help="Split a publish tree into shard files."
+    )
+    split_parser.add_argument("tree", help="Path to the validated publish tree.")
+    split_parser.add_argument("shard_count", type=int, help="Number of shards.")
+    split_parser.add_argument("output_dir", help="Folder to save the shards to.")
+    split_parser.add_argument(
+        "--compress", action="store_true", help="Gzip the shard files."
+    )
+
+    publish_parser = commands.add_parser(
+        "publish", help="Publish a shard and save the result tree."
+    )
+    publish_parser.add_argument("shard", help="Path to the shard.")
+    publish_parser.add_argument("result", help="Path to save the result tree to.")
+
+    merge_parser = commands.add_parser(
+        "merge",
+        help="Merge the result trees into the publish tree and finalize it."
+    )
+    merge_parser.add_argument("tree", help="Path to the split publish tree.")
+    merge_parser.add_argument("results", nargs="+", help="Paths to the result trees.")
+    merge_parser.add_argument(
+        "--output", help="Path to save the merged tree to. Defaults to the tree."
+    )
+
+    run_parser = commands.add_parser(
+        "run", help="Split, publish with local processes, merge and finalize."
+    )
+    run_parser.add_argument("tree", help="Path to the validated publish tree.")
+    run_parser.add_argument("shard_count", type=int, help="Number of shards.")
+    run_parser.add_argument("work_dir", help="Folder to save the shards to.")
+    run_parser.add_argument("--processes", type=int, help="Number of processes.")
+
+    options = parser.parse_args(args)
+
+    if options.command == "split":
+        manager = PublishManager()
+        manager.load(options.tree)
+        for shard_path in split_tree(
+            manager.tree, options.shard_count, options.output_dir, options.compress
+        ):
+            logger.info(shard_path)
+        # the shard indexes are stored in the tree
+        manager.save(options.tree)
+        return 0
+
+    if options.command == "publish":
+        failures = publish_shard(options.shard, options.result)
+    else:
+        manager = PublishManager()
+        manager.load(options.tree)
+        if options.command == "merge":
+            failures = merge_shards(manager, options.results)
+        else:
+            failures = publish_sharded(
+                manager, options.shard_count, options.work_dir, options.processes
+            )
+        manager.finalize(task_generator=iter_published_tasks(manager.tree))
+        manager.save(getattr(options, "output", None) or options.tree)
+
+    for (item, task_name, error) in failures:
+        logger.error("Failed to publish '%s' (%s): %s" % (item.name, task_name, error))
+
+    return 1 if failures else 0
+
+
+def _get_top_level_item(item):
+    """
+    Returns the top-level ancestor of an item.
+
+    :param item: A :ref:`publish-api-item`.
+    :returns: The :ref:`publish-api-item` under the root item.
+    """
+    while not item.parent.is_root:
+        item = item.parent
+    return item
+
+
+def _get_result_path(shard_path):
+    """
+    Returns the path to save the result of a shard to.
+
+    :param str shard_path: The path to the shard.
+    :returns: The path to the result tree.
+    """
+    (root, ext) = os.path.splitext(shard_path)
+    return "%s_result%s" % (root, ext)
+
+
+def _publish_shard_job(job):
+    """
+    Publishes a shard in a worker process of :func:`publish_sharded`.
+
+    :param tuple job: The paths to the shard and to the result tree.
+    """
+    (shard_path, result_path) = job
+    publish_shard(shard_path, result_path)
@@ -8,8 +8,14 @@
 # agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
 # not expressly granted therein are reserved by Shotgun Software Inc.
 
+import hashlib
+import json
+import os
+import weakref
+
 import sgtk
-from .plugins import PublishPluginInstance
+from .interning import intern_context, intern_plugin
+from .plugins.setting import get_context_key
 
 logger = sgtk.platform.get_logger(__name__)
 
@@ -34,7 +40,9 @@ class PublishTask(object):
         "_accepted",
         "_active",
         "_visible",
-        "_enabled"
+        "_enabled",
+        "_validation_fingerprint",
+        "_validation_file_stats"
     ]
 
     @classmethod
@@ -47,16 +55,14 @@ class PublishTask(object):
             serialize this data.
         :param item: Optional item to associate with this task
         """
-        # get the plugin context
+        # get the plugin context. identical contexts and plugins are shared
+        # when deserializing a whole tree.
         plugin_context = None
         if task_dict["plugin_context"]:
-            plugin_context = sgtk.Context.from_dict(
-                sgtk.platform.current_bundle().sgtk,
-                task_dict["plugin_context"]
-            )
+            plugin_context = intern_context(task_dict["plugin_context"])
 
-        # create the plugin instance
-        plugin = PublishPluginInstance(
+        # get the plugin instance
+        plugin = intern_plugin(
             task_dict["plugin_name"],
             task_dict["plugin_path"],
             plugin_context
@@ -78,11 +84,14 @@ class PublishTask(object):
         Initialize the task.
         """
 
-        self._item = item
+        # tasks are owned by their item, keep a weak reference back to it
+        self._item = weakref.ref(item) if item else None
         self._plugin = plugin
         self._name = None # task name override of plugin name
         self._description = None # task description override of plugin desc.
         self._settings = None # initialized by init_task_settings
+        self._validation_fingerprint = None # set once validation passed
+        self._validation_file_stats = None # item files stats of the last validation
 
         # initialize the task settings
         self.init_task_settings()
@@ -99,7 +108,7 @@ class PublishTask(object):
         Initialize the instanced task settings, by using the parent plugin.
         """
 
-        self._settings = self._plugin.init_task_settings(self._item)
+        self._settings = self._plugin.init_task_settings(self.item)
 
     def to_dict(self):
         """
@@ -142,6 +151,16 @@ class PublishTask(object):
         Accept this task
         """
         accept_data = self.plugin.run_accept(self.settings, self.item)
+        self._process_accept_data(accept_data)
+
+    def _process_accept_data(self, accept_data):
+        """
+        Updates the state of the task from the result of the plugin's
+        acceptance logic.
+
+        :param dict accept_data: Dictionary with boolean keys
+            accepted/visible/enabled/checked, as returned by the plugin.
+        """
         if accept_data.get("accepted"):
 
             # this item was accepted by the plugin!
@@ -190,13 +209,38 @@ class PublishTask(object):
         """
         self.plugin.run_finalize(self.settings, self.item)
 
-    def validate(self):
+    def validate(self, force=False):
         """
         Validate this Task
 
+        Once the task passed validation, it isn't validated again as long as
+        its settings, its item's properties, local properties and context,
+        the properties of the parent items, the size and modification time
+        of the item's files and the plugin's validation fingerprint (see
+        :meth:`~tk_multi_publish2.base_hooks.PublishPlugin.get_validation_fingerprint`)
+        are unchanged. Failed validations are always run again.
+
+        :param bool force: If ``True``, the task is validated even if nothing
+            changed since it passed validation.
         :returns: True if validation succeeded, False otherwise.
         """
-        return self.plugin.run_validate(self.settings, self.item)
+        # the files are only checked once per validation, the stats are
+        # reused when the fingerprint is refreshed at the end of the pass
+        self._validation_file_stats = {}
+
+        if (
+            not force and
+            self._validation_fingerprint is not None and
+            self._validation_fingerprint == self._get_validation_fingerprint()
+        ):
+            logger.debug("Task %s unchanged since it passed validation." % (self,))
+            return True
+
+        self._validation_fingerprint = None
+        is_valid = self.plugin.run_validate(self.settings, self.item)
+        if is_valid:
+            self._validation_fingerprint = self._get_validation_fingerprint()
+        return is_valid
 
     @property
     def active(self):
@@ -291,7 +335,9 @@ class PublishTask(object):
     @property
     def item(self):
         """The :ref:`publish-api-item` this task is associated with"""
-        return self._item
+        if self._item:
+            return self._item()
+        return None
 
     @property
     def name(self):
@@ -317,3 +363,94 @@ class PublishTask(object):
         :ref:`publish-api-setting` instances.
         """
         return self._settings
+
+    ############################################################################
+    # internal methods
+
+    def _refresh_validation_fingerprint(self):
+        """
+        Updates the fingerprint of a task which passed validation to the
+        current state of its item.
+
+        Called once a validation pass is complete, so that the properties set
+        by the other tasks of the item while validating are part of the
+        validated state.
+        """
+        if self._validation_fingerprint is not None:
+            self._validation_fingerprint = self._get_validation_fingerprint()
+        self._validation_file_stats = None
+
+    def _get_validation_fingerprint(self):
+        """
+        Returns a digest of the state the validation of the task depends on,
+        or ``None`` if the plugin has its tasks always validated again.
+
+        The files of the item already checked during the current validation
+        are not checked again.
+        """
+        item = self.item
+
+        plugin_fingerprint = self._plugin.run_get_validation_fingerprint(
+            self._settings, item
+        )
+        if plugin_fingerprint is None:
+            return None
+
+        # the properties are read without allocating the containers of the
+        # items which don't have any
+        properties = item._global_properties or {}
+        file_paths = list(properties.get("sequence_paths") or [])
+        if properties.get("path"):
+            file_paths.append(properties["path"])
+
+        known_stats = self._validation_file_stats
+        if known_stats is None:
+            known_stats = {}
+
+        file_stats = []
+        for file_path in file_paths:
+            file_stat = known_stats.get(file_path)
+            if file_stat is None:
+                try:
+                    stat = os.stat(file_path)
+                except (OSError, TypeError):
+                    file_stat = (file_path, None, None)
+                else:
+                    file_stat = (file_path, stat.st_size, stat.st_mtime)
+                known_stats[file_path] = file_stat
+            file_stats.append(file_stat)
+
+        # the plugins may store what they checked in their local properties,
+        # and read the local properties of the other plugins
+        local_properties = dict(
+            (plugin_id, dict(plugin_properties))
+            for (plugin_id, plugin_properties)
+            in (item._local_properties or {}).iteritems()
+        )
+
+        # the plugins may also read the properties of the parent items
+        parent_properties = []
+        parent = item.parent
+        while parent:
+            parent_properties.append(dict(parent._global_properties or {}))
+            parent = parent.parent
+
+        state = {
+            "plugin": (self._plugin.name, self._plugin.path),
+            "plugin_fingerprint": plugin_fingerprint,
+            "settings": dict(
+                (name, setting.value)
+                for (name, setting) in (self._settings or {}).iteritems()
+            ),
+            "context": get_context_key(item.context),
+            "properties": dict(properties),
+            "parent_properties": parent_properties,
+            "local_properties": local_properties,
+            "files": file_stats,
+        }
+
+        # objects which can't be serialized, like templates, are identified
+        # by their representation
+        return hashlib.sha1(
+            json.dumps(state, sort_keys=True, default=repr)
+        ).hexdigest()
@@ -0,0 +1,194 @@
+# Copyright (c) 2018 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+from collections import OrderedDict
+import heapq
+
+import sgtk
+
+logger = sgtk.platform.get_logger(__name__)
+
+
+class TaskGraph(object):
+    """
+    The dependencies between a set of publish tasks.
+
+    A task depends on:
+
+    - the tasks of its parent item, or of the closest ancestor with tasks in
+      the graph.
+    - the tasks of its item whose plugins are listed by its plugin's
+      ``run_after`` property. When ``run_after`` is ``None``, the tasks
+      preceding it on the item, except the ones depending on it.
+
+    Iterating over the graph yields the tasks in an order satisfying their
+    dependencies, keeping the order they were supplied in whenever possible.
+    """
+
+    def __init__(self, tasks):
+        """
+        :param tasks: The tasks of the graph, typically in tree order.
+        :raises: :class:`~sgtk.TankError` if the plugins of an item depend on
+            each other.
+        """
+        self._tasks = list(tasks)
+        self._dependencies = OrderedDict((task, []) for task in self._tasks)
+        self._dependents = dict((task, []) for task in self._tasks)
+
+        tasks_by_item = OrderedDict()
+        for task in self._tasks:
+            tasks_by_item.setdefault(task.item, []).append(task)
+
+        # the declared dependencies first, so that the implicit ones can be
+        # added without introducing cycles
+        implicit_tasks = []
+        for task in self._tasks:
+            dependencies = []
+            ancestor = task.item.parent
+            while ancestor and not dependencies:
+                dependencies = list(tasks_by_item.get(ancestor, []))
+                ancestor = ancestor.parent
+
+            run_after = task.plugin.run_after
+            if run_after is None:
+                implicit_tasks.append(task)
+            else:
+                dependencies.extend(
+                    item_task for item_task in tasks_by_item[task.item]
+                    if item_task is not task and item_task.plugin.name in run_after
+                )
+
+            for dependency in dependencies:
+                self._add_dependency(task, dependency)
+
+        for task in implicit_tasks:
+            item_tasks = tasks_by_item[task.item]
+            for item_task in item_tasks[:item_tasks.index(task)]:
+                if not self._depends_on(item_task, task):
+                    self._add_dependency(task, item_task)
+
+        self._order = self._sort()
+
+    def __iter__(self):
+        """
+        Iterates over the tasks in an order satisfying their dependencies.
+        """
+        return iter(self._order)
+
+    def __len__(self):
+        """
+        The number of tasks in the graph.
+        """
+        return len(self._tasks)
+
+    def __contains__(self, task):
+        """
+        ``True`` if the task is part of the graph.
+        """
+        return task in self._dependencies
+
+    def dependencies(self, task):
+        """
+        The tasks which must be processed before the supplied one.
+
+        :param task: A task of the graph. Tasks not in the graph don't have
+            any dependencies.
+        :returns: A list of tasks.
+        """
+        return list(self._dependencies.get(task, []))
+
+    def dependents(self, task, recursive=False):
+        """
+        The tasks which can only be processed after the supplied one.
+
+        :param task: A task of the graph.
+        :param bool recursive: If ``True``, the tasks depending indirectly on
+            the supplied one are returned too.
+        :returns: A list of tasks, in topological order when recursive.
+        """
+        dependents = self._dependents.get(task, [])
+        if not recursive:
+            return list(dependents)
+
+        found = set()
+        to_visit = list(dependents)
+        while to_visit:
+            dependent = to_visit.pop()
+            if dependent not in found:
+                found.add(dependent)
+                to_visit.extend(self._dependents[dependent])
+
+        return [task for task in self._order if task in found]
+
+    ############################################################################
+    # internal methods
+
+    def _add_dependency(self, task, dependency):
+        """
+        Records that a task depends on another one.
+        """
+        if dependency not in self._dependencies[task]:
+            self._dependencies[task].append(dependency)
+            self._dependents[dependency].append(task)
+
+    def _depends_on(self, task, other_task):
+        """
+        ``True`` if a task depends, directly or not, on another one.
+        """
+        visited = set()
+        to_visit = [task]
+        while to_visit:
+            dependencies = self._dependencies[to_visit.pop()]
+            if other_task in dependencies:
+                return True
+            for dependency in dependencies:
+                if dependency not in visited:
+                    visited.add(dependency)
+                    to_visit.append(dependency)
+        return False
+
+    def _sort(self):
+        """
+        Sorts the tasks topologically, preferring the order they were
+        supplied in.
+
+        :returns: The sorted list of tasks.
+        """
+        indices = dict((task, index) for (index, task) in enumerate(self._tasks))
+        unsorted_dependencies = dict(
+            (task, len(dependencies))
+            for (task, dependencies) in self._dependencies.iteritems()
+        )
+
+        ready = [
+            indices[task]
+            for (task, count) in unsorted_dependencies.iteritems() if not count
+        ]
+        heapq.heapify(ready)
+
+        order = []
+        while ready:
+            task = self._tasks[heapq.heappop(ready)]
+            order.append(task)
+            for dependent in self._dependents[task]:
+                unsorted_dependencies[dependent] -= 1
+                if not unsorted_dependencies[dependent]:
+                    heapq.heappush(ready, indices[dependent])
+
+        if len(order) < len(self._tasks):
+            cyclic_tasks = [
+                str(task) for task in self._tasks if unsorted_dependencies[task]
+            ]
+            raise sgtk.TankError(
+                "The following tasks can't be ordered because of circular "
+                "dependencies: %s" % (", ".join(cyclic_tasks),)
+            )
+
+        return order
@@ -0,0 +1,127 @@
+# Copyright (c) 2018 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+from collections import OrderedDict
+import atexit
+import os
+
+import sgtk
+from ..util import Threaded
+
+logger = sgtk.platform.get_logger(__name__)
+
+# Registries currently holding temporary files. They are cleared when the
+# interpreter exits, even if their owner has been garbage collected.
+_active_registries = set()
+
+
+class TempFileRegistry(Threaded):
+    """
+    Keeps track of the temporary files created during a publish session.
+
+    The files are deleted explicitly, either when the registry's owner asks
+    for it or when the interpreter exits, rather than relying on objects
+    being garbage collected.
+    """
+
+    def __init__(self):
+        """
+        Constructor.
+        """
+        Threaded.__init__(self)
+        self._paths = OrderedDict()
+
+    def __len__(self):
+        """
+        Returns the number of temporary files registered.
+        """
+        return len(self._paths)
+
+    @property
+    def paths(self):
+        """
+        A list of the temporary files registered, in order of registration.
+        """
+        return list(self._paths)
+
+    @Threaded.exclusive
+    def add(self, path):
+        """
+        Registers a temporary file.
+
+        :param str path: Path to the temporary file.
+        """
+        self._paths[path] = None
+        _active_registries.add(self)
+
+    def remove(self, paths):
+        """
+        Deletes the supplied temporary files and unregisters them.
+
+        :param list paths: Paths to the temporary files to delete.
+        """
+        for path in self._pop_paths(paths):
+            _delete_temp_file(path)
+
+    def clear(self):
+        """
+        Deletes all the temporary files registered.
+        """
+        for path in self._pop_paths(self.paths):
+            _delete_temp_file(path)
+
+    @Threaded.exclusive
+    def _pop_paths(self, paths):
+        """
+        Unregisters the supplied paths.
+
+        :param list paths: Paths to unregister.
+        :returns: The list of paths that were registered.
+        """
+        popped_paths = [path for path in paths if path in self._paths]
+        for path in popped_paths:
+            del self._paths[path]
+
+        if not self._paths:
+            _active_registries.discard(self)
+
+        return popped_paths
+
+
+# Registry for the temporary files of items that don't belong to a tree.
+session_temp_files = TempFileRegistry()
+
+
+def _delete_temp_file(path):
+    """
+    Deletes a temporary file, logging any failure.
+
+    :param str path: Path to the temporary file.
+    """
+    if not os.path.exists(path):
+        return
+
+    try:
+        os.remove(path)
+    except Exception, e:
+        logger.warning(
+            "Could not remove temporary file '%s': %s" % (path, e)
+        )
+    else:
+        logger.debug("Removed temp file '%s'" % path)
+
+
+@atexit.register
+def _clear_active_registries():
+    """
+    Deletes the temporary files still registered when the interpreter exits.
+    """
+    for registry in list(_active_registries):
+        registry.clear()
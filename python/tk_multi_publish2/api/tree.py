@@ -8,12 +8,19 @@
 # agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
 # not expressly granted therein are reserved by Shotgun Software Inc.
 
+import fnmatch
+import gzip
+import os
+import re
 import traceback
+import weakref
 
 import json
 
 import sgtk
+from .interning import interning
 from .item import PublishItem
+from .temp_files import TempFileRegistry
 
 logger = sgtk.platform.get_logger(__name__)
 
@@ -51,6 +58,10 @@ class PublishTree(object):
             for task in item.tasks:
                 # process the task
 
+    .. note:: Iterating over the tree walks a snapshot of its items, taken
+        when the iteration starts. Items added or removed during the
+        iteration are only reflected by the next one.
+
     The special, :py:attr:`~root_item` is exposed as a property on publish tree
     instances. The root item is not processed as part of the validation,
     publish, or finalize execution phases, but it can be used to house
@@ -88,11 +99,31 @@ class PublishTree(object):
     :meth:`~load_file` methods.
     """
 
-    __slots__ = ["_root_item"]
+    __slots__ = [
+        "__weakref__",
+        "_flattened_items",
+        "_path_index",
+        "_root_item",
+        "_temp_files"
+    ]
+
+    # item property storing the path a top-level item was collected from
+    PROPERTY_KEY_COLLECTED_FILE_PATH = "__collected_file_path__"
 
     # define a serialization version to allow backward compatibility if the
-    # serialization method changes
-    SERIALIZATION_VERSION = 1
+    # serialization method changes. version 2 introduced the streamed format,
+    # the items are serialized the same way in both versions.
+    SERIALIZATION_VERSION = 2
+
+    # serialization versions which can still be loaded
+    SUPPORTED_SERIALIZATION_VERSIONS = (1, 2)
+
+    # trees are saved as a stream of json records, one line per item, rather
+    # than as a single nested document
+    STREAM_SERIALIZATION_FORMAT = "publish_tree_stream"
+
+    # the first bytes of a gzip compressed file
+    GZIP_MAGIC_NUMBER = "\x1f\x8b"
 
     @classmethod
     def from_dict(cls, tree_dict):
@@ -101,40 +132,44 @@ class PublishTree(object):
         supplied dictionary is typically the result of calling ``to_dict`` on
         a publish tree instance during serialization.
         """
-        # This check is valid until we need to alter the way serialization is
-        # handled after initial release. Once that happens, this should be
-        # altered to handle the various versions separately with this as the
-        # fallback when the serialization version is not recognized.
         serialization_version = tree_dict.get("serialization_version", "<missing version>")
-        if serialization_version != cls.SERIALIZATION_VERSION:
-            raise sgtk.TankError(
-                "Unrecognized serialization version (%s) for serialized publish "
-                "task. It is unclear how this could have happened. Perhaps the "
-                "serialized file was hand edited? Please consult your pipeline "
-                "TD/developer/admin." % serialization_version
-            )
+        cls._check_serialization_version(serialization_version)
 
         new_tree = cls()
-        new_tree._root_item = PublishItem.from_dict(
-            tree_dict["root_item"],
-            serialization_version
-        )
+        with interning():
+            new_tree._root_item = PublishItem.from_dict(
+                tree_dict["root_item"],
+                serialization_version
+            )
+        new_tree._attach_items()
 
         return new_tree
 
     @staticmethod
-    def load_file(file_path):
+    def load_file(file_path, select=None):
         """
         This method returns a new :class:`~.PublishTree` instance by reading
-        a serialized tree file from disk._sgtk_custom_type
+        a serialized tree file from disk. Gzip compressed files are detected
+        and decompressed on the fly.
 
         :param str file_path: The path to a serialized publish tree.
+        :param select: Optional callable selecting the items to load. See
+            :meth:`load`.
         :return: A :class:`~.PublishTree` instance
         """
 
         with open(file_path, "rb") as tree_file_obj:
             try:
-                return PublishTree.load(tree_file_obj)
+                is_compressed = (
+                    tree_file_obj.read(len(PublishTree.GZIP_MAGIC_NUMBER)) ==
+                    PublishTree.GZIP_MAGIC_NUMBER
+                )
+                tree_file_obj.seek(0)
+
+                if is_compressed:
+                    with gzip.GzipFile(fileobj=tree_file_obj, mode="rb") as gzip_file_obj:
+                        return PublishTree.load(gzip_file_obj, select=select)
+                return PublishTree.load(tree_file_obj, select=select)
             except Exception, e:
                 logger.error(
                     "Error trying to load publish tree from file '%s': %s" % (file_path, e)
@@ -142,19 +177,65 @@ class PublishTree(object):
                 raise
 
     @staticmethod
-    def load(file_obj):
+    def load(file_obj, select=None):
         """
         Load a publish tree from a supplied file-like object.
 
+        Both the streamed format written by :meth:`save` and the single json
+        document written by previous releases are supported. Streamed trees
+        are read one item at a time.
+
+        A subset of the tree can be loaded by supplying a ``select`` callable.
+        It is called with the serialized representation of each item, a
+        dictionary as returned by :meth:`PublishItem.to_dict` without the
+        ``children`` key, and returns ``True`` if the item and its descendants
+        should be loaded. The ancestors of the selected items are loaded
+        without their tasks, in order to preserve the hierarchy. The other
+        items are skipped as they are read, without creating their tasks or
+        plugins. :meth:`item_selector` builds such a callable.
+
+        .. code-block:: python
+
+            tree = PublishTree.load_file(
+                path,
+                select=PublishTree.item_selector(type_filters=["file.image*"])
+            )
+
         :param file file_obj: A file-like object
+        :param select: Optional callable selecting the items to load. All the
+            items are loaded by default.
         :return: A :class:`~.PublishTree` instance
         """
 
         try:
+            # streamed trees start with a header record on its own line
+            first_line = file_obj.readline()
+            try:
+                header = sgtk.util.json.loads(first_line)
+            except ValueError:
+                header = None
+
+            if (
+                isinstance(header, dict) and
+                header.get("serialization_format") == PublishTree.STREAM_SERIALIZATION_FORMAT
+            ):
+                return PublishTree._from_stream(header, file_obj, select)
+
             # Pass in a object hook so that certain Toolkit objects are restored back
             # from their serialized representation.
-            return PublishTree.from_dict(
-                sgtk.util.json.load(file_obj, object_hook=_json_to_objects)
+            tree_dict = sgtk.util.json.loads(
+                first_line + file_obj.read(),
+                object_hook=_json_to_objects
+            )
+            if select is None:
+                return PublishTree.from_dict(tree_dict)
+
+            serialization_version = tree_dict.get("serialization_version", "<missing version>")
+            PublishTree._check_serialization_version(serialization_version)
+            return PublishTree._from_records(
+                _iter_document_records(tree_dict["root_item"]),
+                serialization_version,
+                select
             )
         except Exception, e:
             logger.error(
@@ -163,6 +244,38 @@ class PublishTree(object):
             )
             raise
 
+    @staticmethod
+    def item_selector(type_filters=None, keys=None):
+        """
+        Returns a callable selecting serialized items to load, for use with
+        :meth:`load` and :meth:`load_file`.
+
+        :param list type_filters: Item type filters, such as ``file.image*``,
+            matched the same way as the item filters of the publish plugins.
+        :param list keys: Keys of the items to select.
+        :returns: A callable returning ``True`` for the serialized items
+            matching any of the type filters or keys.
+        """
+        type_pattern = None
+        if type_filters:
+            type_pattern = re.compile(
+                "|".join(
+                    "(?:%s)" % (fnmatch.translate(os.path.normcase(type_filter)),)
+                    for type_filter in type_filters
+                )
+            )
+        keys = set(keys or [])
+
+        def select(item_dict):
+            if item_dict.get("key") in keys:
+                return True
+            return bool(
+                type_pattern and
+                type_pattern.match(os.path.normcase(item_dict["type_spec"]))
+            )
+
+        return select
+
     def __init__(self, publish_logger=None):
         """Initialize the publish tree instance."""
 
@@ -176,14 +289,39 @@ class PublishTree(object):
             publish_logger,
             parent=None
         )
+        # items only keep a weak reference to the tree that owns them
+        self._root_item._tree = weakref.ref(self)
+
+        # Maps the normalized path each top-level item was collected from to
+        # the list of items collected from it.
+        self._path_index = {}
+
+        # All the items in the tree, depth first. Built on demand and reset
+        # whenever an item is added to or removed from the tree.
+        self._flattened_items = None
+
+        # Temporary files created by the items of the tree, such as
+        # thumbnails written to disk. They are deleted when the items are
+        # removed from the tree, or when the interpreter exits.
+        self._temp_files = TempFileRegistry()
 
     def __iter__(self):
-        """Iterates over the tree, depth first."""
+        """
+        Iterates over the tree, depth first.
+
+        The order of the items is cached until the structure of the tree
+        changes, so repeated walks over an unchanged tree don't traverse the
+        hierarchy again. Each iteration walks a snapshot of the items taken
+        when it starts: items added while iterating are not visited and
+        items removed while iterating are still visited. The changes are
+        reflected by the next iteration.
+        """
+
+        if self._flattened_items is None:
+            # item's are iterable. this will get all items under the root.
+            self._flattened_items = list(self._root_item.descendants)
 
-        # item's are recursively iterable. this will yield all items under the
-        # root.
-        for item in self._root_item.descendants:
-            yield item
+        return iter(self._flattened_items)
 
     def clear(self, clear_persistent=False):
         """
@@ -200,6 +338,23 @@ class PublishTree(object):
             if clear_persistent or not item.persistent:
                 self.remove_item(item)
 
+        if clear_persistent:
+            self._path_index.clear()
+            self._clear_temp_files()
+
+    def find_by_path(self, file_path):
+        """
+        Returns the top-level items collected from the supplied file path.
+
+        The lookup does not depend on the number of items in the tree. Paths
+        are normalized before comparison.
+
+        :param str file_path: The path to look for.
+        :returns: A list of :ref:`publish-api-item` instances, in collection
+            order. The list is empty if no item was collected from the path.
+        """
+        return list(self._path_index.get(_normalize_path(file_path), []))
+
     def pformat(self):
         """
         Returns a human-readable string representation of the tree, useful for
@@ -251,36 +406,59 @@ class PublishTree(object):
         # all other items should have a parent
         item.parent.remove_item(item)
 
-    def save_file(self, file_path):
+    def save_file(self, file_path, compress=False, items=None):
         """
         Save the serialized tree instance to disk at the supplied path.
+
+        :param str file_path: The path to save the tree to.
+        :param bool compress: If ``True``, the file is gzip compressed.
+        :param list items: Optional list of top-level items to save. See
+            :meth:`save`.
         """
 
-        with open(file_path, "w") as file_obj:
+        with open(file_path, "wb" if compress else "w") as file_obj:
             try:
-                self.save(file_obj)
+                if compress:
+                    with gzip.GzipFile(fileobj=file_obj, mode="wb") as gzip_file_obj:
+                        self.save(gzip_file_obj, items=items)
+                else:
+                    self.save(file_obj, items=items)
             except Exception, e:
                 logger.error(
                     "Error saving the publish tree to disk: %s" % (e,)
                 )
                 raise
 
-    def save(self, file_obj):
+    def save(self, file_obj, items=None):
         """
         Write a json-serialized representation of the publish tree to the
         supplied file-like object.
+
+        The tree is streamed one item at a time: a header record is followed by
+        a record for each item, in depth-first order, each on its own line.
+        Items reference their parent by its position in the stream.
+
+        :param file file_obj: A file-like object.
+        :param list items: Optional list of top-level items to save, along
+            with their descendants. All the items are saved by default.
         """
         try:
-            json.dump(
-                self,
+            self._write_record(
                 file_obj,
-                indent=2,
-                # all non-ASCII characters in the output are escaped with \uXXXX sequences
-                ensure_ascii=True,
-                # Use a custom JSON encoder to certain Toolkit objects are converted into a
-                # JSON
-                cls=_PublishTreeEncoder
+                {
+                    "serialization_format": self.STREAM_SERIALIZATION_FORMAT,
+                    "serialization_version": self.SERIALIZATION_VERSION
+                }
             )
+
+            # parents are always written before their children
+            item_ids = {}
+            for item in self._iter_items(items):
+                item_record = item._to_record()
+                item_record["id"] = len(item_ids)
+                item_record["parent_id"] = item_ids.get(item.parent)
+                item_ids[item] = item_record["id"]
+                self._write_record(file_obj, item_record)
         except Exception, e:
             logger.error(
                 "Error saving publish tree: %s\n%s" %
@@ -313,6 +491,335 @@ class PublishTree(object):
     ############################################################################
     # protected methods
 
+    def _substitute_item(self, item, new_item):
+        """
+        Replaces an item of the tree, along with its descendants, by an item
+        coming from another tree.
+
+        :param item: The :ref:`publish-api-item` to replace.
+        :param new_item: The :ref:`publish-api-item` to insert in its place.
+        """
+        parent = item.parent
+        children = parent._children
+        children[children.index(item)] = new_item
+        new_item._set_parent(parent)
+
+        tree_ref = weakref.ref(self)
+        new_item._attach_to_tree(tree_ref)
+        for descendant in new_item.descendants:
+            descendant._attach_to_tree(tree_ref)
+
+        self._item_removed(item)
+        self._item_created(new_item)
+
+    @classmethod
+    def _check_serialization_version(cls, serialization_version):
+        """
+        Raises an error if the supplied serialization version is not supported.
+
+        :param serialization_version: The version of a serialized publish tree.
+        :raises: :class:`sgtk.TankError` if the version is unrecognized.
+        """
+        # Version 2 only changed the layout of the saved file, the items and
+        # tasks are read the same way for all the supported versions. Handle
+        # the versions separately here if this ever changes.
+        if serialization_version not in cls.SUPPORTED_SERIALIZATION_VERSIONS:
+            raise sgtk.TankError(
+                "Unrecognized serialization version (%s) for serialized publish "
+                "task. It is unclear how this could have happened. Perhaps the "
+                "serialized file was hand edited? Please consult your pipeline "
+                "TD/developer/admin." % serialization_version
+            )
+
+    @classmethod
+    def _from_stream(cls, header, file_obj, select=None):
+        """
+        Create a publish tree instance from the item records of a streamed
+        tree.
+
+        :param dict header: The header record of the stream.
+        :param file file_obj: A file-like object positioned after the header.
+        :param select: Optional callable selecting the items to load.
+        :return: A :class:`~.PublishTree` instance
+        """
+        serialization_version = header.get("serialization_version", "<missing version>")
+        cls._check_serialization_version(serialization_version)
+
+        item_records = (
+            sgtk.util.json.loads(line, object_hook=_json_to_objects)
+            for line in file_obj
+            if line.strip()
+        )
+        return cls._from_records(item_records, serialization_version, select)
+
+    @classmethod
+    def _from_records(cls, item_records, serialization_version, select=None):
+        """
+        Create a publish tree instance from item records, in depth-first order.
+
+        Only the selected items, their descendants and their ancestors are
+        created. The records of the other items are only kept while their
+        descendants are being read.
+
+        :param item_records: An iterable of item records, as written by
+            :meth:`save`.
+        :param int serialization_version: The version of publish item
+            serialization used for the records.
+        :param select: Optional callable selecting the items to load.
+        :return: A :class:`~.PublishTree` instance
+        """
+        new_tree = cls()
+
+        # the ancestors of the current record, as (id, item, selected) tuples.
+        # ancestors which haven't been created yet are stored as records.
+        ancestors = []
+
+        with interning():
+            for item_record in item_records:
+                parent_id = item_record["parent_id"]
+                if parent_id is None:
+                    new_tree._root_item = PublishItem._from_record(
+                        item_record,
+                        serialization_version
+                    )
+                    ancestors = [(item_record["id"], new_tree._root_item, select is None)]
+                    continue
+
+                while ancestors and ancestors[-1][0] != parent_id:
+                    ancestors.pop()
+                if not ancestors:
+                    raise sgtk.TankError(
+                        "The parent of serialized item '%s' could not be found." %
+                        (item_record["name"],)
+                    )
+
+                if not ancestors[-1][2] and not select(item_record):
+                    ancestors.append((item_record["id"], item_record, False))
+                    continue
+
+                parent = _create_ancestors(ancestors, serialization_version)
+                new_item = PublishItem._from_record(
+                    item_record,
+                    serialization_version,
+                    parent=parent
+                )
+                _add_child(parent, new_item)
+                ancestors.append((item_record["id"], new_item, True))
+
+        new_tree._attach_items()
+
+        return new_tree
+
+    def _attach_items(self):
+        """
+        Attaches deserialized items, which are created outside of the tree, to
+        this tree.
+        """
+        tree_ref = weakref.ref(self)
+        self._root_item._attach_to_tree(tree_ref)
+        self._flattened_items = None
+        for item in self:
+            item._attach_to_tree(tree_ref)
+        for item in self._root_item.children:
+            self._add_to_path_index(item)
+
+    def _iter_items(self, top_level_items=None):
+        """
+        Iterates over the root item and the items of the tree, parents first.
+
+        :param list top_level_items: Optional list of top-level items to
+            iterate over, along with their descendants. All the items are
+            iterated over by default.
+        """
+        yield self._root_item
+
+        if top_level_items is None:
+            for item in self:
+                yield item
+            return
+
+        for top_level_item in top_level_items:
+            yield top_level_item
+            for item in top_level_item.descendants:
+                yield item
+
+    def _item_created(self, item):
+        """
+        Called when an item is created in the tree.
+
+        :param item: The new :ref:`publish-api-item`.
+        """
+        self._flattened_items = None
+        self._add_to_path_index(item)
+
+    def _item_removed(self, item):
+        """
+        Called when an item is removed from the tree.
+
+        :param item: The removed :ref:`publish-api-item`.
+        """
+        self._flattened_items = None
+        self._remove_from_path_index(item)
+
+        # the temporary files of the removed items are no longer needed
+        self._temp_files.remove(item._release_temp_files())
+        for descendant in item.descendants:
+            self._temp_files.remove(descendant._release_temp_files())
+
+    def _reconcile_items(self, old_items, new_items):
+        """
+        Replaces the supplied old top-level items by the newly collected ones,
+        keeping the old items that are unchanged.
+
+        New and old items with the same key and type are considered unchanged.
+        The old item is kept in place of the new one, along with its tasks, and
+        their children are reconciled the same way. The properties set by the
+        collector on the new item, like node references or paths, are copied
+        onto the old item. The other old items are removed and the other new
+        items are kept.
+
+        :param list old_items: The previously collected top-level items.
+        :param list new_items: The newly collected top-level items.
+        :returns: A dictionary mapping the discarded new items to the old items
+            kept in their place.
+        """
+        substitutes = {}
+        children = self._reconcile_children(
+            self._root_item, old_items, new_items, substitutes)
+
+        # the collected items follow the items not involved in the collection
+        involved_items = set(old_items) | set(new_items)
+        self._root_item._children = [
+            item for item in self._root_item._children
+            if item not in involved_items
+        ] + children
+
+        self._flattened_items = None
+
+        return substitutes
+
+    def _reconcile_children(self, parent, old_children, new_children, substitutes):
+        """
+        Reconciles the old and new children of an item.
+
+        See :meth:`_reconcile_items`.
+
+        :param parent: The item the reconciled children belong to.
+        :param list old_children: The previous children.
+        :param list new_children: The newly collected children.
+        :param dict substitutes: Dictionary updated with the discarded new items
+            and the old items kept in their place.
+        :returns: The list of reconciled children.
+        """
+        old_by_key = {}
+        for old_item in old_children:
+            if old_item.key is not None:
+                old_by_key.setdefault((old_item.key, old_item.type_spec), old_item)
+
+        children = []
+        for new_item in new_children:
+            old_item = None
+            if new_item.key is not None:
+                old_item = old_by_key.pop((new_item.key, new_item.type_spec), None)
+
+            if old_item is None:
+                if new_item.parent is not parent:
+                    new_item._set_parent(parent)
+                children.append(new_item)
+                continue
+
+            # the item is unchanged, keep the old one with the properties the
+            # collector refreshed, and reconcile its children
+            if new_item._global_properties:
+                old_item.properties.update(new_item._global_properties)
+            old_item._children = self._reconcile_children(
+                old_item,
+                list(old_item._children),
+                list(new_item._children),
+                substitutes
+            )
+            substitutes[new_item] = old_item
+            children.append(old_item)
+
+            # the new item's children now belong to the old item, only the
+            # new item itself is discarded
+            new_item._children = []
+            self._item_removed(new_item)
+
+        # remove the old items that weren't collected again
+        kept_items = set(children)
+        for old_item in old_children:
+            if old_item not in kept_items:
+                self._item_removed(old_item)
+
+        return children
+
+    def _clear_temp_files(self):
+        """
+        Deletes all the temporary files created by the items of the tree.
+        """
+        self._root_item._release_temp_files()
+        for item in self:
+            item._release_temp_files()
+        self._temp_files.clear()
+
+    def _add_to_path_index(self, item):
+        """
+        Indexes a top-level item by the path it was collected from.
+
+        Items without a collected path, or that aren't top-level, are ignored.
+
+        :param item: The :ref:`publish-api-item` to index.
+        """
+        if item.parent is not self._root_item:
+            return
+
+        file_path = _get_collected_path(item)
+        if file_path is None:
+            return
+
+        items = self._path_index.setdefault(_normalize_path(file_path), [])
+        if item not in items:
+            items.append(item)
+
+    def _remove_from_path_index(self, item):
+        """
+        Removes an item from the path index.
+
+        :param item: The :ref:`publish-api-item` being removed from the tree.
+        """
+        file_path = _get_collected_path(item)
+        if file_path is None:
+            return
+
+        path_key = _normalize_path(file_path)
+        items = self._path_index.get(path_key, [])
+        if item in items:
+            items.remove(item)
+        if not items:
+            self._path_index.pop(path_key, None)
+
+    @staticmethod
+    def _write_record(file_obj, record):
+        """
+        Writes a json record on its own line.
+
+        :param file file_obj: A file-like object.
+        :param dict record: The record to write.
+        """
+        file_obj.write(
+            json.dumps(
+                record,
+                # all non-ASCII characters in the output are escaped with \uXXXX sequences,
+                # which also keeps every record on a single line
+                ensure_ascii=True,
+                # Use a custom JSON encoder to certain Toolkit objects are converted into a
+                # JSON
+                cls=_PublishTreeEncoder
+            )
+        )
+        file_obj.write("\n")
+
     def _format_tree(self, parent_item, depth=0):
         """
         Depth first traversal and string formatting of the tree given a root
@@ -353,7 +860,93 @@ class _PublishTreeEncoder(json.JSONEncoder):
                 "name": data.name
             }
         else:
-            return super(_PublishTreeEncoder).default(data)
+            return super(_PublishTreeEncoder, self).default(data)
+
+
+def _iter_document_records(root_dict):
+    """
+    Iterates over the items of a tree serialized as a single document, as
+    item records in depth-first order.
+
+    :param dict root_dict: The serialized root item.
+    """
+    next_id = 0
+    stack = [(root_dict, None)]
+    while stack:
+        (item_dict, parent_id) = stack.pop()
+        item_record = dict(item_dict)
+        children = item_record.pop("children")
+        item_record["id"] = next_id
+        item_record["parent_id"] = parent_id
+        yield item_record
+
+        stack.extend((child_dict, next_id) for child_dict in reversed(children))
+        next_id += 1
+
+
+def _create_ancestors(ancestors, serialization_version):
+    """
+    Creates the ancestors of an item that haven't been created yet, without
+    their tasks.
+
+    :param list ancestors: The (id, item, selected) tuples of the ancestors,
+        from the root down. Records are replaced by the items created.
+    :param int serialization_version: The version of publish item
+        serialization used for the records.
+    :returns: The parent item, the last of the ancestors.
+    """
+    for (index, (item_id, item, selected)) in enumerate(ancestors):
+        if not isinstance(item, dict):
+            continue
+
+        parent = ancestors[index - 1][1]
+        item_record = dict(item, tasks=[])
+        item = PublishItem._from_record(
+            item_record,
+            serialization_version,
+            parent=parent
+        )
+        _add_child(parent, item)
+        ancestors[index] = (item_id, item, selected)
+
+    return ancestors[-1][1]
+
+
+def _add_child(parent, item):
+    """
+    Appends a deserialized item to the children of its parent.
+
+    :param parent: The parent :ref:`publish-api-item`.
+    :param item: The child :ref:`publish-api-item`.
+    """
+    if not parent._children:
+        parent._children = []
+    parent._children.append(item)
+
+
+def _get_collected_path(item):
+    """
+    Returns the path an item was collected from.
+
+    Reads the item's properties without allocating them, as most items don't
+    have any.
+
+    :param item: A :ref:`publish-api-item`.
+    :returns: The collected path or ``None``.
+    """
+    if not item._global_properties:
+        return None
+    return item._global_properties.get(PublishTree.PROPERTY_KEY_COLLECTED_FILE_PATH)
+
+
+def _normalize_path(file_path):
+    """
+    Normalizes a path so that equivalent spellings of it can be compared.
+
+    :param str file_path: The path to normalize.
+    :returns: The normalized path.
+    """
+    return os.path.normcase(os.path.normpath(file_path))
 
 
 def _json_to_objects(data):
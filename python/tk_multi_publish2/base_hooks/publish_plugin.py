@@ -801,6 +801,48 @@ class PublishPlugin(PluginBase):
         """
         return self.plugin.settings["Item Type Filters"].value
 
+    @property
+    def thread_safe(self):
+        """
+        ``True`` if the :meth:`publish` method of this plugin can run on a
+        worker thread, concurrently with the tasks of other plugins and other
+        items. ``False`` by default.
+
+        Thread safe plugins are only run in parallel when the publish is run
+        with several workers (see :meth:`~.api.PublishManager.publish`). Plugins
+        spending most of their time waiting on I/O, copying or uploading files
+        for example, benefit the most.
+
+        The tasks of an item always run after the tasks of its parent items.
+        """
+        return False
+
+    @property
+    def run_after(self):
+        """
+        A :class:`list` of the names of the publish plugins whose tasks on the
+        same item must be published before this plugin's task, or ``None``.
+
+        When ``None``, the default, the task runs after all the tasks
+        preceding it on the item. Declaring the plugins this plugin actually
+        depends on allows the tasks of an item to be published in parallel.
+        The listed plugins may be configured after this one: the tasks are
+        processed in an order satisfying the dependencies of all the plugins,
+        and a :class:`~sgtk.TankError` is raised if they depend on each other.
+
+        When publishing with failures pruned, a task which fails only
+        prevents the tasks of the plugins depending on it, and the tasks of
+        the child items, from being published.
+
+        .. code-block:: python
+
+            @property
+            def run_after(self):
+                # the files have to be copied before they are registered
+                return ["Copy Files"]
+        """
+        return None
+
     ############################################################################
     # Publish processing methods
 
@@ -883,6 +925,39 @@ class PublishPlugin(PluginBase):
         """
         raise NotImplementedError
 
+    def accept_many(self, task_settings, items):
+        """
+        Optional method called by the publisher to run the acceptance logic on
+        several items of the same type and context at once.
+
+        Implementing this method allows the plugin to share expensive work
+        between the items, for example a single Shotgun query for all the
+        items collected from a dropped folder. If the method is not
+        implemented, :meth:`accept` is called for each item instead.
+
+        Example implementation:
+
+        .. code-block:: python
+
+            def accept_many(self, task_settings, items):
+
+                paths = [item.properties["path"] for item in items]
+                sizes = self._get_file_sizes(paths)
+
+                return [
+                    {"accepted": size <= math.pow(10, 9)} for size in sizes
+                ]
+
+        :param list task_settings: A list of task settings dictionaries, one
+            for each item. See :meth:`accept`.
+        :param list items: The :ref:`publish-api-item` instances to process for
+            acceptance.
+
+        :returns: A list of acceptance dictionaries, as returned by
+            :meth:`accept`, in the same order as the supplied items.
+        """
+        raise NotImplementedError
+
     def validate(self, task_settings, item):
         """
         Validates the given item, ensuring it is ok to publish.
@@ -919,6 +994,39 @@ class PublishPlugin(PluginBase):
         """
         raise NotImplementedError
 
+    def get_validation_fingerprint(self, task_settings, item):
+        """
+        Returns the state, besides the item and its settings, the validation of
+        the given item depends on.
+
+        Once a task passed validation, it is only validated again when its
+        settings, the properties of its item and parent items, its context or
+        the files of its item changed, or when the value returned by this
+        method changed. Plugins checking some external state, Shotgun entities
+        conflicting with the publish for example, can return a summary of that
+        state, or ``None`` to have their tasks validated on every pass.
+
+        The returned value is compared to the one returned after the previous
+        validation, so it should be cheap to compute and JSON serializable.
+        Returns an empty string by default.
+
+        .. code-block:: python
+
+            def get_validation_fingerprint(self, task_settings, item):
+                # the publish conflicts with the files published in the
+                # meantime, always check them again
+                return None
+
+        :param dict task_settings: The keys are strings, matching the keys returned
+            in the :data:`settings` property. The values are
+            :ref:`publish-api-setting` instances.
+        :param item: The :ref:`publish-api-item` instance to validate.
+
+        :returns: A JSON serializable value, or ``None`` to always validate the
+            item again.
+        """
+        return ""
+
     def publish(self, task_settings, item):
         """
         Executes the publish logic for the given item and settings.
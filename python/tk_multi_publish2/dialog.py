@@ -130,6 +130,33 @@ class AppDialog(QtGui.QWidget):
 
         # buttons
         self.ui.validate.clicked.connect(self.do_validate)
+        self.ui.validate.setToolTip(
+            "Validate the items changed since they passed validation."
+        )
+
+        # validate menu, to also validate the items unchanged since they
+        # passed validation, when the data checked in Shotgun may have changed
+        self._validate_all_action = QtGui.QAction("Validate All Again", self)
+        self._validate_all_action.setToolTip(
+            "Validate all the items, including the ones unchanged since they "
+            "passed validation."
+        )
+        self._validate_all_action.triggered.connect(
+            lambda: self.do_validate(force=True))
+
+        self._validate_menu = QtGui.QMenu(self)
+        self._validate_menu.addAction(self._validate_all_action)
+
+        self._validate_options = QtGui.QToolButton(self.ui.bottom_frame)
+        self._validate_options.setObjectName("validate_options")
+        self._validate_options.setToolTip("More validation options")
+        self._validate_options.setMenu(self._validate_menu)
+        self._validate_options.setPopupMode(QtGui.QToolButton.InstantPopup)
+        self.ui.horizontalLayout.insertWidget(
+            self.ui.horizontalLayout.indexOf(self.ui.validate) + 1,
+            self._validate_options
+        )
+
         self.ui.publish.clicked.connect(self.do_publish)
         self.ui.close.clicked.connect(self.close)
         self.ui.close.hide()
@@ -327,9 +354,11 @@ class AppDialog(QtGui.QWidget):
             # disable buttons
             self.ui.publish.setEnabled(False)
             self.ui.validate.setEnabled(False)
+            self._validate_options.setEnabled(False)
         else:
             self.ui.publish.setEnabled(True)
             self.ui.validate.setEnabled(True)
+            self._validate_options.setEnabled(True)
 
         # now look at selection
         items = self.ui.items_tree.selectedItems()
@@ -867,6 +896,9 @@ class AppDialog(QtGui.QWidget):
     def _full_rebuild(self):
         """
         Full rebuild of the plugin state. Everything is recollected.
+
+        Session items that didn't change since the last collection are kept,
+        along with their tasks and settings.
         """
         self._progress_handler.set_phase(self._progress_handler.PHASE_LOAD)
         self._progress_handler.push(
@@ -875,10 +907,14 @@ class AppDialog(QtGui.QWidget):
         )
 
         previously_collected_files = self._publish_manager.collected_files
-        self._publish_manager.tree.clear(clear_persistent=True)
+
+        # the external files are collected again below
+        tree = self._publish_manager.tree
+        for item in list(tree.persistent_items):
+            tree.remove_item(item)
 
         logger.debug("Refresh: Running collection on current session...")
-        new_session_items = self._publish_manager.collect_session()
+        new_session_items = self._publish_manager.collect_session(incremental=True)
 
         logger.debug(
             "Refresh: Running collection on all previously collected external "
@@ -1124,12 +1160,14 @@ class AppDialog(QtGui.QWidget):
         # reset progress bar
         self._progress_handler.reset_progress(total_number_nodes * number_phases)
 
-    def do_validate(self, is_standalone=True):
+    def do_validate(self, is_standalone=True, force=False):
         """
         Perform a full validation
 
         :param bool is_standalone: Indicates that the validation runs on its own,
             not part of a publish workflow.
+        :param bool force: If ``True``, the items unchanged since they passed
+            validation are validated again.
         :returns: number of issues reported
         """
 
@@ -1148,7 +1186,9 @@ class AppDialog(QtGui.QWidget):
         self.ui.stop_processing.show()
         try:
             failed_to_validate = self._publish_manager.validate(
-                task_generator=self._validate_task_generator(is_standalone))
+                task_generator=self._validate_task_generator(is_standalone),
+                force=force
+            )
             num_issues = len(failed_to_validate)
         finally:
             self._progress_handler.pop()
@@ -1286,6 +1326,7 @@ class AppDialog(QtGui.QWidget):
         # disable validate and publish buttons
         # show close button instead
         self.ui.validate.hide()
+        self._validate_options.hide()
         self.ui.publish.hide()
         self.ui.close.show()
 
@@ -1318,6 +1359,7 @@ class AppDialog(QtGui.QWidget):
 
         # show publish and validate buttons
         self.ui.validate.show()
+        self._validate_options.show()
         self.ui.publish.show()
         self.ui.close.hide()
 
@@ -1604,6 +1646,8 @@ class AppDialog(QtGui.QWidget):
         """
         logger.info("Processing aborted.")
         self._stop_processing_flagged = True
+        # cancel the jobs plugins are waiting for in worker processes
+        self._bundle.process_pool.cancel()
 
     def _show_no_items_error(self):
         """
@@ -1613,6 +1657,7 @@ class AppDialog(QtGui.QWidget):
         """
         # Hide everything but the close button.
         self.ui.validate.hide()
+        self._validate_options.hide()
         self.ui.publish.hide()
         self.ui.button_container.hide()
         self.ui.progress_bar.hide()
@@ -165,6 +165,10 @@ class PublishTreeWidget(QtGui.QTreeWidget):
                 if item.item not in self._publish_manager.tree.root_item.children:
                     # no longer in the publish mgr. remove from tree
                     top_level_item.takeChild(item_index)
+                elif not self.__is_in_sync_r(item):
+                    # the item was kept by an incremental collection but its
+                    # children changed. remove it so that it gets added back
+                    top_level_item.takeChild(item_index)
                 else:
                     # an active item
                     top_level_items_in_tree.append(item.item)
@@ -211,6 +215,31 @@ class PublishTreeWidget(QtGui.QTreeWidget):
         else:
             self._summary_node.setHidden(False)
 
+    def __is_in_sync_r(self, widget_item):
+        """
+        Checks that the child nodes of the supplied widget item still match
+        the children of the publish item it represents, recursively.
+
+        :param widget_item: The widget item to check.
+        :returns: ``True`` if the child nodes are in sync, ``False`` otherwise.
+        """
+        child_widgets = []
+        for child_index in xrange(widget_item.childCount()):
+            child = widget_item.child(child_index)
+            if not isinstance(child, TreeNodeTask):
+                child_widgets.append(child)
+
+        # orphans don't get a node, see _build_item_tree_r
+        child_items = [
+            child for child in widget_item.item.children
+            if child.tasks or list(child.children)
+        ]
+
+        if [child.item for child in child_widgets] != child_items:
+            return False
+
+        return all(self.__is_in_sync_r(child) for child in child_widgets)
+
     def __ensure_context_node_exists(self, context):
         """
         Make sure a node representing the context exists in the tree
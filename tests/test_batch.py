@@ -0,0 +1,97 @@
+# Copyright (c) 2018 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import json
+import tempfile
+import time
+
+from publish_api_test_base import PublishApiTestBase
+from tank_test.tank_test_base import setUpModule # noqa
+
+from mock import patch
+
+
+class TestBatch(PublishApiTestBase):
+
+    def test_run_batch(self):
+        """
+        Ensures serialized trees are published and reported on.
+        """
+        batch = self.api.batch
+        self.manager.collect_session()
+        task_count = len([task for item in self.manager.tree for task in item.tasks])
+
+        fd, tree_path = tempfile.mkstemp()
+        self.manager.save(tree_path)
+        fd, report_path = tempfile.mkstemp()
+
+        report = batch.run_batch(
+            [batch.BatchJob(tree_path=tree_path)], report_path=report_path
+        )
+
+        self.assertEqual(report["status"], batch.STATUS_SUCCEEDED)
+        (job_report,) = report["jobs"]
+        self.assertEqual(
+            sorted(job_report["durations"]),
+            ["finalize", "publish", "total", "validate"]
+        )
+        # Every task is reported for each phase.
+        self.assertEqual(len(job_report["tasks"]), 3 * task_count)
+        self.assertTrue(
+            all(task["status"] == batch.STATUS_SUCCEEDED for task in job_report["tasks"])
+        )
+
+        with open(report_path, "r") as report_file:
+            self.assertEqual(json.load(report_file)["status"], batch.STATUS_SUCCEEDED)
+
+    def test_task_records(self):
+        """
+        Ensures tasks are timed and reported by the thread running them when
+        published in parallel.
+        """
+        batch = self.api.batch
+        self.manager.collect_session()
+        tasks = [task for item in self.manager.tree for task in item.tasks]
+
+        fd, tree_path = tempfile.mkstemp()
+        self.manager.save(tree_path)
+
+        def publish(task):
+            time.sleep(0.1)
+            if (task.item.name, task.name) == (tasks[-1].item.name, tasks[-1].name):
+                raise Exception("Test error!")
+
+        with patch.object(self.api.PublishTask, "publish", autospec=True, side_effect=publish):
+            report = batch.run_batch(
+                [batch.BatchJob(tree_path=tree_path)],
+                phases=[batch.PHASE_PUBLISH],
+                max_workers=4
+            )
+
+        self.assertEqual(report["status"], batch.STATUS_FAILED)
+        task_records = report["jobs"][0]["tasks"]
+        self.assertTrue(task_records)
+        self.assertTrue(all(record["duration"] >= 0.1 for record in task_records))
+        self.assertEqual(
+            [record["error"] for record in task_records if record["status"] == batch.STATUS_FAILED],
+            ["Test error!"]
+        )
+
+    def test_failed_job(self):
+        """
+        Ensures a job that can't be loaded is reported as failed.
+        """
+        batch = self.api.batch
+        report = batch.run_batch(
+            [batch.BatchJob(tree_path="/does/not/exist.json")],
+            phases=[batch.PHASE_VALIDATE]
+        )
+        self.assertEqual(report["status"], batch.STATUS_FAILED)
+        self.assertIsNotNone(report["jobs"][0]["error"])
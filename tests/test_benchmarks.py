@@ -0,0 +1,298 @@
+# Copyright (c) 2018 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import fnmatch
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+from publish_api_test_base import PublishApiTestBase
+from tank_test.tank_test_base import setUpModule # noqa
+from mock import MagicMock
+
+import sgtk
+
+logger = sgtk.LogManager.get_logger(__name__)
+
+# Benchmarks are slow and only report timings, so they only run on demand.
+# Set PUBLISH2_BENCHMARKS=1 to run them.
+run_benchmarks = unittest.skipUnless(
+    os.environ.get("PUBLISH2_BENCHMARKS"),
+    "Set PUBLISH2_BENCHMARKS=1 to run the benchmarks."
+)
+
+
+class Timer(object):
+    """
+    Context manager measuring the time spent in its scope.
+    """
+
+    def __enter__(self):
+        self.start = time.time()
+        self.elapsed = None
+        return self
+
+    def __exit__(self, *args):
+        self.elapsed = time.time() - self.start
+
+
+@run_benchmarks
+class TestBenchmarks(PublishApiTestBase):
+    """
+    Reports timings for the operations that scale with the number of items,
+    plugins and contexts in a publish session.
+    """
+
+    def _report(self, name, timer, count, unit="operations"):
+        """
+        Prints the timing of a benchmark.
+        """
+        print(
+            "\n%s: %.3fs for %d %s (%.3fms each)" % (
+                name, timer.elapsed, count, unit, 1000.0 * timer.elapsed / max(count, 1)
+            )
+        )
+
+    def _create_contexts(self, count):
+        """
+        Creates shots in the mocked database and returns a context for each.
+        """
+        shots = []
+        for index in range(count):
+            shots.append({
+                "type": "Shot",
+                "id": 1000 + index,
+                "code": "shot_%04d" % index,
+                "project": self.project
+            })
+        self.add_to_sg_mock_db(shots)
+
+        return [
+            self.tk.context_from_entity(shot["type"], shot["id"])
+            for shot in shots
+        ]
+
+    def test_load_publish_plugins(self):
+        """
+        Loads the publish plugins for 200 distinct contexts.
+        """
+        contexts = self._create_contexts(200)
+        plugins = self.api.plugins
+
+        # cold: nothing registered or cached yet
+        plugins.instance_base.hook_class_registry.clear()
+        plugins.setting.settings_cache.clear()
+        with Timer() as timer:
+            for context in contexts[:1]:
+                self.PublishManager.load_publish_plugins(context, logger)
+        self._report("load_publish_plugins (first context)", timer, 1, "contexts")
+
+        with Timer() as timer:
+            for context in contexts[1:]:
+                self.PublishManager.load_publish_plugins(context, logger)
+        self._report(
+            "load_publish_plugins (shared hook classes)",
+            timer,
+            len(contexts) - 1,
+            "contexts"
+        )
+
+    def test_plugin_filter_index(self):
+        """
+        Matches 10k items against the filters of 30 plugins.
+        """
+        type_specs = [
+            "file.image", "file.image.sequence", "file.video", "file.texture",
+            "file.alembic", "maya.session", "maya.session.geometry",
+            "nuke.session", "nuke.session.write", "mari.session.channel",
+        ]
+        filters = [
+            ["file.*"], ["file.image*"], ["file.video", "file.image"],
+            ["maya.*"], ["maya.session"], ["nuke.*", "nuke.session.*"],
+            ["mari.session.*"], ["*.sequence"], ["file.texture"], ["*"],
+        ]
+        plugins = []
+        for index in range(30):
+            plugin = MagicMock()
+            plugin.name = "plugin_%02d" % index
+            plugin.item_filters = filters[index % len(filters)]
+            plugins.append(plugin)
+
+        root = self.manager.tree.root_item
+        items = [
+            root.create_item(type_specs[index % len(type_specs)], "Item", "Item")
+            for index in range(10000)
+        ]
+
+        with Timer() as timer:
+            naive_matches = [
+                [
+                    plugin for plugin in plugins
+                    if any(
+                        fnmatch.fnmatch(item.type_spec, item_filter)
+                        for item_filter in plugin.item_filters
+                    )
+                ]
+                for item in items
+            ]
+        self._report("fnmatch filters", timer, len(items), "items")
+
+        with Timer() as timer:
+            plugin_index = self.api.manager.PluginFilterIndex(plugins)
+            indexed_matches = [
+                plugin_index.get_plugins(item.type_spec) for item in items
+            ]
+        self._report("compiled filter index", timer, len(items), "items")
+
+        self.assertEqual(naive_matches, indexed_matches)
+
+    def test_deep_tree_traversal(self):
+        """
+        Walks a Mari-like tree of channels with deeply nested layer stacks.
+        """
+        root = self.manager.tree.root_item
+        session = root.create_item("mari.session", "Mari Session", "Mari Session")
+        for geo_index in range(10):
+            geo = session.create_item("mari.geometry", "Geometry", "geo_%d" % geo_index)
+            for channel_index in range(20):
+                parent = geo.create_item(
+                    "mari.channel", "Channel", "channel_%d" % channel_index
+                )
+                # layer stacks nest into each other
+                for layer_index in range(50):
+                    parent = parent.create_item(
+                        "mari.texture", "Layer", "layer_%d" % layer_index
+                    )
+
+        def visit_recursive(item):
+            for child in item.children:
+                yield child
+                for sub_child in visit_recursive(child):
+                    yield sub_child
+
+        walks = 10
+        with Timer() as timer:
+            for _ in range(walks):
+                recursive_items = list(visit_recursive(root))
+        self._report("nested generators", timer, walks, "walks")
+
+        with Timer() as timer:
+            for _ in range(walks):
+                iterative_items = list(root.descendants)
+        self._report("iterative descendants", timer, walks, "walks")
+
+        with Timer() as timer:
+            for _ in range(walks):
+                tree_items = list(self.manager.tree)
+        self._report("cached tree iteration", timer, walks, "walks")
+
+        self.assertEqual(recursive_items, iterative_items)
+        self.assertEqual(recursive_items, tree_items)
+
+    def test_item_memory(self):
+        """
+        Reports the memory used by the items of a 100k item tree.
+        """
+        tree = self.manager.tree
+        key = tree.PROPERTY_KEY_COLLECTED_FILE_PATH
+
+        # a large folder ingest: top-level sequences with one item per frame
+        with Timer() as timer:
+            for folder_index in range(1000):
+                sequence = tree.root_item.create_item(
+                    "file.image.sequence",
+                    "Image Sequence",
+                    "sequence_%04d" % folder_index,
+                    properties={key: "/renders/sequence_%04d" % folder_index}
+                )
+                for frame_index in range(99):
+                    sequence.create_item(
+                        "file.image", "Image", "frame_%04d" % frame_index
+                    )
+        items = list(tree)
+        self._report("create_item", timer, len(items), "items")
+
+        # account for the items and the containers they own. shared objects
+        # are only counted once.
+        seen = set()
+        size = 0
+        for item in items:
+            owned = [
+                item,
+                item._children,
+                item._tasks,
+                item._created_temp_files,
+                item._global_properties,
+                item._local_properties,
+            ]
+            if item._global_properties is not None:
+                owned.append(item._global_properties.__dict__)
+            for obj in owned:
+                if obj is None or id(obj) in seen:
+                    continue
+                seen.add(id(obj))
+                size += sys.getsizeof(obj)
+
+        print(
+            "\nitem memory: %d bytes for %d items (%.1f bytes each)" % (
+                size, len(items), float(size) / len(items)
+            )
+        )
+
+    def test_serialization(self):
+        """
+        Compares saving and loading a 20k item tree with sequence path lists
+        as a single json document and as a stream of item records.
+        """
+        tree = self.manager.tree
+        for folder_index in range(200):
+            sequence = tree.root_item.create_item(
+                "file.image.sequence",
+                "Image Sequence",
+                "sequence_%04d" % folder_index
+            )
+            sequence.properties.sequence_paths = [
+                "/renders/sequence_%04d/frame.%04d.exr" % (folder_index, frame)
+                for frame in range(1000)
+            ]
+            for frame_index in range(99):
+                sequence.create_item(
+                    "file.image", "Image", "frame_%04d" % frame_index
+                )
+        count = len(list(tree))
+
+        fd, temp_file_path = tempfile.mkstemp()
+        os.close(fd)
+
+        with Timer() as timer:
+            with open(temp_file_path, "w") as file_obj:
+                json.dump(
+                    tree, file_obj, indent=2, cls=self.api.tree._PublishTreeEncoder
+                )
+        self._report("save (document)", timer, count, "items")
+        print("document size: %d bytes" % os.path.getsize(temp_file_path))
+        with Timer() as timer:
+            tree.load_file(temp_file_path)
+        self._report("load (document)", timer, count, "items")
+
+        for compress in (False, True):
+            label = "stream, gzip" if compress else "stream"
+            with Timer() as timer:
+                tree.save_file(temp_file_path, compress=compress)
+            self._report("save (%s)" % label, timer, count, "items")
+            print("%s size: %d bytes" % (label, os.path.getsize(temp_file_path)))
+            with Timer() as timer:
+                tree.load_file(temp_file_path)
+            self._report("load (%s)" % label, timer, count, "items")
+
+        os.remove(temp_file_path)
@@ -141,6 +141,59 @@ class TestPublishItem(PublishApiTestBase):
         # Instantiating the class will run the rest defined above.
         PropertyTesting()
 
+    def test_local_properties_from_executing_plugin(self):
+        """
+        Ensures local properties are resolved from the executing plugin without
+        requiring a hook on the call stack.
+        """
+        plugin_stack = self.api.plugins.plugin_stack
+        item = self.PublishItem("test", "test", "test")
+
+        plugin_1 = MagicMock(id=("plugin 1", "/path/to/plugin_1.py"))
+        plugin_2 = MagicMock(id=("plugin 2", "/path/to/plugin_2.py"))
+
+        self.assertIsNone(plugin_stack.get_current_plugin())
+
+        with plugin_stack.executing_plugin(plugin_1):
+            item.local_properties["test"] = 1
+            self.assertEqual(item.get_property("test"), 1)
+
+            # Nested plugins get their own local storage.
+            with plugin_stack.executing_plugin(plugin_2):
+                self.assertIs(plugin_stack.get_current_plugin(), plugin_2)
+                self.assertIsNone(item.get_property("test"))
+                item.local_properties["test"] = 2
+                self.assertEqual(item.get_property("test"), 2)
+
+            # Leaving the nested scope restores the previous plugin.
+            self.assertIs(plugin_stack.get_current_plugin(), plugin_1)
+            self.assertEqual(item.get_property("test"), 1)
+
+        self.assertIsNone(plugin_stack.get_current_plugin())
+
+        # Outside of a plugin, the lookup falls back to the call stack.
+        with self.assertRaisesRegex(AttributeError, "Could not determine the current publish plugin when"):
+            item.local_properties["test"]
+
+    def test_local_properties_allocation(self):
+        """
+        Ensures local properties are only allocated once a value is stored.
+        """
+        plugin_stack = self.api.plugins.plugin_stack
+        item = self.PublishItem("test", "test", "test")
+        plugin = MagicMock(id=("plugin", "/path/to/plugin.py"))
+
+        with plugin_stack.executing_plugin(plugin):
+            self.assertIsNone(item.get_property("test"))
+            self.assertEqual(dict(item.local_properties), {})
+            self.assertIsNone(item._local_properties)
+
+            local_properties = item.local_properties
+            local_properties.test = 1
+            self.assertEqual(item.get_property("test"), 1)
+            self.assertIs(item.local_properties, local_properties)
+            self.assertEqual(list(item._local_properties), [plugin.id])
+
     def test_item_lifescope(self):
         """
         Ensures items can be added and removed properly.
@@ -171,6 +224,80 @@ class TestPublishItem(PublishApiTestBase):
         children = [c.name for c in item.children]
         self.assertEqual(len(list(item.children)), 0)
 
+        # Items created outside of a tree keep their parent alive.
+        child = self.PublishItem("test", "test", "test").create_item(
+            "test6", "test6", "test6")
+        self.assertEqual(child.parent.name, "test")
+        self.assertEqual([c.name for c in child.parent.children], ["test6"])
+
+    def test_created_items_record(self):
+        """
+        Ensures items created during a recording scope are reported in order
+        of creation, without the ones that were removed.
+        """
+        root = self.PublishItem("root", "root", "root")
+        existing = root.create_item("existing", "existing", "existing")
+
+        with self.api.item.record_created_items() as created_items:
+            item_a = root.create_item("a", "a", "a")
+            item_a1 = item_a.create_item("a1", "a1", "a1")
+            item_b = root.create_item("b", "b", "b")
+            item_b1 = item_b.create_item("b1", "b1", "b1")
+            item_c = existing.create_item("c", "c", "c")
+            root.remove_item(item_b)
+
+        self.assertEqual(list(created_items), [item_a, item_a1, item_c])
+
+        # Items created outside of the scope are not recorded.
+        root.create_item("d", "d", "d")
+        self.assertEqual(list(created_items), [item_a, item_a1, item_c])
+
+    def test_create_items(self):
+        """
+        Ensures items can be created in bulk.
+        """
+        root = self.manager.tree.root_item
+        first = root.create_item("item.a", "Item A", "first")
+
+        with self.api.item.record_created_items() as created_items:
+            items = root.create_items([
+                ("item.b", "Item B", "second"),
+                ("item.c", "Item C", "third", None, {"key": "value"}),
+            ])
+
+        self.assertEqual([item.name for item in items], ["second", "third"])
+        self.assertEqual(list(created_items), items)
+        self.assertEqual(list(root.children), [first] + items)
+        self.assertEqual(list(self.manager.tree), [first] + items)
+        self.assertEqual(items[1].properties.key, "value")
+
+    def test_deferred_image_validation(self):
+        """
+        Ensures images are validated once per path when validation is deferred.
+        """
+        items = self.manager.tree.root_item.create_items([
+            ("item.a", "Item A", "first"),
+            ("item.b", "Item B", "second"),
+        ])
+
+        with patch.object(
+            self.PublishItem,
+            "_validate_image",
+            autospec=True,
+            side_effect=lambda item, path: path if path == self.image_path else None
+        ) as validate_image:
+            with self.api.item.defer_image_validation():
+                for item in items:
+                    item.set_thumbnail_from_path(self.image_path)
+                    item.set_icon_from_path("does_not_exist.png")
+                self.assertEqual(validate_image.call_count, 0)
+
+            self.assertEqual(validate_image.call_count, 2)
+
+        for item in items:
+            self.assertEqual(item._thumbnail_path, self.image_path)
+            self.assertIsNone(item._icon_path)
+
     def test_icon_from_file(self):
         """
         Ensures icon is loadable from file and cached.
@@ -207,7 +334,7 @@ class TestPublishItem(PublishApiTestBase):
         Ensures thumbnail can be loaded from memory and can be persisted on disk.
         """
 
-        item = self.PublishItem("test", "test", "test")
+        item = self.manager.tree.root_item.create_item("test", "test", "test")
 
         # No thumbnail set, no nothing can be retrieved.
         self.assertIsNone(item.thumbnail)
@@ -245,9 +372,8 @@ class TestPublishItem(PublishApiTestBase):
         self.assertTrue(os.path.exists(temporary_path))
         self.assertTrue(os.path.exists(another_temporary_path))
 
-        del item
-        import gc
-        gc.collect()
+        # The temporary files are deleted when the item leaves the tree.
+        self.manager.tree.remove_item(item)
 
         self.assertFalse(os.path.exists(temporary_path))
         self.assertFalse(os.path.exists(another_temporary_path))
@@ -305,6 +431,31 @@ class TestPublishItem(PublishApiTestBase):
         self.assertIsNone(root.parent)
         self.assertTrue(root.is_root)
 
+    def test_context_inheritance(self):
+        """
+        Ensures the inherited context follows context changes up the hierarchy.
+        """
+        root = self.PublishItem("__root__", "__root__", "__root__")
+        child = root.create_item("child", "child", "child")
+        grand_child = child.create_item("grand_child", "grand_child", "grand_child")
+
+        # Without any context set, the bundle's context is used.
+        self.assertEqual(grand_child.context, self.manager.context)
+
+        other_context = sgtk.Context(
+            self.tk, project={"type": "Project", "id": 2, "name": "other"}
+        )
+
+        # Tasks are not relevant here, only the context resolution is.
+        with patch.object(self.PublishItem, "_set_context_r"):
+            root.context = other_context
+            self.assertEqual(child.context, other_context)
+            self.assertEqual(grand_child.context, other_context)
+
+            child.context = self.manager.context
+            self.assertEqual(root.context, other_context)
+            self.assertEqual(grand_child.context, self.manager.context)
+
     def test_persistence_flag(self):
         """
         Ensures persistence works only on nodes just under the root.
@@ -8,10 +8,17 @@
 # agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
 # not expressly granted therein are reserved by Shotgun Software Inc.
 
+import logging
+import os
+import tempfile
+import threading
+
 from publish_api_test_base import PublishApiTestBase
 from tank_test.tank_test_base import setUpModule # noqa
 
-from mock import Mock, MagicMock
+from mock import Mock, MagicMock, PropertyMock, patch
+
+import sgtk
 
 
 class TestManager(PublishApiTestBase):
@@ -154,3 +161,641 @@ class TestManager(PublishApiTestBase):
 
         with self.assertRaisesRegex(Exception, "Test error!"):
             self.manager.publish(test_nodes())
+
+    def test_settings_resolution_cache(self):
+        """
+        Ensures resolved settings are reused for the same context and schema.
+        """
+        setting = self.api.plugins.setting
+        setting.settings_cache.clear()
+
+        first = setting.get_setting_for_context("collector", self.manager.context)
+        self.assertEqual(setting.settings_cache.misses, 1)
+        self.assertEqual(setting.settings_cache.hits, 0)
+
+        # Resolving the same setting again should come from the cache.
+        second = setting.get_setting_for_context("collector", self.manager.context)
+        self.assertIs(first, second)
+        self.assertEqual(setting.settings_cache.hits, 1)
+
+        # A different schema is resolved separately.
+        setting.get_setting_for_context(
+            "collector_settings",
+            self.manager.context,
+            {"collector_settings": {"items": {"test": {"type": "str"}}}}
+        )
+        self.assertEqual(setting.settings_cache.misses, 2)
+
+        # Clearing the cache forces the settings to be resolved again.
+        setting.settings_cache.clear()
+        third = setting.get_setting_for_context("collector", self.manager.context)
+        self.assertIsNot(first, third)
+        self.assertEqual(setting.settings_cache.misses, 1)
+
+    def test_settings_cache_shared_by_contexts(self):
+        """
+        Ensures contexts using the same environment share resolved settings.
+        """
+        setting = self.api.plugins.setting
+        setting.settings_cache.clear()
+        other_context = sgtk.Context(
+            self.tk,
+            project=self.project,
+            user={"type": "HumanUser", "id": 42, "name": "Other User"}
+        )
+
+        first = setting.get_setting_for_context("collector", self.manager.context)
+        other = setting.get_setting_for_context("collector", other_context)
+        self.assertEqual(setting.settings_cache.misses, 1)
+        self.assertEqual(setting.settings_cache.hits, 1)
+
+        # the setting objects are bound to their own context
+        self.assertIsNot(first, other)
+        self.assertEqual(first.value, other.value)
+
+    def test_settings_cache_config_stamp(self):
+        """
+        Ensures editing a file included by the environment changes its stamp.
+        """
+        setting = self.api.plugins.setting
+        config_dir = tempfile.mkdtemp()
+        env_path = os.path.join(config_dir, "project.yml")
+        include_path = os.path.join(config_dir, "includes", "settings.yml")
+        os.makedirs(os.path.dirname(include_path))
+        with open(env_path, "w") as fh:
+            fh.write("includes: [./includes/settings.yml]\n")
+        with open(include_path, "w") as fh:
+            fh.write("value: 1\n")
+
+        env = Mock(disk_location=env_path)
+        cache = setting.SettingsCache(config_check_interval=0)
+        stamp = cache.get_config_stamp(env)
+        self.assertEqual(cache.get_config_stamp(env), stamp)
+
+        # only the included file is modified
+        os.utime(include_path, (0, 0))
+        self.assertNotEqual(cache.get_config_stamp(env), stamp)
+
+    def test_plugins_cache(self):
+        """
+        Ensures the plugins cache is bounded and keyed on the context entities.
+        """
+        cache = self.api.manager.PluginsCache(max_size=2)
+
+        context = self.manager.context
+        same_context = self.tk.context_from_entity(
+            self.project["type"], self.project["id"])
+        other_context = sgtk.Context(
+            self.tk,
+            project={"type": "Project", "id": self.project["id"] + 1, "name": "other"}
+        )
+
+        self.assertIsNone(cache.get("plugins", context))
+        self.assertEqual(cache.misses, 1)
+
+        # Contexts pointing to the same entities share their entries.
+        cache.add("plugins", context, ["a"])
+        self.assertEqual(cache.get("plugins", same_context), ["a"])
+        self.assertEqual(cache.hits, 1)
+
+        # Filling the cache evicts the least recently used entry.
+        cache.add("collector", context, ["b"])
+        cache.get("plugins", context)
+        cache.add("plugins", other_context, ["c"])
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.evictions, 1)
+        self.assertIsNone(cache.get("collector", context))
+        self.assertEqual(cache.get("plugins", context), ["a"])
+
+        # Invalidating a context only removes its entries.
+        cache.invalidate(context)
+        self.assertIsNone(cache.get("plugins", context))
+        self.assertEqual(cache.get("plugins", other_context), ["c"])
+
+        # Invalidating without a context clears everything.
+        cache.invalidate()
+        self.assertEqual(len(cache), 0)
+
+    def test_grouped_task_attachment(self):
+        """
+        Ensures plugins run their acceptance logic once per group of items
+        sharing the same context and type.
+        """
+        plugin = MagicMock(item_filters=["item.*"])
+        plugin.name = "grouped"
+        plugin.init_task_settings = Mock(return_value={})
+        plugin.run_accept_many = Mock(
+            side_effect=lambda settings, items: [
+                {"accepted": item.name != "rejected"} for item in items
+            ]
+        )
+        plugin_index = self.api.manager.PluginFilterIndex([plugin])
+
+        root = self.manager.tree.root_item
+        items = [
+            root.create_item("item.a", "Item A", "accepted"),
+            root.create_item("item.a", "Item A", "rejected"),
+            root.create_item("item.b", "Item B", "accepted"),
+            root.create_item("other", "Other", "accepted"),
+        ]
+
+        with patch.object(
+            self.PublishManager,
+            "load_publish_plugin_index",
+            return_value=plugin_index
+        ):
+            self.manager._attach_plugins(items)
+
+        # One call for each item type matching the plugin.
+        self.assertEqual(plugin.run_accept_many.call_count, 2)
+        self.assertEqual(
+            [task.active for task in items[0].tasks + items[1].tasks + items[2].tasks],
+            [True, False, True]
+        )
+        self.assertEqual(items[3].tasks, [])
+
+    def test_incremental_collection(self):
+        """
+        Ensures unchanged items are kept when collecting incrementally.
+        """
+        collected = ["a", "b"]
+
+        def process_current_session(parent_item):
+            for key in collected:
+                item = parent_item.create_item("generic.item", "Generic Item", key)
+                item.key = key
+                item.properties.collection = len(collections)
+                child = item.create_item("generic.item", "Generic Item", key + " child")
+                child.key = key + " child"
+                child.properties.collection = len(collections)
+            collections.append(list(collected))
+
+        collections = []
+
+        with patch.object(
+            self.manager._collector_instance,
+            "run_process_current_session",
+            side_effect=process_current_session
+        ):
+            first = dict((item.key, item) for item in self.manager.collect_session())
+            first_tasks = dict((key, item.tasks) for (key, item) in first.items())
+
+            collected[:] = ["b", "c"]
+            second = dict(
+                (item.key, item)
+                for item in self.manager.collect_session(incremental=True)
+            )
+
+        self.assertEqual(sorted(second), ["b", "b child", "c", "c child"])
+
+        # Unchanged items are kept along with their tasks.
+        self.assertIs(second["b"], first["b"])
+        self.assertIs(second["b child"], first["b child"])
+        self.assertEqual(second["b"].tasks, first_tasks["b"])
+
+        # The properties refreshed by the collector are kept.
+        self.assertEqual(second["b"].properties.collection, 1)
+        self.assertEqual(second["b child"].properties.collection, 1)
+
+        self.assertEqual(
+            [item.name for item in self.manager.tree],
+            ["b", "b child", "c", "c child"]
+        )
+
+    def test_load_shares_plugins(self):
+        """
+        Ensures the tasks of a loaded tree share their plugins and contexts.
+        """
+        def process_current_session(parent_item):
+            for index in range(3):
+                parent_item.create_item(
+                    "generic.item", "Generic Item", "item %d" % index
+                )
+
+        with patch.object(
+            self.manager._collector_instance,
+            "run_process_current_session",
+            side_effect=process_current_session
+        ):
+            self.manager.collect_session()
+
+        collected_plugins = set(
+            task.plugin for item in self.manager.tree for task in item.tasks
+        )
+        self.assertTrue(collected_plugins)
+
+        # Deserializing a tree creates each plugin once.
+        new_tree = self.PublishTree.from_dict(self.manager.tree.to_dict())
+        items = list(new_tree)
+        self.assertEqual(
+            [task.plugin for task in items[0].tasks],
+            [task.plugin for task in items[1].tasks]
+        )
+        self.assertEqual(
+            len(set(id(task.plugin.context) for item in items for task in item.tasks)),
+            1
+        )
+
+        # Loading through the manager reuses the plugins already loaded.
+        fd, temp_file_path = tempfile.mkstemp()
+        self.manager.save(temp_file_path)
+        self.manager.load(temp_file_path)
+
+        for item in self.manager.tree:
+            self.assertEqual(set(task.plugin for task in item.tasks), collected_plugins)
+
+    def test_partial_load(self):
+        """
+        Ensures only the selected items and their ancestors are loaded.
+        """
+        def process_current_session(parent_item):
+            session = parent_item.create_item("generic.item", "Generic Item", "session")
+            for key in ["a", "b"]:
+                item = session.create_item("generic.item", "Generic Item", key)
+                item.key = key
+
+        with patch.object(
+            self.manager._collector_instance,
+            "run_process_current_session",
+            side_effect=process_current_session
+        ):
+            self.manager.collect_session()
+
+        fd, temp_file_path = tempfile.mkstemp()
+        self.manager.save(temp_file_path)
+        self.manager.load(
+            temp_file_path, select=self.PublishTree.item_selector(keys=["b"])
+        )
+
+        (session, item) = list(self.manager.tree)
+        self.assertEqual(session.name, "session")
+        self.assertEqual(item.name, "b")
+
+        # Ancestors are only loaded to preserve the hierarchy.
+        self.assertEqual(list(session.tasks), [])
+        self.assertNotEqual(list(item.tasks), [])
+
+    def test_parallel_publish(self):
+        """
+        Ensures all the active tasks are published when publishing in parallel.
+        """
+        self.manager.collect_session()
+        tasks = [task for item in self.manager.tree for task in item.tasks]
+        published = []
+
+        def publish(task):
+            published.append(task)
+
+        with patch.object(
+            self.PublishPluginInstance, "thread_safe", new_callable=PropertyMock, return_value=True
+        ):
+            with patch.object(self.api.PublishTask, "publish", autospec=True, side_effect=publish):
+                self.assertEqual(self.manager.publish(max_workers=4), [])
+
+        self.assertEqual(len(published), len(tasks))
+        self.assertEqual(set(published), set(tasks))
+
+    def test_parallel_publish_custom_generator(self):
+        """
+        Ensures the tasks a custom generator skips are never published.
+        """
+        self.manager.collect_session()
+        tasks = [task for item in self.manager.tree for task in item.tasks]
+        published = []
+
+        def task_generator():
+            # the first task is thread safe, but never yielded
+            for task in tasks[1:]:
+                yield task
+
+        def publish(task):
+            published.append(task)
+
+        with patch.object(
+            self.PublishPluginInstance, "thread_safe", new_callable=PropertyMock, return_value=True
+        ):
+            with patch.object(self.api.PublishTask, "publish", autospec=True, side_effect=publish):
+                with self.assertRaisesRegex(sgtk.TankError, "custom task generator"):
+                    self.manager.publish(task_generator=task_generator(), max_workers=4)
+                self.assertEqual(published, [])
+
+                self.manager.publish(task_generator=task_generator())
+
+        self.assertEqual(published, tasks[1:])
+
+    def test_deactivated_tasks(self):
+        """
+        Ensures tasks deactivated by a previous task aren't processed.
+        """
+        self.manager.collect_session()
+        tasks = [task for item in self.manager.tree for task in item.tasks]
+        published = []
+
+        def publish(task):
+            tasks[-1].active = False
+            published.append(task)
+
+        with patch.object(self.api.PublishTask, "publish", autospec=True, side_effect=publish):
+            self.manager.publish()
+
+        self.assertEqual(published, tasks[:-1])
+
+    def test_parallel_publish_logging(self):
+        """
+        Ensures records logged by tasks running on worker threads are handled
+        on the calling thread, and the records of other threads right away.
+        """
+        self.manager.collect_session()
+        tasks = [task for item in self.manager.tree for task in item.tasks]
+        handled_threads = []
+        published_threads = []
+        other_threads = []
+
+        class Handler(logging.Handler):
+            def emit(self, record):
+                if record.getMessage() == "Publishing on a worker":
+                    handled_threads.append(threading.current_thread())
+                elif record.getMessage() == "Logging on another thread":
+                    other_threads.append(
+                        threading.current_thread().name == record.threadName
+                    )
+
+        def log_on_other_thread():
+            self.manager.logger.info("Logging on another thread")
+
+        def publish(task):
+            published_threads.append(threading.current_thread())
+            task.plugin.logger.info("Publishing on a worker")
+            # the worker waits for a thread logging on the same handlers
+            other_thread = threading.Thread(target=log_on_other_thread)
+            other_thread.start()
+            other_thread.join()
+
+        handler = Handler()
+        self.manager.logger.addHandler(handler)
+        self.addCleanup(self.manager.logger.removeHandler, handler)
+
+        with patch.object(
+            self.PublishPluginInstance, "thread_safe", new_callable=PropertyMock, return_value=True
+        ):
+            with patch.object(self.api.PublishTask, "publish", autospec=True, side_effect=publish):
+                self.manager.publish(max_workers=4)
+
+        self.assertEqual(len(published_threads), len(tasks))
+        self.assertEqual(handled_threads, [threading.current_thread()] * len(tasks))
+        self.assertEqual(other_threads, [True] * len(tasks))
+
+    def test_pruned_publish_failures(self):
+        """
+        Ensures a failed task only skips the tasks depending on it.
+        """
+        def process_current_session(parent_item):
+            session = parent_item.create_item("generic.item", "Generic Item", "session")
+            for name in ["a", "b"]:
+                session.create_item("generic.item", "Generic Item", name)
+
+        with patch.object(
+            self.manager._collector_instance,
+            "run_process_current_session",
+            side_effect=process_current_session
+        ):
+            self.manager.collect_session()
+
+        (session, item_a, item_b) = list(self.manager.tree)
+        published = []
+
+        def publish(task):
+            if task.item is item_a:
+                raise Exception("Test error!")
+            published.append(task)
+
+        with patch.object(self.api.PublishTask, "publish", autospec=True, side_effect=publish):
+            failed_tasks = self.manager.publish(prune_failures=True)
+
+        # The first task of item a failed and the following ones were skipped.
+        self.assertEqual(failed_tasks, list(item_a.tasks))
+        self.assertEqual(published, list(session.tasks) + list(item_b.tasks))
+
+    def test_resume(self):
+        """
+        Ensures a resumed publish only processes the tasks which didn't
+        complete a phase.
+        """
+        self.manager.collect_session()
+        journal_path = os.path.join(tempfile.mkdtemp(), "publish.journal")
+        self.manager.create_journal(journal_path)
+        self.assertEqual(self.manager.validate(), [])
+
+        tasks = [task for item in self.manager.tree for task in item.tasks]
+        self.assertTrue(len(tasks) > 1)
+
+        def interrupted_publish(task):
+            # the publish is interrupted on the second task
+            if task is tasks[1]:
+                raise Exception("Test error!")
+            task.item.properties.sg_publish_data_list = [{"id": 1}]
+
+        with patch.object(
+            self.api.PublishTask, "publish", autospec=True, side_effect=interrupted_publish
+        ):
+            with self.assertRaisesRegex(Exception, "Test error!"):
+                self.manager.publish()
+
+        manager = self.app.create_publish_manager()
+        published = []
+
+        def publish(task):
+            published.append(task)
+
+        with patch.object(
+            self.api.PublishTask, "publish", autospec=True, side_effect=publish
+        ):
+            self.assertEqual(manager.resume(journal_path), [])
+
+        # Only the tasks after the first one were published again, and the
+        # properties of the completed one were restored.
+        resumed_tasks = [task for item in manager.tree for task in item.tasks]
+        self.assertEqual(published, resumed_tasks[1:])
+        self.assertEqual(
+            resumed_tasks[0].item.properties.sg_publish_data_list, [{"id": 1}]
+        )
+
+    def test_journal_unserializable_properties(self):
+        """
+        Ensures the outcome of a task is recorded even if its properties can't
+        be serialized.
+        """
+        self.manager.collect_session()
+        journal_path = os.path.join(tempfile.mkdtemp(), "publish.journal")
+        journal = self.manager.create_journal(journal_path)
+        tasks = [task for item in self.manager.tree for task in item.tasks]
+
+        def publish(task):
+            task.item.properties.sg_publish_data_list = [{"created_at": object()}]
+
+        with patch.object(
+            self.api.PublishTask, "publish", autospec=True, side_effect=publish
+        ):
+            self.assertEqual(self.manager.publish(), [])
+
+        records = journal.records
+        self.assertEqual(len(records), len(tasks))
+        self.assertEqual(
+            [record["properties"] for record in records], [{}] * len(tasks)
+        )
+        self.assertEqual(
+            len(journal.completed_tasks(self.api.journal.PHASE_PUBLISH)), len(tasks)
+        )
+
+    def test_resume_after_validation(self):
+        """
+        Ensures the properties set while validating are available when
+        publishing a resumed publish, including with a custom task generator.
+        """
+        executing_plugin = self.api.plugins.plugin_stack.executing_plugin
+
+        def validate(task, force=False):
+            with executing_plugin(task.plugin):
+                task.item.properties.publish_path = "/publish/%s" % (task.item.name,)
+                task.item.local_properties.publish_version = 3
+            return True
+
+        self.manager.collect_session()
+        journal_path = os.path.join(tempfile.mkdtemp(), "publish.journal")
+        self.manager.create_journal(journal_path)
+        with patch.object(
+            self.api.PublishTask, "validate", autospec=True, side_effect=validate
+        ):
+            self.assertEqual(self.manager.validate(), [])
+
+        tasks = [task for item in self.manager.tree for task in item.tasks]
+
+        def interrupted_publish(task):
+            if task is tasks[1]:
+                raise Exception("Test error!")
+
+        with patch.object(
+            self.api.PublishTask, "publish", autospec=True, side_effect=interrupted_publish
+        ):
+            with self.assertRaisesRegex(Exception, "Test error!"):
+                self.manager.publish()
+
+        manager = self.app.create_publish_manager()
+        published = []
+
+        def publish(task):
+            with executing_plugin(task.plugin):
+                published.append(
+                    (
+                        task,
+                        task.item.get_property("publish_path"),
+                        task.item.get_property("publish_version")
+                    )
+                )
+
+        with patch.object(
+            self.api.PublishTask, "validate", autospec=True
+        ) as validate_mock:
+            with patch.object(
+                self.api.PublishTask, "publish", autospec=True, side_effect=publish
+            ):
+                self.assertEqual(manager.resume(journal_path), [])
+
+                # The completed tasks are also skipped when yielded by a
+                # custom generator.
+                manager.publish(
+                    task_generator=(task for item in manager.tree for task in item.tasks)
+                )
+
+        # Nothing was validated again and the remaining tasks were published
+        # with the properties set while validating.
+        self.assertEqual(validate_mock.call_count, 0)
+        resumed_tasks = [task for item in manager.tree for task in item.tasks]
+        self.assertEqual(
+            published,
+            [
+                (task, "/publish/%s" % (task.item.name,), 3)
+                for task in resumed_tasks[1:]
+            ]
+        )
+
+    def test_validation_cache(self):
+        """
+        Ensures tasks which passed validation are only validated again when
+        they changed or when forced to.
+        """
+        self.manager.collect_session()
+        tasks = [task for item in self.manager.tree for task in item.tasks]
+
+        with patch.object(
+            self.PublishPluginInstance, "run_validate", return_value=True
+        ) as run_validate:
+            self.assertEqual(self.manager.validate(), [])
+            self.assertEqual(run_validate.call_count, len(tasks))
+
+            # Nothing changed, the previous results are reused.
+            run_validate.reset_mock()
+            self.assertEqual(self.manager.validate(), [])
+            self.assertEqual(run_validate.call_count, 0)
+
+            # Only the tasks of the modified item are validated again.
+            item = tasks[0].item
+            item.properties.publish_version = 42
+            self.assertEqual(self.manager.validate(), [])
+            self.assertEqual(run_validate.call_count, len(item.tasks))
+
+            # Changing the local properties of a plugin validates them again.
+            run_validate.reset_mock()
+            item._get_plugin_properties(item.tasks[0].plugin.id)["checked"] = True
+            self.assertEqual(self.manager.validate(), [])
+            self.assertEqual(run_validate.call_count, len(item.tasks))
+
+            # The files of the item are checked once per task and validation.
+            fd, temp_file_path = tempfile.mkstemp()
+            item.properties.path = temp_file_path
+            with patch("os.stat", wraps=os.stat) as stat:
+                self.assertEqual(self.manager.validate(), [])
+            self.assertEqual(
+                len([
+                    call for call in stat.call_args_list
+                    if call[0][0] == temp_file_path
+                ]),
+                len(item.tasks)
+            )
+
+            # Changing the properties of a parent item validates the tasks of
+            # its children again.
+            run_validate.reset_mock()
+            self.manager.tree.root_item.properties.shared = True
+            self.assertEqual(self.manager.validate(), [])
+            self.assertEqual(run_validate.call_count, len(tasks))
+
+            # The properties of the items without any are not allocated.
+            item._global_properties = None
+            self.assertEqual(self.manager.validate(), [])
+            self.assertIsNone(item._global_properties)
+
+            run_validate.reset_mock()
+            self.assertEqual(self.manager.validate(force=True), [])
+            self.assertEqual(run_validate.call_count, len(tasks))
+
+            # The plugins can have their tasks always validated again.
+            run_validate.reset_mock()
+            with patch.object(
+                self.PublishPluginInstance,
+                "run_get_validation_fingerprint",
+                return_value=None
+            ):
+                self.assertEqual(self.manager.validate(), [])
+                self.assertEqual(self.manager.validate(), [])
+            self.assertEqual(run_validate.call_count, 2 * len(tasks))
+
+            # Or validated again when the state they depend on changed.
+            run_validate.reset_mock()
+            with patch.object(
+                self.PublishPluginInstance,
+                "run_get_validation_fingerprint",
+                return_value="conflicts"
+            ):
+                self.assertEqual(self.manager.validate(), [])
+            self.assertEqual(run_validate.call_count, len(tasks))
@@ -0,0 +1,166 @@
+# Copyright (c) 2018 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import threading
+import time
+
+from mock import Mock
+
+from publish_api_test_base import PublishApiTestBase
+from tank_test.tank_test_base import setUpModule # noqa
+
+import sgtk
+
+
+def _square(value, progress):
+    """
+    Squares a value in a worker process, failing for negative values.
+    """
+    progress("Squaring %s" % (value,), 50)
+    if value < 0:
+        raise ValueError("Negative value!")
+    return value * value
+
+
+def _sleep(duration):
+    """
+    Sleeps in a worker process.
+    """
+    time.sleep(duration)
+
+
+class TestProcessPool(PublishApiTestBase):
+
+    def setUp(self):
+        super(TestProcessPool, self).setUp()
+        self.pool = self.api.process_pool.ProcessPool(2)
+        self.addCleanup(self.pool.shutdown)
+
+    def test_results(self):
+        """
+        Ensures jobs results and progress are reported back.
+        """
+        publish_logger = Mock()
+        jobs = [
+            self.pool.submit(
+                _square, (value,), publish_logger=publish_logger, with_progress=True
+            )
+            for value in range(4)
+        ]
+
+        self.assertEqual(
+            self.pool.wait(jobs), [(0, None), (1, None), (4, None), (9, None)]
+        )
+        publish_logger.info.assert_any_call("_square: Squaring 3 (50%)")
+
+    def test_wait_errors(self):
+        """
+        Ensures the error of each failed job is returned along with the other
+        results.
+        """
+        jobs = [
+            self.pool.submit(_square, (value,), with_progress=True)
+            for value in [2, -1, 3]
+        ]
+        results = self.pool.wait(jobs)
+
+        self.assertEqual([result for (result, error) in results], [4, None, 9])
+        self.assertIsNone(results[0][1])
+        self.assertIsInstance(results[1][1], sgtk.TankError)
+        self.assertIn("Negative value!", str(results[1][1]))
+
+    def test_in_process(self):
+        """
+        Ensures jobs are run in the current process when worker processes
+        aren't used.
+        """
+        pool = self.api.process_pool.ProcessPool(2, use_processes=False)
+        self.addCleanup(pool.shutdown)
+        publish_logger = Mock()
+        job_threads = []
+
+        def square(value, progress):
+            job_threads.append(threading.current_thread())
+            return _square(value, progress)
+
+        # functions which can't be pickled can run in process
+        job = pool.submit(
+            square,
+            (3,),
+            description="square",
+            publish_logger=publish_logger,
+            with_progress=True
+        )
+        self.assertEqual(job.result(), 9)
+        publish_logger.info.assert_any_call("square: Squaring 3 (50%)")
+
+        # the jobs don't run on the thread waiting for them
+        self.assertNotIn(threading.current_thread(), job_threads)
+
+        results = pool.wait([pool.submit(_square, (-1,), with_progress=True)])
+        self.assertIn("Negative value!", str(results[0][1]))
+
+    def test_cancel_in_process(self):
+        """
+        Ensures jobs run in process can be cancelled.
+        """
+        pool = self.api.process_pool.ProcessPool(1, use_processes=False)
+        self.addCleanup(pool.shutdown)
+        release = threading.Event()
+        self.addCleanup(release.set)
+        started = []
+
+        def block():
+            started.append(True)
+            release.wait()
+
+        running_job = pool.submit(block)
+        while not started:
+            time.sleep(0.01)
+        queued_job = pool.submit(block)
+        pool.cancel()
+
+        for job in [running_job, queued_job]:
+            self.assertTrue(job.cancelled)
+            with self.assertRaisesRegex(sgtk.TankError, "cancelled"):
+                job.result()
+
+        # the queued job never starts
+        release.set()
+        self.assertEqual(
+            pool.submit(_square, (2,), with_progress=True).result(), 4
+        )
+        self.assertEqual(len(started), 1)
+
+    def test_failures(self):
+        """
+        Ensures errors raised by jobs and unpicklable jobs are reported.
+        """
+        job = self.pool.submit(_square, (-1,), with_progress=True)
+        with self.assertRaisesRegex(sgtk.TankError, "Negative value!"):
+            job.result()
+
+        with self.assertRaisesRegex(sgtk.TankError, "can't be run in a process"):
+            self.pool.submit(lambda: None)
+
+    def test_cancel(self):
+        """
+        Ensures cancelled jobs stop the workers and new jobs can be submitted.
+        """
+        job = self.pool.submit(_sleep, (60,))
+        self.pool.cancel()
+
+        self.assertTrue(job.cancelled)
+        with self.assertRaisesRegex(sgtk.TankError, "cancelled"):
+            job.result()
+
+        self.assertEqual(
+            self.pool.submit(_square, (2,), with_progress=True).result(), 4
+        )
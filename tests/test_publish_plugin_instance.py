@@ -12,6 +12,7 @@ from publish_api_test_base import PublishApiTestBase
 from tank_test.tank_test_base import setUpModule # noqa
 
 import logging
+import os
 from mock import Mock, MagicMock, patch
 from functools import wraps
 
@@ -146,3 +147,31 @@ class TestPublishPluginInstance(PublishApiTestBase):
         handler.keyword = "Error running accept for"
         self.assertEqual(ppi.run_accept(None), {"accepted": True})
         self.assertFalse(handler.found)
+
+    def test_hook_class_registry(self):
+        """
+        Ensures hook classes are shared until their files change on disk.
+        """
+        registry = self.api.plugins.instance_base.hook_class_registry
+        registry.clear()
+        hook_path = "{self}/publish_file.py:{config}/generic_local.py"
+        context = self.engine.context
+
+        plugin_1 = self.PublishPluginInstance("Local Publish", hook_path, context, logger)
+        plugin_2 = self.PublishPluginInstance("Local Publish", hook_path, context, logger)
+        self.assertIs(
+            plugin_1._hook_instance.__class__, plugin_2._hook_instance.__class__
+        )
+
+        # Editing a hook file loads the hook again.
+        hook_file = os.path.join(
+            self.tk.pipeline_configuration.get_hooks_location(), "generic_local.py"
+        )
+        stat = os.stat(hook_file)
+        os.utime(hook_file, (stat.st_atime, stat.st_mtime + 10))
+        self.addCleanup(os.utime, hook_file, (stat.st_atime, stat.st_mtime))
+
+        plugin_3 = self.PublishPluginInstance("Local Publish", hook_path, context, logger)
+        self.assertIsNot(
+            plugin_1._hook_instance.__class__, plugin_3._hook_instance.__class__
+        )
@@ -0,0 +1,88 @@
+# Copyright (c) 2018 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import os
+import tempfile
+
+from publish_api_test_base import PublishApiTestBase
+from tank_test.tank_test_base import setUpModule # noqa
+
+from mock import patch
+
+
+class TestSharding(PublishApiTestBase):
+
+    def _collect(self, file_counts):
+        """
+        Collects a top-level item for each file count, referencing as many
+        files.
+        """
+        def process_current_session(parent_item):
+            for (index, file_count) in enumerate(file_counts):
+                item = parent_item.create_item(
+                    "generic.item", "Generic Item", "item %d" % index
+                )
+                item.properties.sequence_paths = [
+                    "/does/not/exist/%d.%04d.exr" % (index, frame)
+                    for frame in range(file_count)
+                ]
+
+        with patch.object(
+            self.manager._collector_instance,
+            "run_process_current_session",
+            side_effect=process_current_session
+        ):
+            self.manager.collect_session()
+
+    def test_balanced_split(self):
+        """
+        Ensures shards are balanced by the number of files to publish.
+        """
+        self._collect([4, 8, 2, 2])
+        sharding = self.api.sharding
+
+        shard_paths = sharding.split_tree(self.manager.tree, 2, tempfile.mkdtemp())
+
+        self.assertEqual(
+            [
+                [item.name for item in self.PublishTree.load_file(path).root_item.children]
+                for path in shard_paths
+            ],
+            [["item 1"], ["item 0", "item 2", "item 3"]]
+        )
+
+    def test_publish_and_merge(self):
+        """
+        Ensures published shards are merged back into the tree.
+        """
+        self._collect([1, 2, 3, 4])
+        sharding = self.api.sharding
+        item_names = [item.name for item in self.manager.tree]
+
+        result_paths = []
+        for shard_path in sharding.split_tree(self.manager.tree, 3, tempfile.mkdtemp()):
+            (root, ext) = os.path.splitext(shard_path)
+            result_path = root + "_result" + ext
+            self.assertEqual(sharding.publish_shard(shard_path, result_path), [])
+            result_paths.append(result_path)
+
+        self.assertEqual(sharding.merge_shards(self.manager, result_paths), [])
+        self.assertEqual([item.name for item in self.manager.tree], item_names)
+
+        # The outcome of each task is recorded on its item.
+        for item in self.manager.tree:
+            self.assertEqual(
+                [result["task"] for result in item.properties[sharding.PROPERTY_KEY_SHARD_RESULTS]],
+                [task.name for task in item.tasks]
+            )
+
+        self.manager.finalize(
+            task_generator=sharding.iter_published_tasks(self.manager.tree)
+        )
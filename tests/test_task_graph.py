@@ -0,0 +1,78 @@
+# Copyright (c) 2018 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+from mock import MagicMock
+
+from publish_api_test_base import PublishApiTestBase
+from tank_test.tank_test_base import setUpModule # noqa
+
+import sgtk
+
+
+class TestTaskGraph(PublishApiTestBase):
+
+    def _create_task(self, item, plugin_name, run_after=None):
+        """
+        Creates a task for the supplied item, whose plugin runs after the
+        given plugins.
+        """
+        plugin = MagicMock(run_after=run_after)
+        plugin.name = plugin_name
+        return MagicMock(item=item, plugin=plugin)
+
+    def test_declared_order(self):
+        """
+        Ensures tasks are sorted according to the declared dependencies.
+        """
+        root = self.manager.tree.root_item
+        item = root.create_item("item", "Item", "item")
+        child = item.create_item("item", "Item", "child")
+
+        register = self._create_task(item, "register", run_after=["copy"])
+        copy = self._create_task(item, "copy")
+        report = self._create_task(item, "report")
+        child_copy = self._create_task(child, "copy")
+
+        graph = self.api.task_graph.TaskGraph([register, copy, report, child_copy])
+
+        self.assertEqual(list(graph), [copy, register, report, child_copy])
+        self.assertEqual(graph.dependencies(report), [register, copy])
+        self.assertEqual(graph.dependencies(child_copy), [register, copy, report])
+        self.assertEqual(
+            graph.dependents(copy, recursive=True), [register, report, child_copy]
+        )
+
+    def test_independent_items(self):
+        """
+        Ensures the tasks of sibling items don't depend on each other.
+        """
+        root = self.manager.tree.root_item
+        tasks = [
+            self._create_task(root.create_item("item", "Item", name), "copy")
+            for name in ["a", "b"]
+        ]
+
+        graph = self.api.task_graph.TaskGraph(tasks)
+
+        self.assertEqual(list(graph), tasks)
+        self.assertEqual(graph.dependents(tasks[0], recursive=True), [])
+
+    def test_circular_dependencies(self):
+        """
+        Ensures plugins depending on each other are reported.
+        """
+        item = self.manager.tree.root_item.create_item("item", "Item", "item")
+        tasks = [
+            self._create_task(item, "copy", run_after=["register"]),
+            self._create_task(item, "register", run_after=["copy"]),
+        ]
+
+        with self.assertRaisesRegex(sgtk.TankError, "circular dependencies"):
+            self.api.task_graph.TaskGraph(tasks)
@@ -8,7 +8,10 @@
 # agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
 # not expressly granted therein are reserved by Shotgun Software Inc.
 
+import gc
+import json
 import tempfile
+import weakref
 
 from mock import patch
 
@@ -53,6 +56,102 @@ class TestPublishTree(PublishApiTestBase):
         self.maxDiff = None
         self.assertEqual(before_load, after_load)
 
+    def test_streamed_serialization(self):
+        """
+        Ensures trees are saved one item per line and can be compressed.
+        """
+        tree = self.manager.tree
+        item = tree.root_item.create_item("item.a", "Item A", "Item A")
+        item.properties.sequence_paths = ["/a/b/c.%04d.exr" % i for i in range(100)]
+        item.create_item("item.b", "Item B", "Item B\nwith a new line")
+        tree.root_item.create_item("item.c", "Item C", "Item C")
+        before_load = tree.to_dict()
+
+        fd, temp_file_path = tempfile.mkstemp()
+        tree.save_file(temp_file_path)
+
+        # a header followed by the root and the three items
+        with open(temp_file_path, "r") as file_obj:
+            records = [json.loads(line) for line in file_obj]
+        self.assertEqual(len(records), 5)
+        self.assertEqual(
+            records[0]["serialization_format"], tree.STREAM_SERIALIZATION_FORMAT
+        )
+        self.assertEqual(
+            records[0]["serialization_version"], tree.SERIALIZATION_VERSION
+        )
+        self.assertEqual(
+            [(r["id"], r["parent_id"]) for r in records[1:]],
+            [(0, None), (1, 0), (2, 1), (3, 0)]
+        )
+        self.assertEqual(tree.load_file(temp_file_path).to_dict(), before_load)
+
+        # compressed trees are detected when loading
+        self.manager.save(temp_file_path, compress=True)
+        with open(temp_file_path, "rb") as file_obj:
+            self.assertEqual(file_obj.read(2), tree.GZIP_MAGIC_NUMBER)
+        self.manager.load(temp_file_path)
+        self.assertEqual(self.manager.tree.to_dict(), before_load)
+        self.assertEqual(
+            [i.name for i in self.manager.tree.root_item.children],
+            ["Item A", "Item C"]
+        )
+
+    def test_document_serialization(self):
+        """
+        Ensures trees saved as a single json document can still be loaded.
+        """
+        tree = self.manager.tree
+        item = tree.root_item.create_item("item.a", "Item A", "Item A")
+        item.create_item("item.b", "Item B", "Item B")
+        before_load = tree.to_dict()
+
+        fd, temp_file_path = tempfile.mkstemp()
+        with open(temp_file_path, "w") as file_obj:
+            json.dump(
+                tree, file_obj, indent=2, cls=self.api.tree._PublishTreeEncoder
+            )
+
+        self.assertEqual(tree.load_file(temp_file_path).to_dict(), before_load)
+
+        # documents saved with the first serialization version still load
+        tree_dict = tree.to_dict()
+        tree_dict["serialization_version"] = 1
+        with open(temp_file_path, "w") as file_obj:
+            json.dump(
+                tree_dict, file_obj, cls=self.api.tree._PublishTreeEncoder
+            )
+
+        self.assertEqual(tree.load_file(temp_file_path).to_dict(), before_load)
+
+    def test_partial_load(self):
+        """
+        Ensures a subset of a serialized tree can be loaded.
+        """
+        tree = self.manager.tree
+        session = tree.root_item.create_item("nuke.session", "Session", "session")
+        write = session.create_item("file.image.sequence", "Sequence", "write")
+        write.create_item("file.image", "Image", "frame")
+        session.create_item("file.video", "Video", "video")
+        tree.root_item.create_item("maya.session", "Session", "other")
+
+        select = tree.item_selector(type_filters=["file.image*"])
+
+        fd, temp_file_path = tempfile.mkstemp()
+        tree.save_file(temp_file_path)
+        new_tree = tree.load_file(temp_file_path, select=select)
+        self.assertEqual(
+            [item.name for item in new_tree], ["session", "write", "frame"]
+        )
+
+        # Documents can be filtered as well.
+        with open(temp_file_path, "w") as file_obj:
+            json.dump(tree, file_obj, cls=self.api.tree._PublishTreeEncoder)
+        new_tree = tree.load_file(temp_file_path, select=select)
+        self.assertEqual(
+            [item.name for item in new_tree], ["session", "write", "frame"]
+        )
+
     def test_bad_document_version(self):
         """
         Ensures we can't reload documents from an incorrect version.
@@ -104,6 +203,58 @@ class TestPublishTree(PublishApiTestBase):
         tree.clear(clear_persistent=True)
         self.assertEqual(list(self.manager.tree), [])
 
+    def test_tree_reclaimed_after_clear(self):
+        """
+        Ensures items and tasks are reclaimed once cleared from the tree.
+        """
+        tree = self.manager.tree
+        self.manager.collect_session()
+        item = tree.root_item.create_item("item.a", "Item A", "Item A")
+        item.persistent = True
+        item.create_item("item.b", "Item B", "Item B")
+
+        item_refs = [weakref.ref(item) for item in tree]
+        task_refs = [weakref.ref(task) for item in tree for task in item.tasks]
+        del item
+
+        tree.clear(clear_persistent=True)
+        gc.collect()
+
+        self.assertEqual([ref() for ref in item_refs], [None] * len(item_refs))
+        self.assertEqual([ref() for ref in task_refs], [None] * len(task_refs))
+        self.assertEqual(gc.garbage, [])
+
+        # a tree no longer referenced is reclaimed along with its items
+        tree = self.PublishTree()
+        item_ref = weakref.ref(
+            tree.root_item.create_item("item.a", "Item A", "Item A")
+        )
+        tree_ref = weakref.ref(tree)
+        del tree
+        gc.collect()
+        self.assertIsNone(tree_ref())
+        self.assertIsNone(item_ref())
+
+    def test_detached_items(self):
+        """
+        Ensures items keep their parents once their tree is no longer
+        referenced.
+        """
+        tree = self.manager.tree
+        item = tree.root_item.create_item("item.a", "Item A", "Item A")
+        item.create_item("item.b", "Item B", "Item B")
+
+        fd, temp_file_path = tempfile.mkstemp()
+        tree.save_file(temp_file_path)
+
+        # the loaded tree is only iterated over
+        items = list(self.PublishTree.load_file(temp_file_path))
+        gc.collect()
+
+        self.assertEqual([item.name for item in items], ["Item A", "Item B"])
+        self.assertIs(items[1].parent, items[0])
+        self.assertTrue(items[0].parent.is_root)
+
     def test_root_deletion(self):
         """
         Ensures you can't delete the root.
@@ -111,6 +262,61 @@ class TestPublishTree(PublishApiTestBase):
         with self.assertRaisesRegex(sgtk.TankError, "Removing the root item is not allowed."):
             self.manager.tree.remove_item(self.manager.tree.root_item)
 
+    def test_find_by_path(self):
+        """
+        Ensures the path index is kept in sync with the tree.
+        """
+        tree = self.manager.tree
+        key = tree.PROPERTY_KEY_COLLECTED_FILE_PATH
+
+        first = tree.root_item.create_item(
+            "file", "File", "first", properties={key: "/a/b/c.exr"}
+        )
+        second = tree.root_item.create_item(
+            "file", "File", "second", properties={key: "/a/b/c.exr"}
+        )
+        # only top-level items are indexed
+        first.create_item("file", "File", "child", properties={key: "/a/b/c.exr"})
+
+        self.assertEqual(tree.find_by_path("/a/b/./c.exr"), [first, second])
+        self.assertEqual(tree.find_by_path("/a/b/d.exr"), [])
+
+        tree.remove_item(first)
+        self.assertEqual(tree.find_by_path("/a/b/c.exr"), [second])
+
+        # the index survives serialization
+        new_tree = tree.from_dict(tree.to_dict())
+        self.assertEqual(
+            [item.name for item in new_tree.find_by_path("/a/b/c.exr")],
+            ["second"]
+        )
+
+        tree.clear(clear_persistent=True)
+        self.assertEqual(tree.find_by_path("/a/b/c.exr"), [])
+
+    def test_iteration_order(self):
+        """
+        Ensures the tree is iterated depth first and reflects changes made to
+        its structure.
+        """
+        tree = self.manager.tree
+        a = tree.root_item.create_item("item", "Item", "a")
+        b = a.create_item("item", "Item", "b")
+        b.create_item("item", "Item", "c")
+        a.create_item("item", "Item", "d")
+        tree.root_item.create_item("item", "Item", "e")
+
+        self.assertEqual([item.name for item in tree], ["a", "b", "c", "d", "e"])
+        self.assertEqual([item.name for item in a.descendants], ["b", "c", "d"])
+
+        # changes deep in the tree are picked up by the next iteration
+        b.create_item("item", "Item", "f")
+        self.assertEqual(
+            [item.name for item in tree], ["a", "b", "c", "f", "d", "e"]
+        )
+        a.remove_item(b)
+        self.assertEqual([item.name for item in tree], ["a", "d", "e"])
+
     def _set_item(self, item, boolean, description, icon_path, thumb_path, local_prop, global_prop):
         item.active = boolean
         item.context_change_allowed = boolean